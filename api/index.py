@@ -11,7 +11,11 @@ sys.path.insert(0, str(backend_path))
 os.chdir(str(backend_path))
 
 # Import the Flask app
-from app import app
+from app import app, start_background_work
+
+# app.py only starts its background work when run as a script: resume unfinished
+# batches, run history retention, flush share view counts (see VERCEL_SETUP.md)
+start_background_work()
 
 # Vercel serverless handler
 def handler(request, context):
@@ -1,5 +1,6 @@
 import re
 from urllib.parse import urlparse
+from utils.parsed_document import ParsedDocument
 
 class AEOAnalyzer:
     """Analyze content for Answer Engine Optimization (AEO)"""
@@ -7,8 +8,11 @@ class AEOAnalyzer:
     def analyze(self, text, headers):
         """
         Analyze AEO aspects of content
+        `text` may be a string or a shared ParsedDocument
         Returns dict with: score, issues, recommendations, details
         """
+        doc = ParsedDocument.of(text)
+        text = doc.text
         issues = []
         recommendations = []
         details = {}
@@ -37,7 +41,7 @@ class AEOAnalyzer:
             recommendations.append("Use lists for better AI parsing and featured snippet potential")
         
         # 3. Answer-Style Content
-        answer_data = self._analyze_answer_patterns(text)
+        answer_data = self._analyze_answer_patterns(doc)
         details['answer_patterns'] = answer_data
         
         if answer_data['direct_answers'] == 0:
@@ -53,7 +57,7 @@ class AEOAnalyzer:
             recommendations.append("Answer 5+ common questions for better AEO coverage")
         
         # 5. Semantic Richness
-        semantic_data = self._analyze_semantic_richness(text)
+        semantic_data = self._analyze_semantic_richness(doc)
         details['semantic'] = semantic_data
         
         # Calculate score
@@ -129,8 +133,10 @@ class AEOAnalyzer:
             'has_proper_headers': has_proper_headers
         }
     
-    def _analyze_answer_patterns(self, text):
+    def _analyze_answer_patterns(self, doc):
         """Analyze direct answer patterns"""
+        text = doc.text
+        
         # Patterns that indicate direct answers
         answer_patterns = [
             r'(?:^|\n)(?:The best|The top|The most|The main)',
@@ -146,7 +152,7 @@ class AEOAnalyzer:
         has_definition = bool(re.search(r'\b(?:is|are)\s+(?:defined as|known as|a type of)', text, re.IGNORECASE))
         
         # Check for concise summaries at start
-        first_paragraph = text.split('\n\n')[0] if '\n\n' in text else text[:500]
+        first_paragraph = doc.paragraphs[0] if len(doc.paragraphs) > 1 else text[:500]
         has_early_answer = len(first_paragraph.split()) < 100  # Concise intro
         
         return {
@@ -172,15 +178,15 @@ class AEOAnalyzer:
             'questions_answered': questions_answered
         }
     
-    def _analyze_semantic_richness(self, text):
+    def _analyze_semantic_richness(self, doc):
         """Analyze semantic richness for AI understanding"""
         # Entity density (proper nouns, brands, etc.)
-        words = text.split()
+        words = doc.words
         capitalized_words = [w for w in words if w and w[0].isupper() and len(w) > 2]
         entity_density = (len(capitalized_words) / len(words) * 100) if words else 0
         
         # Sentence completeness (sentences with subject-verb)
-        sentences = re.split(r'[.!?]+', text)
+        sentences = doc.sentences
         complete_sentences = [s for s in sentences if len(s.split()) >= 5]
         completeness_ratio = (len(complete_sentences) / len(sentences)) if sentences else 0
         
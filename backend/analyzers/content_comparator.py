@@ -1,4 +1,5 @@
 import re
+from sklearn.base import clone
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
@@ -101,15 +102,16 @@ class ContentComparator:
             }
         
         try:
-            # Fit TF-IDF on both documents
+            # Fit TF-IDF on both documents (fit a copy so concurrent calls don't share state)
+            vectorizer = clone(self.vectorizer)
             texts = [your_content, competitor_content]
-            tfidf_matrix = self.vectorizer.fit_transform(texts)
+            tfidf_matrix = vectorizer.fit_transform(texts)
             
             # Calculate similarity
             similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
             
             # Get feature names (topics/keywords)
-            feature_names = self.vectorizer.get_feature_names_out()
+            feature_names = vectorizer.get_feature_names_out()
             
             # Get top terms for each document
             your_scores = tfidf_matrix[0].toarray()[0]
@@ -1,44 +1,53 @@
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 from utils.serp_scraper import SERPScraper
+from utils.competitor_corpus import CompetitorCorpus
+from utils.parsed_document import ParsedDocument
 import re
 import numpy as np
 
 class DifferentiationAnalyzer:
     """Analyze content uniqueness vs competitors"""
     
-    def __init__(self):
-        self.scraper = SERPScraper()
+    def __init__(self, scraper=None):
+        self.scraper = scraper or SERPScraper()
     
-    def analyze(self, text, target_keyword):
+    def analyze(self, text, target_keyword, corpus=None, similarities=None):
         """
         Analyze content differentiation from competitors
+        Pass a shared CompetitorCorpus to reuse its SERP results and competitor pages
+        Pass precomputed TF-IDF cosine similarities (one per competitor text, in
+        gather_competitor_content order) to skip fitting a vectorizer per document
         Returns dict with: score, issues, recommendations, details
         """
         if not target_keyword:
             return self._no_keyword_response()
         
+        doc = ParsedDocument.of(text)
+        text = doc.text
         issues = []
         recommendations = []
         
         # Get competitor content
-        serp_results = self.scraper.search_google(target_keyword, num_results=10)
-        competitor_texts = self._gather_competitor_content(serp_results[:3])  # Top 3 for comparison
+        if corpus is None:
+            corpus = CompetitorCorpus(target_keyword, self.scraper)
+        corpus.prefetch(3)  # Fetch competitor pages in parallel (no-op if already fetched)
+        competitor_texts = self.gather_competitor_content(corpus, limit=3)  # Top 3 for comparison
         
         if not competitor_texts:
             return self._no_competitor_data_response()
         
         # Calculate content overlap
-        overlap_data = self._calculate_content_overlap(text, competitor_texts)
+        overlap_data = self._calculate_content_overlap(doc, competitor_texts, similarities)
         
         # Analyze unique elements
-        unique_elements = self._analyze_unique_elements(text, competitor_texts)
+        unique_elements = self._analyze_unique_elements(doc, competitor_texts)
         
         # Analyze structural differentiation
         structure_data = self._analyze_structural_difference(text, competitor_texts)
         
         # Check for unique value additions
-        value_adds = self._check_unique_value(text)
+        value_adds = self._check_unique_value(doc)
         
         # Generate issues and recommendations
         if overlap_data['avg_similarity'] > 70:
@@ -74,16 +83,16 @@ class DifferentiationAnalyzer:
             'issues': issues,
             'recommendations': recommendations[:3],
             'unique_elements_found': self._list_unique_elements(unique_elements, value_adds),
-            'differentiation_opportunities': self._suggest_differentiation_strategies(text, target_keyword)
+            'differentiation_opportunities': self._suggest_differentiation_strategies(doc, target_keyword)
         }
     
-    def _gather_competitor_content(self, serp_results):
+    def gather_competitor_content(self, corpus, limit=3):
         """Gather content from top competitors"""
         competitor_texts = []
         
-        for result in serp_results:
+        for result in corpus.top_results(limit):
             try:
-                content = self.scraper.extract_page_content(result['url'])
+                content = corpus.get_page(result['url'])
                 if content['text'] and len(content['text']) > 500:
                     competitor_texts.append(content['text'])
             except:
@@ -91,27 +100,28 @@ class DifferentiationAnalyzer:
         
         return competitor_texts
     
-    def _calculate_content_overlap(self, text, competitor_texts):
+    def _calculate_content_overlap(self, doc, competitor_texts, similarities=None):
         """Calculate content similarity using TF-IDF"""
         if not competitor_texts:
             return {'avg_similarity': 0, 'highest_similarity': 0, 'unique_sentence_ratio': 100}
         
         try:
-            # Prepare documents
-            all_docs = [text] + competitor_texts
-            
-            # Calculate TF-IDF similarity
-            vectorizer = TfidfVectorizer(max_features=500, stop_words='english')
-            tfidf_matrix = vectorizer.fit_transform(all_docs)
-            
-            # Calculate cosine similarity
-            similarities = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:])[0]
+            if similarities is None or len(similarities) != len(competitor_texts):
+                # Prepare documents
+                all_docs = [doc.text] + competitor_texts
+                
+                # Calculate TF-IDF similarity
+                vectorizer = TfidfVectorizer(max_features=500, stop_words='english')
+                tfidf_matrix = vectorizer.fit_transform(all_docs)
+                
+                # Calculate cosine similarity
+                similarities = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:])[0]
             
             avg_similarity = np.mean(similarities) * 100
             highest_similarity = np.max(similarities) * 100
             
             # Analyze sentence-level uniqueness
-            unique_sentence_ratio = self._calculate_unique_sentences(text, competitor_texts)
+            unique_sentence_ratio = self._calculate_unique_sentences(doc, competitor_texts)
             
             return {
                 'avg_similarity': avg_similarity,
@@ -123,10 +133,9 @@ class DifferentiationAnalyzer:
             print(f"Error calculating overlap: {str(e)}")
             return {'avg_similarity': 50, 'highest_similarity': 60, 'unique_sentence_ratio': 60}
     
-    def _calculate_unique_sentences(self, text, competitor_texts):
+    def _calculate_unique_sentences(self, doc, competitor_texts):
         """Calculate percentage of unique sentences"""
-        sentences = re.split(r'[.!?]+', text)
-        sentences = [s.strip().lower() for s in sentences if len(s.strip()) > 20]
+        sentences = [s.strip().lower() for s in doc.sentences if len(s.strip()) > 20]
         
         if not sentences:
             return 0
@@ -147,13 +156,13 @@ class DifferentiationAnalyzer:
         
         return (unique_count / len(sentences) * 100) if sentences else 0
     
-    def _analyze_unique_elements(self, text, competitor_texts):
+    def _analyze_unique_elements(self, doc, competitor_texts):
         """Analyze presence of unique elements"""
         combined_competitor = ' '.join(competitor_texts).lower()
-        text_lower = text.lower()
+        text_lower = doc.lower
         
         # Check for unique data/statistics
-        numbers_in_text = set(re.findall(r'\b\d+[%$]?\b', text))
+        numbers_in_text = set(re.findall(r'\b\d+[%$]?\b', doc.text))
         numbers_in_competitors = set(re.findall(r'\b\d+[%$]?\b', combined_competitor))
         unique_numbers = numbers_in_text - numbers_in_competitors
         has_unique_data = len(unique_numbers) > 3
@@ -209,9 +218,9 @@ class DifferentiationAnalyzer:
             'total_sections': len(text_headers)
         }
     
-    def _check_unique_value(self, text):
+    def _check_unique_value(self, doc):
         """Check for unique value propositions"""
-        text_lower = text.lower()
+        text_lower = doc.lower
         
         # Check for unique angle indicators
         unique_angles = [
@@ -302,18 +311,19 @@ class DifferentiationAnalyzer:
         
         return elements if elements else ["No significant unique elements found"]
     
-    def _suggest_differentiation_strategies(self, text, target_keyword):
+    def _suggest_differentiation_strategies(self, doc, target_keyword):
         """Suggest specific differentiation strategies"""
         strategies = []
+        text_lower = doc.lower
         
         # Suggest based on content gaps
-        if 'example' not in text.lower():
+        if 'example' not in text_lower:
             strategies.append("Add real-world examples or case studies")
         
-        if not re.search(r'\d+%|\d+\s*dollars?', text):
+        if not re.search(r'\d+%|\d+\s*dollars?', doc.text):
             strategies.append("Include specific statistics or data")
         
-        if 'we tested' not in text.lower() and 'i tested' not in text.lower():
+        if 'we tested' not in text_lower and 'i tested' not in text_lower:
             strategies.append("Add original research or product testing")
         
         # Suggest unique angles
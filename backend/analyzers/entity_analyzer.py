@@ -1,5 +1,6 @@
 import re
 from collections import Counter
+from utils.parsed_document import ParsedDocument
 
 class EntityAnalyzer:
     def __init__(self):
@@ -9,6 +10,7 @@ class EntityAnalyzer:
                            'LinkedIn', 'Netflix', 'Tesla', 'OpenAI', 'Meta', 'YouTube']
     
     def analyze(self, text):
+        text = ParsedDocument.of(text).text
         score = 50
         feedback = []
         issues = []
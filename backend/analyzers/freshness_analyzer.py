@@ -1,19 +1,25 @@
 import re
 from datetime import datetime
+from utils.parsed_document import ParsedDocument
 
 class FreshnessAnalyzer:
     def __init__(self):
-        self.current_year = datetime.now().year
         self.months = ['january', 'february', 'march', 'april', 'may', 'june',
                       'july', 'august', 'september', 'october', 'november', 'december']
         self.time_indicators = ['today', 'yesterday', 'recent', 'latest', 'current', 
                                'now', 'currently', 'recently', 'new', 'updated']
     
+    @property
+    def current_year(self):
+        return datetime.now().year
+    
     def analyze(self, text):
+        doc = ParsedDocument.of(text)
+        text = doc.text
         score = 50
         feedback = []
         issues = []
-        text_lower = text.lower()
+        text_lower = doc.lower
         
         # Find year mentions
         years = re.findall(r'\b(19|20)\d{2}\b', text)
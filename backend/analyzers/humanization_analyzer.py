@@ -1,6 +1,7 @@
 import re
 import statistics
 from collections import Counter
+from utils.parsed_document import ParsedDocument
 
 class HumanizationAnalyzer:
     """Analyze content for human-like writing patterns"""
@@ -8,14 +9,16 @@ class HumanizationAnalyzer:
     def analyze(self, text):
         """
         Analyze humanization aspects of content
+        `text` may be a string or a shared ParsedDocument
         Returns dict with: score, issues, recommendations, details
         """
+        doc = ParsedDocument.of(text)
         issues = []
         recommendations = []
         details = {}
         
         # 1. Sentence Variety Analysis
-        sentence_data = self._analyze_sentence_variety(text)
+        sentence_data = self._analyze_sentence_variety(doc)
         details['sentence_variety'] = sentence_data
         
         if sentence_data['starter_repetition'] > 30:
@@ -27,7 +30,7 @@ class HumanizationAnalyzer:
             recommendations.append("Mix short punchy sentences with longer complex ones")
         
         # 2. AI Pattern Detection
-        ai_patterns = self._detect_ai_patterns(text)
+        ai_patterns = self._detect_ai_patterns(doc)
         details['ai_patterns'] = ai_patterns
         
         if ai_patterns['ai_phrases_count'] > 5:
@@ -39,7 +42,7 @@ class HumanizationAnalyzer:
             recommendations.append("Reduce transition phrases like 'moreover', 'furthermore', 'in conclusion'")
         
         # 3. Natural Flow Analysis
-        flow_data = self._analyze_natural_flow(text)
+        flow_data = self._analyze_natural_flow(doc)
         details['flow'] = flow_data
         
         if not flow_data['has_contractions']:
@@ -51,7 +54,7 @@ class HumanizationAnalyzer:
             recommendations.append("Use more active voice for engaging writing")
         
         # 4. Vocabulary Analysis
-        vocab_data = self._analyze_vocabulary(text)
+        vocab_data = self._analyze_vocabulary(doc)
         details['vocabulary'] = vocab_data
         
         if vocab_data['unique_word_ratio'] < 40:
@@ -59,7 +62,7 @@ class HumanizationAnalyzer:
             recommendations.append("Use synonyms and varied expressions")
         
         # 5. Conversational Elements
-        conversational_data = self._analyze_conversational_elements(text)
+        conversational_data = self._analyze_conversational_elements(doc)
         details['conversational'] = conversational_data
         
         if conversational_data['personal_pronouns'] == 0:
@@ -77,10 +80,9 @@ class HumanizationAnalyzer:
             'good_points': self._get_good_points(sentence_data, ai_patterns, flow_data, conversational_data)
         }
     
-    def _analyze_sentence_variety(self, text):
+    def _analyze_sentence_variety(self, doc):
         """Analyze sentence structure variety"""
-        sentences = re.split(r'[.!?]+', text)
-        sentences = [s.strip() for s in sentences if len(s.strip()) > 10]
+        sentences = [s.strip() for s in doc.sentences if len(s.strip()) > 10]
         
         if not sentences:
             return {'starter_repetition': 0, 'avg_length': 0, 'length_std_dev': 0}
@@ -114,9 +116,9 @@ class HumanizationAnalyzer:
             'total_sentences': len(sentences)
         }
     
-    def _detect_ai_patterns(self, text):
+    def _detect_ai_patterns(self, doc):
         """Detect common AI writing patterns"""
-        text_lower = text.lower()
+        text_lower = doc.lower
         
         # Common AI phrases
         ai_phrases = [
@@ -155,7 +157,7 @@ class HumanizationAnalyzer:
         overused_transitions = sum(text_lower.count(word) for word in formal_transitions)
         
         # Check for repetitive structure (every paragraph starts the same)
-        paragraphs = text.split('\n\n')
+        paragraphs = doc.paragraphs
         paragraph_starters = [p.split()[0].lower() for p in paragraphs if p.strip() and len(p.split()) > 0]
         starter_variety = len(set(paragraph_starters)) / len(paragraph_starters) if paragraph_starters else 1
         
@@ -165,8 +167,10 @@ class HumanizationAnalyzer:
             'paragraph_starter_variety': starter_variety
         }
     
-    def _analyze_natural_flow(self, text):
+    def _analyze_natural_flow(self, doc):
         """Analyze natural flow and voice"""
+        text = doc.text
+        
         # Check for contractions
         contractions = ["n't", "'ll", "'ve", "'re", "'m", "'d", "'s"]
         has_contractions = any(contraction in text for contraction in contractions)
@@ -178,7 +182,7 @@ class HumanizationAnalyzer:
             r'\b(?:was|were|is|are|been|be)\s+\w+en\b'
         ]
         passive_matches = sum(len(re.findall(pattern, text)) for pattern in passive_patterns)
-        total_sentences = len(re.split(r'[.!?]+', text))
+        total_sentences = len(doc.sentences)
         passive_voice_ratio = (passive_matches / total_sentences * 100) if total_sentences > 0 else 0
         
         # Check for questions (engaging element)
@@ -195,9 +199,9 @@ class HumanizationAnalyzer:
             'exclamation_count': exclamation_count
         }
     
-    def _analyze_vocabulary(self, text):
+    def _analyze_vocabulary(self, doc):
         """Analyze vocabulary diversity"""
-        words = re.findall(r'\b[a-zA-Z]{3,}\b', text.lower())
+        words = doc.alpha_words
         
         if not words:
             return {'unique_word_ratio': 0, 'total_words': 0, 'unique_words': 0}
@@ -222,16 +226,16 @@ class HumanizationAnalyzer:
             'most_repeated': most_repeated
         }
     
-    def _analyze_conversational_elements(self, text):
+    def _analyze_conversational_elements(self, doc):
         """Analyze conversational writing elements"""
-        text_lower = text.lower()
+        text_lower = doc.lower
         
         # Count personal pronouns
         personal_pronouns = ['i', 'we', 'you', 'my', 'our', 'your']
-        personal_pronouns_count = sum(len(re.findall(r'\b' + pronoun + r'\b', text_lower)) for pronoun in personal_pronouns)
+        personal_pronouns_count = sum(doc.word_frequencies[pronoun] for pronoun in personal_pronouns)
         
         # Check for direct address
-        has_direct_address = bool(re.search(r'\byou\b', text_lower))
+        has_direct_address = doc.word_frequencies['you'] > 0
         
         # Check for storytelling elements
         storytelling_words = ['story', 'example', 'instance', 'case', 'experience', 'time when']
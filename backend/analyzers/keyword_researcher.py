@@ -1,5 +1,6 @@
-import requests
 import os
+from utils.http_client import get_http_client
+from utils.serp_cache import get_serp_cache
 from collections import defaultdict
 
 class KeywordResearcher:
@@ -12,6 +13,12 @@ class KeywordResearcher:
         
         # Fallback: Use Serper API for related searches
         self.serper_api_key = os.getenv('SERPER_API_KEY', 'f9028bc0510c22bdb4ccddfd7b6a5228d54d985c')
+        
+        # Shared keep-alive connection pools
+        self.http = get_http_client()
+        
+        # Persistent cache of SERP API responses
+        self.cache = get_serp_cache()
     
     def research_keywords(self, seed_keyword, max_results=20):
         """
@@ -50,23 +57,9 @@ class KeywordResearcher:
         """Get keyword suggestions from APIs"""
         try:
             # Try Serper API for related searches
-            response = requests.post(
-                'https://google.serper.dev/search',
-                headers={
-                    'X-API-KEY': self.serper_api_key,
-                    'Content-Type': 'application/json'
-                },
-                json={
-                    'q': seed_keyword,
-                    'num': 10,
-                    'gl': 'us',
-                    'hl': 'en'
-                },
-                timeout=10
-            )
+            data = self._fetch_related_searches(seed_keyword)
             
-            if response.status_code == 200:
-                data = response.json()
+            if data is not None:
                 keywords = []
                 
                 # Extract "People Also Ask" questions as keywords
@@ -107,6 +100,43 @@ class KeywordResearcher:
         # Fallback: Generate algorithmic suggestions
         return self._generate_keyword_variations(seed_keyword, max_results)
     
+    def _fetch_related_searches(self, seed_keyword):
+        """
+        Fetch People Also Ask and related searches from Serper
+        Responses are cached so repeated research skips the paid API call
+        Returns dict with: peopleAlsoAsk, relatedSearches (None on API error)
+        """
+        cached = self.cache.get('related', seed_keyword, 10)
+        if cached is not None:
+            print(f"✓ Using cached related searches for: {seed_keyword}")
+            return cached
+        
+        response = self.http.post(
+            'https://google.serper.dev/search',
+            headers={
+                'X-API-KEY': self.serper_api_key,
+                'Content-Type': 'application/json'
+            },
+            json={
+                'q': seed_keyword,
+                'num': 10,
+                'gl': 'us',
+                'hl': 'en'
+            },
+            timeout=10
+        )
+        
+        if response.status_code != 200:
+            return None
+        
+        data = response.json()
+        related = {
+            'peopleAlsoAsk': data.get('peopleAlsoAsk', []),
+            'relatedSearches': data.get('relatedSearches', [])
+        }
+        self.cache.set('related', seed_keyword, 10, related)
+        return related
+    
     def _generate_keyword_variations(self, seed_keyword, max_results):
         """Generate keyword variations algorithmically"""
         keywords = []
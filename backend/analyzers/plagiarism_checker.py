@@ -1,19 +1,20 @@
 import re
 import hashlib
 from collections import defaultdict
+from utils.parsed_document import ParsedDocument
 
 class PlagiarismChecker:
     def __init__(self):
         self.ngram_size = 8
     
     def analyze(self, text):
+        doc = ParsedDocument.of(text)
         score = 100
         feedback = []
         issues = []
         
         # Clean text
-        text_clean = re.sub(r'[^\w\s]', '', text.lower())
-        words = text_clean.split()
+        words = doc.normalized_words
         
         if len(words) < 50:
             return {
@@ -64,7 +65,7 @@ class PlagiarismChecker:
             r'copyright \d{4}'
         ]
         
-        boilerplate_count = sum(1 for pattern in boilerplate_patterns if re.search(pattern, text.lower()))
+        boilerplate_count = sum(1 for pattern in boilerplate_patterns if re.search(pattern, doc.lower))
         if boilerplate_count > 2:
             score -= 5
             feedback.append('Contains standard boilerplate content')
@@ -75,7 +76,7 @@ class PlagiarismChecker:
             'it goes without saying', 'needless to say', 'at the end of the day'
         ]
         
-        generic_count = sum(1 for phrase in generic_phrases if phrase in text.lower())
+        generic_count = sum(1 for phrase in generic_phrases if phrase in doc.lower)
         if generic_count > 3:
             score -= 10
             issues.append('Overuse of generic phrases')
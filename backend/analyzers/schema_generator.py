@@ -1,23 +1,28 @@
 import json
 import re
 from datetime import datetime
+from utils.parsed_document import ParsedDocument
 
 class SchemaGenerator:
-    def __init__(self):
-        self.current_date = datetime.now().isoformat()
+    @property
+    def current_date(self):
+        return datetime.now().isoformat()
     
     def generate(self, text, url='', keyword='', content_type='Article'):
+        doc = ParsedDocument.of(text)
+        text = doc.text
+        
         # Extract first heading as potential title
-        title = self._extract_title(text, keyword)
+        title = self._extract_title(doc, keyword)
         
         # Extract author if mentioned
         author = self._extract_author(text)
         
         # Generate description from first paragraph
-        description = self._extract_description(text)
+        description = self._extract_description(doc)
         
         # Detect content type
-        detected_type = self._detect_content_type(text)
+        detected_type = self._detect_content_type(doc)
         if detected_type:
             content_type = detected_type
         
@@ -27,7 +32,7 @@ class SchemaGenerator:
         elif content_type == 'HowTo':
             schema = self._generate_howto_schema(title, description, text, url)
         elif content_type == 'FAQ':
-            schema = self._generate_faq_schema(text)
+            schema = self._generate_faq_schema(doc)
         elif content_type == 'Product':
             schema = self._generate_product_schema(title, description, text)
         else:
@@ -39,9 +44,9 @@ class SchemaGenerator:
             'json_ld': json.dumps(schema, indent=2)
         }
     
-    def _extract_title(self, text, keyword):
+    def _extract_title(self, doc, keyword):
         # Try to find a title in first line or use keyword
-        lines = text.split('\n')
+        lines = doc.lines
         first_line = lines[0].strip() if lines else ''
         
         if len(first_line) > 10 and len(first_line) < 100:
@@ -49,7 +54,7 @@ class SchemaGenerator:
         elif keyword:
             return keyword.title()
         else:
-            words = text.split()[:10]
+            words = doc.words[:10]
             return ' '.join(words) + '...'
     
     def _extract_author(self, text):
@@ -67,18 +72,18 @@ class SchemaGenerator:
         
         return 'Content Team'
     
-    def _extract_description(self, text):
+    def _extract_description(self, doc):
         # Get first paragraph as description
-        paragraphs = [p.strip() for p in text.split('\n\n') if p.strip()]
+        paragraphs = [p.strip() for p in doc.paragraphs if p.strip()]
         if paragraphs:
             desc = paragraphs[0]
             if len(desc) > 160:
                 desc = desc[:157] + '...'
             return desc
-        return text[:160]
+        return doc.text[:160]
     
-    def _detect_content_type(self, text):
-        text_lower = text.lower()
+    def _detect_content_type(self, doc):
+        text_lower = doc.lower
         
         # HowTo detection
         if any(phrase in text_lower for phrase in ['step 1', 'step 2', 'how to', 'steps:', 'instructions:']):
@@ -133,12 +138,12 @@ class SchemaGenerator:
             'url': url
         }
     
-    def _generate_faq_schema(self, text):
+    def _generate_faq_schema(self, doc):
         # Extract Q&A pairs
         qa_pairs = []
         
         # Find questions (lines ending with ?)
-        lines = text.split('\n')
+        lines = doc.lines
         for i, line in enumerate(lines):
             if '?' in line:
                 question = line.strip()
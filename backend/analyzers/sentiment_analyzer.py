@@ -1,5 +1,5 @@
-import re
 from textblob import TextBlob
+from utils.parsed_document import ParsedDocument
 
 class SentimentAnalyzer:
     def __init__(self):
@@ -9,6 +9,9 @@ class SentimentAnalyzer:
                                'disappointing', 'useless', 'waste', 'avoid']
     
     def analyze(self, text):
+        doc = ParsedDocument.of(text)
+        text = doc.text
+        
         try:
             blob = TextBlob(text)
             polarity = blob.sentiment.polarity
@@ -44,7 +47,7 @@ class SentimentAnalyzer:
             score += 5
         
         # Emotional language detection
-        text_lower = text.lower()
+        text_lower = doc.lower
         positive_count = sum(1 for word in self.positive_words if word in text_lower)
         negative_count = sum(1 for word in self.negative_words if word in text_lower)
         
@@ -58,8 +61,7 @@ class SentimentAnalyzer:
             issues.append('Excessive negative language')
         
         # Sentence variety (emotional range)
-        sentences = re.split(r'[.!?]+', text)
-        sentences = [s.strip() for s in sentences if s.strip()]
+        sentences = [s.strip() for s in doc.sentences if s.strip()]
         
         if len(sentences) > 5:
             exclamations = text.count('!')
@@ -1,6 +1,7 @@
 import re
 import textstat
 from collections import Counter
+from utils.parsed_document import ParsedDocument
 
 class SEOAnalyzer:
     """Analyze content for SEO optimization"""
@@ -8,14 +9,16 @@ class SEOAnalyzer:
     def analyze(self, text, headers, meta_description, target_keyword):
         """
         Analyze SEO aspects of content
+        `text` may be a string or a shared ParsedDocument
         Returns dict with: score, issues, recommendations, details
         """
+        doc = ParsedDocument.of(text)
         issues = []
         recommendations = []
         details = {}
         
         # 1. Keyword Density Analysis
-        keyword_data = self._analyze_keyword_density(text, target_keyword)
+        keyword_data = self._analyze_keyword_density(doc, target_keyword)
         details['keyword_density'] = keyword_data
         
         if keyword_data['density'] < 0.5:
@@ -26,7 +29,7 @@ class SEOAnalyzer:
             recommendations.append("Reduce keyword mentions to 1.0-2.5% density for natural flow")
         
         # 2. Readability Analysis
-        readability_data = self._analyze_readability(text)
+        readability_data = self._analyze_readability(doc.text)
         details['readability'] = readability_data
         
         if readability_data['flesch_ease'] < 60:
@@ -64,7 +67,7 @@ class SEOAnalyzer:
             recommendations.append("Shorten meta description to 150-160 characters")
         
         # 5. Content Length
-        word_count = len(text.split())
+        word_count = doc.word_count
         details['word_count'] = word_count
         
         if word_count < 300:
@@ -82,7 +85,7 @@ class SEOAnalyzer:
             'good_points': self._get_good_points(keyword_data, readability_data, header_data, meta_data, word_count)
         }
     
-    def _analyze_keyword_density(self, text, keyword):
+    def _analyze_keyword_density(self, doc, keyword):
         """Calculate keyword density and stats"""
         if not keyword:
             return {
@@ -91,14 +94,14 @@ class SEOAnalyzer:
                 'recommended_count': 0
             }
         
-        text_lower = text.lower()
+        text_lower = doc.lower
         keyword_lower = keyword.lower()
         
         # Count occurrences
         count = text_lower.count(keyword_lower)
         
         # Calculate density
-        total_words = len(text.split())
+        total_words = doc.word_count
         keyword_words = len(keyword.split())
         density = (count * keyword_words / total_words * 100) if total_words > 0 else 0
         
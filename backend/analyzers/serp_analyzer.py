@@ -1,18 +1,24 @@
 from utils.serp_scraper import SERPScraper
+from utils.competitor_corpus import CompetitorCorpus
+from utils.parsed_document import ParsedDocument
 import re
 from collections import Counter
 
 class SERPAnalyzer:
     """Analyze content against SERP competitors"""
     
-    def __init__(self):
-        self.scraper = SERPScraper()
+    def __init__(self, scraper=None):
+        self.scraper = scraper or SERPScraper()
     
-    def analyze(self, text, target_keyword, current_url=None):
+    def analyze(self, text, target_keyword, current_url=None, corpus=None):
         """
         Analyze content performance against SERP results
+        Pass a shared CompetitorCorpus to reuse its SERP results and competitor pages
+        `text` may be a string or a shared ParsedDocument
         Returns dict with: score, issues, recommendations, details
         """
+        doc = ParsedDocument.of(text)
+        
         if not target_keyword:
             return self._no_keyword_response()
         
@@ -20,15 +26,17 @@ class SERPAnalyzer:
         recommendations = []
         
         # Get SERP results
-        serp_results = self.scraper.search_google(target_keyword, num_results=10)
+        if corpus is None:
+            corpus = CompetitorCorpus(target_keyword, self.scraper)
+        corpus.prefetch(10)  # Fetch competitor pages in parallel (no-op if already fetched)
         
         # Analyze competitor content
-        competitor_data = self._analyze_competitors(serp_results)
+        competitor_data = self._analyze_competitors(corpus)
         
         # Analyze current content
-        current_word_count = len(text.split())
-        current_topics = self._extract_topics(text)
-        current_elements = self._check_content_elements(text)
+        current_word_count = doc.word_count
+        current_topics = self._extract_topics(doc.lower)
+        current_elements = self._check_content_elements(doc)
         
         # Compare word count
         avg_word_count = competitor_data['avg_word_count']
@@ -58,7 +66,7 @@ class SERPAnalyzer:
             recommendations.append("Add bullet lists for scannable content")
             
         # Analyze Backlink Potential
-        backlink_potential = self._analyze_backlink_potential(text, current_elements)
+        backlink_potential = self._analyze_backlink_potential(doc, current_elements)
         if backlink_potential['score'] < 50:
             issues.append("Low backlink potential (content lacks linkable assets)")
             recommendations.append("Add linkable assets: original data, unique definitions, or expert quotes")
@@ -97,7 +105,7 @@ class SERPAnalyzer:
             'missing_topics': list(missing_topics)[:5]
         }
     
-    def _analyze_competitors(self, serp_results):
+    def _analyze_competitors(self, corpus):
         """Analyze top 10 SERP results"""
         total_words = 0
         all_topics = []
@@ -108,14 +116,14 @@ class SERPAnalyzer:
         total_data_points = 0
         valid_results = 0
         
-        for result in serp_results[:10]:
+        for result in corpus.top_results(10):
             try:
-                content = self.scraper.extract_page_content(result['url'])
+                content = corpus.get_page(result['url'])
                 
                 if content['word_count'] > 100:  # Valid page
                     valid_results += 1
                     total_words += content['word_count']
-                    all_topics.extend(self._extract_topics(content['text']))
+                    all_topics.extend(self._extract_topics(content['text'].lower()))
                     
                     if content.get('has_tables', False):
                         with_comparisons += 1
@@ -153,8 +161,8 @@ class SERPAnalyzer:
             'avg_data_points': avg_data_points
         }
     
-    def _extract_topics(self, text):
-        """Extract main topics/subtopics from text"""
+    def _extract_topics(self, text_lower):
+        """Extract main topics/subtopics from lowercased text"""
         # Simple topic extraction based on noun phrases and key terms
         topics = set()
         
@@ -166,15 +174,17 @@ class SERPAnalyzer:
         ]
         
         for pattern in patterns:
-            matches = re.findall(pattern, text.lower())
+            matches = re.findall(pattern, text_lower)
             topics.update(matches[:20])  # Limit topics
         
         return topics
     
-    def _check_content_elements(self, text):
+    def _check_content_elements(self, doc):
         """Check for specific content elements"""
+        text = doc.text
+        
         # Check for comparisons
-        has_comparison = bool(re.search(r'\b(?:vs|versus|compared to|comparison|better than|versus)\b', text.lower()))
+        has_comparison = bool(re.search(r'\b(?:vs|versus|compared to|comparison|better than|versus)\b', doc.lower))
         
         # Count data points
         data_points = len(re.findall(r'\d+[%$]|\d+\s*(?:percent|dollars|years|months|times|hours)', text))
@@ -289,7 +299,7 @@ class SERPAnalyzer:
             'missing_topics': []
         }
     
-    def _analyze_backlink_potential(self, text, current_elements):
+    def _analyze_backlink_potential(self, doc, current_elements):
         """Analyze potential for attracting backlinks"""
         score = 0
         assets = []
@@ -302,7 +312,7 @@ class SERPAnalyzer:
             score += 15
             
         # Check for definitions ("is defined as", "refers to")
-        if re.search(r'\b(is defined as|refers to|means)\b', text.lower()):
+        if re.search(r'\b(is defined as|refers to|means)\b', doc.lower):
             score += 20
             assets.append("Definitional Content")
             
@@ -317,7 +327,7 @@ class SERPAnalyzer:
             assets.append("Expert Quotes")
             
         # Check for length (long-form content gets more links)
-        word_count = len(text.split())
+        word_count = doc.word_count
         if word_count > 2000:
             score += 15
             assets.append("Long-form Guide")
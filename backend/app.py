@@ -1,4 +1,4 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, request, jsonify, send_file, stream_with_context
 from flask_cors import CORS
 import sys
 import os
@@ -11,28 +11,46 @@ load_dotenv()
 # Add the backend directory to the path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from analyzers.seo_analyzer import SEOAnalyzer
-from analyzers.serp_analyzer import SERPAnalyzer
-from analyzers.aeo_analyzer import AEOAnalyzer
-from analyzers.humanization_analyzer import HumanizationAnalyzer
-from analyzers.differentiation_analyzer import DifferentiationAnalyzer
-from analyzers.keyword_researcher import KeywordResearcher
-from analyzers.content_comparator import ContentComparator
-from analyzers.sentiment_analyzer import SentimentAnalyzer
-from analyzers.entity_analyzer import EntityAnalyzer
-from analyzers.freshness_analyzer import FreshnessAnalyzer
-from analyzers.plagiarism_checker import PlagiarismChecker
-from analyzers.schema_generator import SchemaGenerator
-from utils.text_extractor import TextExtractor
-from utils.pdf_generator import PDFReportGenerator
-from utils.serp_scraper import SERPScraper
-from utils.history_tracker import HistoryTracker
-from utils.ai_improver import AIContentImprover
-from utils.share_link_manager import ShareLinkManager
+from utils.service_registry import ServiceRegistry
+from utils.analysis_engine import AnalysisEngine, AnalysisTask
+from utils.job_manager import JobManager
+from utils.batch_engine import BatchEngine
+from utils.history_tracker import PROGRESS_BUCKETS
+from utils.retention_manager import RetentionManager
+from utils.competitor_corpus import CompetitorCorpus
+from utils.parsed_document import ParsedDocument
+from utils.serp_cache import get_serp_cache
+from utils.page_cache import get_page_cache
 
 app = Flask(__name__)
 CORS(app)
 
+# Shared engine that runs independent analyzers concurrently
+analysis_engine = AnalysisEngine()
+
+# Analyzers and services are created once and shared by every request
+services = ServiceRegistry()
+
+# Bounded worker pool for asynchronous audit jobs
+job_manager = JobManager()
+
+@app.teardown_appcontext
+def close_connections(error=None):
+    """Close the request thread's SQLite connections (the development server starts a thread per request)"""
+    services.close_connections()
+
+# Analyzers whose scores feed the overall score, in weighting order
+SCORED_ANALYZERS = [
+    'seo', 'serp_performance', 'aeo', 'humanization', 'differentiation',
+    'sentiment', 'entities', 'freshness', 'plagiarism'
+]
+
+# Every analyzer in a full report
+REPORT_ANALYZERS = SCORED_ANALYZERS + ['schema']
+
+# Subset of analyzers used for batch audits
+BATCH_ANALYZERS = ['seo', 'serp_performance', 'aeo', 'humanization', 'differentiation']
+
 @app.route('/')
 def root():
     """Root endpoint - shows API info and available routes"""
@@ -57,7 +75,24 @@ def root():
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
-    return jsonify({"status": "healthy", "message": "Content Audit API is running"})
+    return jsonify({
+        "status": "healthy",
+        "message": "Content Audit API is running",
+        "jobs": job_manager.stats()
+    })
+
+@app.route('/api/cache/stats', methods=['GET'])
+def get_cache_stats():
+    """Get SERP and competitor page cache counters"""
+    try:
+        return jsonify({
+            "serp": get_serp_cache().stats(),
+            "pages": get_page_cache().stats()
+        })
+    
+    except Exception as e:
+        print(f"Error in get_cache_stats: {str(e)}")
+        return jsonify({"error": str(e)}), 500
 
 @app.route('/api/analyze', methods=['POST'])
 def analyze_content():
@@ -70,81 +105,20 @@ def analyze_content():
             return jsonify({"error": "No input provided"}), 400
         
         # Extract text and metadata
-        extractor = TextExtractor()
-        content_data = extractor.extract(input_data)
+        content = extract_content(input_data, target_keyword)
         
-        if not content_data['text']:
+        if content is None:
             return jsonify({"error": "Could not extract text from input"}), 400
         
-        text = content_data['text']
-        url = content_data.get('url')
-        headers = content_data.get('headers', [])
-        meta_description = content_data.get('meta_description', '')
-        
-        # Auto-detect target keyword if not provided
-        if not target_keyword and headers:
-            target_keyword = headers[0] if headers else ''
-        
-        # Initialize analyzers
-        seo_analyzer = SEOAnalyzer()
-        serp_analyzer = SERPAnalyzer()
-        aeo_analyzer = AEOAnalyzer()
-        humanization_analyzer = HumanizationAnalyzer()
-        differentiation_analyzer = DifferentiationAnalyzer()
-        sentiment_analyzer = SentimentAnalyzer()
-        entity_analyzer = EntityAnalyzer()
-        freshness_analyzer = FreshnessAnalyzer()
-        plagiarism_checker = PlagiarismChecker()
-        schema_generator = SchemaGenerator()
-        
-        # Run all analyses
-        seo_result = seo_analyzer.analyze(text, headers, meta_description, target_keyword)
-        serp_result = serp_analyzer.analyze(text, target_keyword, url)
-        aeo_result = aeo_analyzer.analyze(text, headers)
-        humanization_result = humanization_analyzer.analyze(text)
-        differentiation_result = differentiation_analyzer.analyze(text, target_keyword)
-        sentiment_result = sentiment_analyzer.analyze(text)
-        entity_result = entity_analyzer.analyze(text)
-        freshness_result = freshness_analyzer.analyze(text)
-        plagiarism_result = plagiarism_checker.analyze(text)
-        schema_result = schema_generator.generate(text, url or '', target_keyword)
-        
-        # Compile results
-        results = {
-            "input_type": "url" if content_data.get('is_url') else "text",
-            "url": url,
-            "word_count": len(text.split()),
-            "target_keyword": target_keyword,
-            "seo": seo_result,
-            "serp_performance": serp_result,
-            "aeo": aeo_result,
-            "humanization": humanization_result,
-            "differentiation": differentiation_result,
-            "sentiment": sentiment_result,
-            "entities": entity_result,
-            "freshness": freshness_result,
-            "plagiarism": plagiarism_result,
-            "schema": schema_result,
-            "overall_score": calculate_overall_score([
-                seo_result['score'],
-                serp_result['score'],
-                aeo_result['score'],
-                humanization_result['score'],
-                differentiation_result['score'],
-                sentiment_result['score'],
-                entity_result['score'],
-                freshness_result['score'],
-                plagiarism_result['score']
-            ])
-        }
+        # Run all analyses (independent analyzers run concurrently)
+        analysis = run_analysis(
+            content['text'], content['headers'], content['meta_description'],
+            content['target_keyword'], content['url']
+        )
         
-        # Save to history
-        try:
-            tracker = HistoryTracker()
-            analysis_id = tracker.save_analysis(results)
-            results['analysis_id'] = analysis_id
-        except Exception as e:
-            print(f"Warning: Could not save to history: {str(e)}")
+        # Compile results and save to history
+        results = compile_results(content, analysis)
+        save_results(results)
         
         return jsonify(results)
     
@@ -152,6 +126,225 @@ def analyze_content():
         print(f"Error in analyze_content: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/analyze/stream', methods=['POST'])
+def analyze_content_stream():
+    """
+    Same analysis as /api/analyze, streamed as Server-Sent Events.
+    Emits one 'analyzer' event per analyzer as soon as it finishes,
+    then a 'complete' event with overall_score and analysis_id.
+    """
+    try:
+        data = request.json
+        input_data = data.get('input', '')
+        target_keyword = data.get('target_keyword', '')
+        
+        if not input_data:
+            return jsonify({"error": "No input provided"}), 400
+        
+        content = extract_content(input_data, target_keyword)
+        
+        if content is None:
+            return jsonify({"error": "Could not extract text from input"}), 400
+    
+    except Exception as e:
+        print(f"Error in analyze_content_stream: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+    
+    def generate():
+        analysis = {}
+        tasks = build_analysis_tasks(
+            content['text'], content['headers'], content['meta_description'],
+            content['target_keyword'], content['url']
+        )
+        
+        try:
+            # Fast text analyzers finish first; SERP-backed ones follow once the corpus is fetched
+            for name, result in analysis_engine.iter_results(tasks):
+                if name == 'corpus':
+                    continue
+                analysis[name] = result
+                yield format_sse('analyzer', {"name": name, "result": result})
+            
+            results = compile_results(content, analysis)
+            save_results(results)
+            
+            summary = {key: value for key, value in results.items() if key not in analysis}
+            yield format_sse('complete', summary)
+        
+        except Exception as e:
+            print(f"Error in analyze_content_stream: {str(e)}")
+            yield format_sse('error', {"error": str(e)})
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'  # Stop nginx from buffering the stream
+        }
+    )
+
+@app.route('/api/jobs/analyze', methods=['POST'])
+def create_analysis_job():
+    """Queue a full analysis in the background and return its job id right away"""
+    try:
+        data = request.json
+        input_data = data.get('input', '')
+        target_keyword = data.get('target_keyword', '')
+        
+        if not input_data:
+            return jsonify({"error": "No input provided"}), 400
+        
+        job = job_manager.submit(run_analysis_job, input_data, target_keyword, steps=REPORT_ANALYZERS)
+        
+        if job is None:
+            response = jsonify({"error": "Too many analyses in progress, please retry shortly"})
+            response.headers['Retry-After'] = '5'
+            return response, 503
+        
+        return jsonify({
+            "job_id": job.id,
+            "status": job.status,
+            "status_url": f"/api/jobs/{job.id}"
+        }), 202
+    
+    except Exception as e:
+        print(f"Error in create_analysis_job: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_analysis_job(job_id):
+    """Get per-analyzer progress of a job, and its report once completed"""
+    try:
+        job = job_manager.get(job_id)
+        
+        if job is None:
+            return jsonify({"error": "Job not found or expired"}), 404
+        
+        return jsonify(job)
+    
+    except Exception as e:
+        print(f"Error in get_analysis_job: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+def run_analysis_job(job, input_data, target_keyword):
+    """Job worker: extract, analyze and save a report, marking analyzers done as they finish"""
+    content = extract_content(input_data, target_keyword)
+    
+    if content is None:
+        raise ValueError("Could not extract text from input")
+    
+    analysis = {}
+    tasks = build_analysis_tasks(
+        content['text'], content['headers'], content['meta_description'],
+        content['target_keyword'], content['url']
+    )
+    
+    for name, result in analysis_engine.iter_results(tasks):
+        if name == 'corpus':
+            continue
+        analysis[name] = result
+        job.complete_step(name)
+    
+    results = compile_results(content, analysis)
+    save_results(results)
+    return results
+
+def format_sse(event, payload):
+    """Format a payload as a Server-Sent Event"""
+    return f"event: {event}\ndata: {app.json.dumps(payload)}\n\n"
+
+def extract_content(input_data, target_keyword=''):
+    """
+    Extract text and metadata from a URL or raw text
+    Returns dict with: text, url, headers, meta_description, target_keyword, input_type
+    (None if no text could be extracted)
+    """
+    content_data = services.text_extractor.extract(input_data)
+    
+    if not content_data['text']:
+        return None
+    
+    headers = content_data.get('headers', [])
+    
+    # Auto-detect target keyword if not provided
+    if not target_keyword and headers:
+        target_keyword = headers[0] if headers else ''
+    
+    return {
+        # Tokenize once; every analyzer reads from the same parsed document
+        "text": ParsedDocument(content_data['text']),
+        "url": content_data.get('url'),
+        "headers": headers,
+        "meta_description": content_data.get('meta_description', ''),
+        "target_keyword": target_keyword,
+        "input_type": "url" if content_data.get('is_url') else "text"
+    }
+
+def compile_results(content, analysis):
+    """Combine content metadata and analyzer results into the full report"""
+    return {
+        "input_type": content['input_type'],
+        "url": content['url'],
+        "word_count": content['text'].word_count,
+        "target_keyword": content['target_keyword'],
+        **analysis,
+        "overall_score": calculate_overall_score([analysis[name]['score'] for name in SCORED_ANALYZERS])
+    }
+
+def save_results(results):
+    """Save a report to history and record its analysis_id (history is best effort)"""
+    try:
+        results['analysis_id'] = services.history.save_analysis(results)
+    except Exception as e:
+        print(f"Warning: Could not save to history: {str(e)}")
+
+def run_analysis(text, headers, meta_description, target_keyword, url, names=None, corpus=None, similarities=None):
+    """Run the analyzer graph and return results keyed by analyzer name"""
+    analysis = analysis_engine.run(
+        build_analysis_tasks(text, headers, meta_description, target_keyword, url, names, corpus, similarities)
+    )
+    analysis.pop('corpus', None)
+    return analysis
+
+def build_analysis_tasks(text, headers, meta_description, target_keyword, url, names=None, corpus=None, similarities=None):
+    """
+    Build the analyzer task graph for a single piece of content
+    Pass `corpus` to reuse a CompetitorCorpus shared with other content (e.g. a batch keyword group)
+    and `similarities` to reuse competitor TF-IDF similarities computed for the whole batch
+    """
+    text = ParsedDocument.of(text)
+    
+    # SERP-backed analyzers share one competitor corpus per request
+    corpus_tasks = []
+    corpus_kwargs = {}
+    if corpus is not None:
+        corpus_kwargs['corpus'] = corpus
+    elif target_keyword:
+        corpus_tasks.append(AnalysisTask('corpus', CompetitorCorpus.build, (target_keyword, services.scraper), kind='network'))
+    corpus_deps = [task.name for task in corpus_tasks]
+    
+    tasks = [
+        AnalysisTask('seo', services.seo.analyze, (text, headers, meta_description, target_keyword)),
+        AnalysisTask('serp_performance', services.serp.analyze, (text, target_keyword, url), corpus_kwargs,
+                     kind='network', depends_on=corpus_deps),
+        AnalysisTask('aeo', services.aeo.analyze, (text, headers)),
+        AnalysisTask('humanization', services.humanization.analyze, (text,)),
+        AnalysisTask('differentiation', services.differentiation.analyze, (text, target_keyword),
+                     dict(corpus_kwargs, similarities=similarities),
+                     kind='network', depends_on=corpus_deps),
+        AnalysisTask('sentiment', services.sentiment.analyze, (text,)),
+        AnalysisTask('entities', services.entities.analyze, (text,)),
+        AnalysisTask('freshness', services.freshness.analyze, (text,)),
+        AnalysisTask('plagiarism', services.plagiarism.analyze, (text,)),
+        AnalysisTask('schema', services.schema.generate, (text, url or '', target_keyword))
+    ]
+    
+    if names is not None:
+        tasks = [task for task in tasks if task.name in names]
+    
+    return corpus_tasks + tasks
+
 def calculate_overall_score(scores):
     """Calculate weighted average of all scores"""
     weights = [0.25, 0.25, 0.15, 0.15, 0.20]  # SEO, SERP, AEO, Human, Diff
@@ -168,8 +361,7 @@ def export_pdf():
             return jsonify({"error": "No analysis data provided"}), 400
         
         # Generate PDF
-        pdf_generator = PDFReportGenerator()
-        pdf_buffer = pdf_generator.generate_report(data)
+        pdf_buffer = services.pdf_generator.generate_report(data)
         
         # Generate filename with timestamp
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
@@ -199,8 +391,7 @@ def research_keywords():
             return jsonify({"error": "No keyword provided"}), 400
         
         # Research keywords
-        researcher = KeywordResearcher()
-        results = researcher.research_keywords(seed_keyword, max_results)
+        results = services.keyword_researcher.research_keywords(seed_keyword, max_results)
         
         return jsonify(results)
     
@@ -224,7 +415,7 @@ def compare_content():
             return jsonify({"error": "No target keyword provided for competitor analysis"}), 400
         
         # Get top competitor
-        scraper = SERPScraper()
+        scraper = services.scraper
         serp_results = scraper.search_google(target_keyword, num_results=1)
         
         if not serp_results:
@@ -237,8 +428,7 @@ def compare_content():
         competitor_data['title'] = serp_results[0]['title']
         
         # Compare content
-        comparator = ContentComparator()
-        comparison = comparator.compare_with_competitor(
+        comparison = services.content_comparator.compare_with_competitor(
             your_content,
             competitor_data,
             your_metadata
@@ -260,28 +450,59 @@ def compare_content():
 def get_history():
     """Get analysis history"""
     try:
-        tracker = HistoryTracker()
+        tracker = services.history
         limit = int(request.args.get('limit', 50))
         keyword = request.args.get('keyword')
         url = request.args.get('url')
         
-        history = tracker.get_history(limit, keyword, url)
+        # Comma-separated column projection, e.g. fields=id,url,overall_score
+        fields = request.args.get('fields')
+        fields = [field.strip() for field in fields.split(',') if field.strip()] if fields else None
+        
+        # With a cursor parameter (empty for the first page) the response is a page envelope
+        if 'cursor' in request.args:
+            page = tracker.get_history_page(limit, keyword, url, fields, request.args.get('cursor') or None)
+            return jsonify(page)
+        
+        history = tracker.get_history(limit, keyword, url, fields)
         return jsonify(history)
     
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
     except Exception as e:
         print(f"Error in get_history: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/history/<int:analysis_id>', methods=['GET'])
+def get_history_entry(analysis_id):
+    """Get one saved analysis with its full results"""
+    try:
+        analysis = services.history.get_analysis(analysis_id)
+        
+        if not analysis:
+            return jsonify({"error": "Analysis not found"}), 404
+        
+        return jsonify(analysis)
+    
+    except Exception as e:
+        print(f"Error in get_history_entry: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
 @app.route('/api/history/progress', methods=['GET'])
 def get_progress():
     """Get score progression over time"""
     try:
-        tracker = HistoryTracker()
+        tracker = services.history
         keyword = request.args.get('keyword')
         url = request.args.get('url')
         days = int(request.args.get('days', 30))
+        bucket = request.args.get('bucket')
         
-        progress = tracker.get_progress_data(keyword, url, days)
+        if bucket and bucket not in PROGRESS_BUCKETS:
+            return jsonify({"error": f"bucket must be one of: {', '.join(PROGRESS_BUCKETS)}"}), 400
+        
+        progress = tracker.get_progress_data(keyword, url, days, bucket or None)
         return jsonify(progress)
     
     except Exception as e:
@@ -292,7 +513,7 @@ def get_progress():
 def get_statistics():
     """Get overall statistics"""
     try:
-        tracker = HistoryTracker()
+        tracker = services.history
         stats = tracker.get_statistics()
         return jsonify(stats)
     
@@ -308,15 +529,31 @@ def create_batch():
     try:
         data = request.json
         batch_name = data.get('name', f'Batch {datetime.now().strftime("%Y-%m-%d %H:%M")}')
-        urls = data.get('urls', [])
+        target_keyword = data.get('target_keyword', '')
         
-        if not urls or len(urls) == 0:
+        # URLs may be plain strings or {url, target_keyword} objects
+        items = []
+        for entry in data.get('urls', []):
+            if isinstance(entry, dict):
+                url = (entry.get('url') or '').strip()
+                keyword = entry.get('target_keyword') or target_keyword
+            else:
+                url = (entry or '').strip()
+                keyword = target_keyword
+            
+            if url:
+                items.append({"url": url, "target_keyword": keyword})
+        
+        if not items:
             return jsonify({"error": "No URLs provided"}), 400
         
-        tracker = HistoryTracker()
-        batch_id = tracker.create_batch(batch_name, urls)
+        tracker = services.history
+        batch_id = tracker.create_batch(batch_name, items)
         
-        return jsonify({"batch_id": batch_id, "total_urls": len(urls)})
+        # Analysis runs on the server; clients poll /api/batch/status/<batch_id>
+        batch_engine.enqueue(batch_id)
+        
+        return jsonify({"batch_id": batch_id, "total_urls": len(items), "status": "running"})
     
     except Exception as e:
         print(f"Error in create_batch: {str(e)}")
@@ -324,7 +561,7 @@ def create_batch():
 
 @app.route('/api/batch/analyze', methods=['POST'])
 def analyze_batch():
-    """Analyze a single URL from a batch"""
+    """Analyze a single URL from a batch (batches created via /api/batch/create already run server-side)"""
     try:
         data = request.json
         batch_id = data.get('batch_id')
@@ -334,55 +571,16 @@ def analyze_batch():
         if not batch_id or not url:
             return jsonify({"error": "Missing batch_id or url"}), 400
         
-        tracker = HistoryTracker()
+        tracker = services.history
         
         try:
-            # Extract and analyze
-            extractor = TextExtractor()
-            content_data = extractor.extract(url)
+            results = analyze_batch_url(url, target_keyword)
             
-            if not content_data['text']:
+            if results is None:
                 tracker.update_batch_item(batch_id, url, 'failed', error='Could not extract content')
                 return jsonify({"error": "Could not extract content"}), 400
             
-            # Run analysis (same as main analyze endpoint)
-            text = content_data['text']
-            headers = content_data.get('headers', [])
-            meta_description = content_data.get('meta_description', '')
-            
-            seo_analyzer = SEOAnalyzer()
-            serp_analyzer = SERPAnalyzer()
-            aeo_analyzer = AEOAnalyzer()
-            humanization_analyzer = HumanizationAnalyzer()
-            differentiation_analyzer = DifferentiationAnalyzer()
-            
-            seo_result = seo_analyzer.analyze(text, headers, meta_description, target_keyword)
-            serp_result = serp_analyzer.analyze(text, target_keyword, url)
-            aeo_result = aeo_analyzer.analyze(text, headers)
-            humanization_result = humanization_analyzer.analyze(text)
-            differentiation_result = differentiation_analyzer.analyze(text, target_keyword)
-            
-            results = {
-                "url": url,
-                "word_count": len(text.split()),
-                "target_keyword": target_keyword,
-                "seo": seo_result,
-                "serp_performance": serp_result,
-                "aeo": aeo_result,
-                "humanization": humanization_result,
-                "differentiation": differentiation_result,
-                "overall_score": calculate_overall_score([
-                    seo_result['score'],
-                    serp_result['score'],
-                    aeo_result['score'],
-                    humanization_result['score'],
-                    differentiation_result['score']
-                ])
-            }
-            
-            # Save to history and update batch
-            analysis_id = tracker.save_analysis(results)
-            tracker.update_batch_item(batch_id, url, 'completed', results['overall_score'], analysis_id=analysis_id)
+            tracker.update_batch_item(batch_id, url, 'completed', results['overall_score'], analysis_id=results['analysis_id'])
             
             return jsonify(results)
         
@@ -394,11 +592,52 @@ def analyze_batch():
         print(f"Error in analyze_batch: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+def analyze_batch_url(url, target_keyword='', corpus=None, content_data=None, similarities=None, save=True):
+    """
+    Extract, analyze (batch analyzer subset) and save one batch URL
+    Pass the keyword group's shared CompetitorCorpus to reuse its SERP data, already
+    extracted content_data, and batch-computed competitor similarities if available
+    With save=False the caller saves the results (e.g. in bulk with save_many)
+    Returns the results (with analysis_id when saved), or None if no content could be extracted
+    """
+    if content_data is None:
+        content_data = services.text_extractor.extract(url)
+    
+    if not content_data['text']:
+        return None
+    
+    text = ParsedDocument(content_data['text'])
+    headers = content_data.get('headers', [])
+    meta_description = content_data.get('meta_description', '')
+    
+    analysis = run_analysis(
+        text, headers, meta_description, target_keyword, url,
+        names=BATCH_ANALYZERS, corpus=corpus, similarities=similarities
+    )
+    
+    results = {
+        "url": url,
+        "word_count": text.word_count,
+        "target_keyword": target_keyword,
+        **analysis,
+        "overall_score": calculate_overall_score([analysis[name]['score'] for name in BATCH_ANALYZERS])
+    }
+    
+    if save:
+        results['analysis_id'] = services.history.save_analysis(results)
+    return results
+
+# Server-side worker pool that drains batches created via /api/batch/create
+batch_engine = BatchEngine(analyze_batch_url, services)
+
+# Archives, downsamples and vacuums old history (started with the server)
+retention_manager = RetentionManager(services.history)
+
 @app.route('/api/batch/status/<batch_id>', methods=['GET'])
 def get_batch_status(batch_id):
     """Get batch analysis status"""
     try:
-        tracker = HistoryTracker()
+        tracker = services.history
         status = tracker.get_batch_status(batch_id)
         return jsonify(status)
     
@@ -419,7 +658,7 @@ def get_ai_suggestions():
         if not content or not analysis_results:
             return jsonify({"error": "Missing content or analysis results"}), 400
         
-        improver = AIContentImprover()
+        improver = services.ai_improver
         suggestions = improver.analyze_and_suggest(content, analysis_results)
         
         return jsonify(suggestions)
@@ -440,7 +679,7 @@ def ai_rewrite():
         if not original_text:
             return jsonify({"error": "No text provided"}), 400
         
-        improver = AIContentImprover()
+        improver = services.ai_improver
         rewritten = improver.rewrite_section(original_text, improvement_goal, context)
         
         return jsonify({"original": original_text, "rewritten": rewritten})
@@ -461,7 +700,7 @@ def ai_generate():
         if not topic:
             return jsonify({"error": "No topic provided"}), 400
         
-        improver = AIContentImprover()
+        improver = services.ai_improver
         generated = improver.generate_missing_section(topic, context, target_keyword)
         
         return jsonify({"topic": topic, "generated_content": generated})
@@ -481,7 +720,7 @@ def create_share_link():
         if not results:
             return jsonify({"error": "No results provided"}), 400
         
-        share_manager = ShareLinkManager()
+        share_manager = services.share_links
         share_data = share_manager.create_share_link(results, expiry_days)
         
         # Generate full URL
@@ -498,7 +737,7 @@ def create_share_link():
 def get_shared_report(token):
     """Retrieve shared report by token"""
     try:
-        share_manager = ShareLinkManager()
+        share_manager = services.share_links
         results = share_manager.get_shared_report(token)
         
         if not results:
@@ -514,25 +753,10 @@ def get_shared_report(token):
 def clear_all_data():
     """Clear all analysis history, progress, and batch data"""
     try:
-        tracker = HistoryTracker()
-        
-        # Delete database file
-        db_path = tracker.db_path
-        if os.path.exists(db_path):
-            os.remove(db_path)
-        
-        # Reinitialize empty database
-        tracker._init_database()
-        
-        # Clear shared links if they exist
-        try:
-            from utils.share_link_manager import ShareLinkManager
-            share_manager = ShareLinkManager()
-            share_db = share_manager.db_path
-            if os.path.exists(share_db):
-                os.remove(share_db)
-        except:
-            pass
+        # Both are emptied in place, in one transaction each: batch workers and the
+        # share view flusher keep using their open connections
+        services.history.reset()
+        services.share_links.reset()
         
         return jsonify({
             "success": True,
@@ -543,8 +767,23 @@ def clear_all_data():
         print(f"Error in clear_all_data: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+def start_background_work():
+    """
+    Start the server's background work: called by `python app.py` and by the
+    WSGI entry point (api/index.py), not when app is imported (e.g. by tests)
+    """
+    # Continue batches interrupted by a restart (leases keep concurrent processes from double-claiming)
+    batch_engine.resume()
+    
+    # Archive, downsample and vacuum old history in the background
+    retention_manager.start()
+    
+    # Write buffered share view counts and remove expired share links in the background
+    services.share_links.start()
+
 if __name__ == '__main__':
     print("Starting Content Audit API...")
+    start_background_work()
     port = int(os.environ.get('PORT', 5000))
     print(f"API will be available at: http://0.0.0.0:{port}")
     app.run(debug=False, host='0.0.0.0', port=port)
@@ -0,0 +1,55 @@
+import os
+import sys
+import pytest
+
+# Tests import the backend the way app.py does (utils.*, analyzers.*)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.history_tracker import HistoryTracker
+
+class FakeClock:
+    """Stands in for the time module in modules that only call time.time()"""
+    
+    def __init__(self, now=1700000000.0):
+        self.now = now
+    
+    def time(self):
+        return self.now
+    
+    def advance(self, seconds):
+        self.now += seconds
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+@pytest.fixture
+def tracker(tmp_path):
+    tracker = HistoryTracker(db_path=str(tmp_path / 'history.db'))
+    yield tracker
+    tracker.close()
+
+@pytest.fixture(scope='session')
+def app_module(tmp_path_factory):
+    """
+    app.py, imported with its data directory inside a temp dir (its stores use paths
+    relative to the working directory) and SERP searches answered from the scraper's
+    mock results, so no test reaches the network or the real databases
+    """
+    previous = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp('app'))
+    
+    import app
+    scraper = app.services.scraper
+    scraper.search_google = lambda query, num_results=10, gl='us', hl='en': (
+        scraper._get_mock_serp_results(query)[:num_results]
+    )
+    
+    yield app
+    
+    app.batch_engine.shutdown(wait=False)
+    os.chdir(previous)
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
@@ -0,0 +1,109 @@
+import threading
+import pytest
+from utils.analysis_engine import AnalysisEngine, AnalysisTask
+
+@pytest.fixture
+def engine():
+    engine = AnalysisEngine(network_workers=4, cpu_workers=4, cpu_mode='thread')
+    yield engine
+    engine.shutdown()
+
+def test_dependency_results_are_passed_as_keyword_arguments(engine):
+    tasks = [
+        AnalysisTask('corpus', lambda: ['a', 'b'], kind='network'),
+        AnalysisTask('count', lambda corpus: len(corpus), depends_on=['corpus']),
+        AnalysisTask('report', lambda label, corpus, count: f'{label}: {count} of {corpus}',
+                     kwargs={'label': 'pages'}, depends_on=['corpus', 'count'])
+    ]
+    
+    results = engine.run(tasks)
+    
+    assert results == {'corpus': ['a', 'b'], 'count': 2, 'report': "pages: 2 of ['a', 'b']"}
+
+def test_independent_tasks_run_concurrently(engine):
+    # Each task waits for the other; run one after the other, the barrier would time out
+    barrier = threading.Barrier(2, timeout=5)
+    tasks = [
+        AnalysisTask('first', barrier.wait, kind='network'),
+        AnalysisTask('second', barrier.wait, kind='network')
+    ]
+    
+    assert set(engine.run(tasks)) == {'first', 'second'}
+
+def test_task_starts_only_after_its_dependencies(engine):
+    release = threading.Event()
+    order = []
+    
+    def slow():
+        release.wait(5)
+        order.append('slow')
+        return 1
+    
+    tasks = [
+        AnalysisTask('slow', slow),
+        AnalysisTask('fast', lambda: order.append('fast')),
+        AnalysisTask('after', lambda slow: order.append('after'), depends_on=['slow'])
+    ]
+    
+    results = engine.iter_results(tasks)
+    assert next(results)[0] == 'fast'
+    release.set()
+    assert [name for name, _ in results] == ['slow', 'after']
+    assert order == ['fast', 'slow', 'after']
+
+def test_unknown_dependency_is_rejected(engine):
+    with pytest.raises(ValueError, match="unknown task 'missing'"):
+        engine.run([AnalysisTask('seo', lambda missing: None, depends_on=['missing'])])
+
+def test_dependency_cycle_is_rejected(engine):
+    tasks = [
+        AnalysisTask('a', lambda b: None, depends_on=['b']),
+        AnalysisTask('b', lambda a: None, depends_on=['a'])
+    ]
+    
+    with pytest.raises(ValueError, match='cycle'):
+        engine.run(tasks)
+
+def test_task_error_is_raised_and_dependents_never_run(engine):
+    ran = []
+    
+    def fail():
+        raise RuntimeError('fetch failed')
+    
+    tasks = [
+        AnalysisTask('serp', fail, kind='network'),
+        AnalysisTask('differentiation', lambda serp: ran.append(serp), depends_on=['serp'])
+    ]
+    
+    with pytest.raises(RuntimeError, match='fetch failed'):
+        engine.run(tasks)
+    assert ran == []
+
+def _run_sequentially(tasks):
+    """Each task after the previous one, in list order (dependencies come first)"""
+    results = {}
+    for task in tasks:
+        kwargs = dict(task.kwargs)
+        for dep in task.depends_on:
+            kwargs[dep] = results[dep]
+        results[task.name] = task.func(*task.args, **kwargs)
+    return results
+
+def test_analyzer_graph_matches_a_sequential_run(app_module):
+    text = (
+        "# Running Shoes Guide\n\nRunning shoes are defined as footwear built for running. "
+        "In my experience, cushioned running shoes cut injuries by 20%. We tested 12 pairs in 2025.\n\n"
+        "## How do you choose running shoes?\n\n- Check the fit\n- Check the drop\n\n"
+        "According to a 2024 study, most runners replace their shoes every 500 miles.\n"
+    ) * 5
+    args = (text, ['Running Shoes Guide', 'How do you choose running shoes?'], 'A guide to running shoes',
+            'running shoes', 'https://site.test/running-shoes')
+    
+    engine_results = app_module.analysis_engine.run(app_module.build_analysis_tasks(*args))
+    sequential_results = _run_sequentially(app_module.build_analysis_tasks(*args))
+    
+    # Each run builds its own competitor corpus
+    assert engine_results.pop('corpus').top_results(10) == sequential_results.pop('corpus').top_results(10)
+    assert set(engine_results) == set(sequential_results)
+    for name in sequential_results:
+        assert engine_results[name] == sequential_results[name], name
@@ -0,0 +1,177 @@
+import json
+import time
+import threading
+import requests
+from types import SimpleNamespace
+import utils.job_manager as job_manager_module
+from utils.analysis_engine import AnalysisEngine, AnalysisTask
+from utils.job_manager import JobManager
+
+ARTICLE = (
+    "# Running Shoes Guide\n\nRunning shoes are defined as footwear built for running. "
+    "In my experience, cushioned running shoes cut injuries by 20%. We tested 12 pairs in 2025.\n\n"
+    "## How do you choose running shoes?\n\n- Check the fit\n- Check the drop\n"
+) * 3
+
+ANALYZERS = {
+    'seo', 'serp_performance', 'aeo', 'humanization', 'differentiation',
+    'sentiment', 'entities', 'freshness', 'plagiarism', 'schema'
+}
+
+def _events(body):
+    """(event, data) pairs of a Server-Sent Events body"""
+    events = []
+    for block in body.strip().split('\n\n'):
+        fields = dict(line.split(': ', 1) for line in block.split('\n'))
+        events.append((fields['event'], json.loads(fields['data'])))
+    return events
+
+def test_request_connections_are_closed_on_teardown(app_module, client):
+    history = app_module.services.history
+    
+    assert client.get('/api/history').status_code == 200
+    assert getattr(history._local, 'conn', None) is None
+    
+    # The next request opens a new one
+    assert client.get('/api/history/statistics').status_code == 200
+
+def test_stream_sends_each_analyzer_then_complete(client):
+    response = client.post('/api/analyze/stream', json={'input': ARTICLE, 'target_keyword': 'running shoes'})
+    
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+    
+    events = _events(response.get_data(as_text=True))
+    names = [data['name'] for event, data in events[:-1] if event == 'analyzer']
+    
+    # One event per analyzer (the shared corpus isn't sent), then 'complete' last
+    assert len(names) == len(events) - 1
+    assert sorted(names) == sorted(ANALYZERS)
+    
+    event, summary = events[-1]
+    assert event == 'complete'
+    assert summary['target_keyword'] == 'running shoes'
+    assert not ANALYZERS & set(summary)
+    assert client.get(f"/api/history/{summary['analysis_id']}").status_code == 200
+
+def test_stream_cancels_remaining_analyzers_when_the_client_disconnects(app_module, client, monkeypatch):
+    # One worker per pool: 'queued' waits behind 'blocker' until the client is gone
+    engine = AnalysisEngine(network_workers=1, cpu_workers=1)
+    release = threading.Event()
+    ran = []
+    
+    def blocker():
+        release.wait(5)
+        ran.append('blocker')
+    
+    monkeypatch.setattr(app_module, 'analysis_engine', engine)
+    monkeypatch.setattr(app_module, 'build_analysis_tasks', lambda *args: [
+        AnalysisTask('first', lambda: {'score': 1}),
+        AnalysisTask('blocker', blocker, kind='network'),
+        AnalysisTask('queued', lambda: ran.append('queued'), kind='network'),
+        AnalysisTask('after', lambda blocker: ran.append('after'), depends_on=['blocker'])
+    ])
+    
+    try:
+        response = client.post('/api/analyze/stream', json={'input': ARTICLE}, buffered=False)
+        chunks = iter(response.response)
+        
+        assert _events(next(chunks).decode()) == [('analyzer', {'name': 'first', 'result': {'score': 1}})]
+        response.close()
+        release.set()
+    finally:
+        engine.shutdown()
+    
+    assert ran == ['blocker']
+
+def _wait_for_job(client, job_id):
+    deadline = time.time() + 10
+    while time.time() < deadline:
+        job = client.get(f'/api/jobs/{job_id}').get_json()
+        if job['status'] in ('completed', 'failed'):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f'job {job_id} did not finish')
+
+def test_jobs_are_rejected_with_503_when_the_queue_is_full(app_module, client, monkeypatch):
+    manager = JobManager(workers=1, max_queue=1)
+    release = threading.Event()
+    monkeypatch.setattr(app_module, 'job_manager', manager)
+    
+    try:
+        assert manager.submit(lambda job: release.wait(5)) is not None
+        
+        response = client.post('/api/jobs/analyze', json={'input': ARTICLE})
+        
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '5'
+        
+        # Room again once the running job finishes
+        release.set()
+        deadline = time.time() + 5
+        while manager.stats()['active'] and time.time() < deadline:
+            time.sleep(0.01)
+        assert client.post('/api/jobs/analyze', json={'input': ARTICLE}).status_code == 202
+    finally:
+        release.set()
+        manager.shutdown()
+
+def test_job_results_expire_after_the_ttl(app_module, client, monkeypatch, clock):
+    manager = JobManager(workers=1, max_queue=4, result_ttl=60)
+    monkeypatch.setattr(app_module, 'job_manager', manager)
+    monkeypatch.setattr(job_manager_module, 'time', clock)
+    
+    try:
+        response = client.post('/api/jobs/analyze', json={'input': ARTICLE, 'target_keyword': 'running shoes'})
+        assert response.status_code == 202
+        
+        job = _wait_for_job(client, response.get_json()['job_id'])
+        assert job['status'] == 'completed'
+        assert job['completed_steps'] == job['total_steps']
+        assert job['result']['target_keyword'] == 'running shoes'
+        
+        clock.advance(60)
+        assert client.get(f"/api/jobs/{job['job_id']}").status_code == 200
+        
+        clock.advance(1)
+        assert client.get(f"/api/jobs/{job['job_id']}").status_code == 404
+    finally:
+        manager.shutdown()
+
+def test_batch_with_failing_urls_completes_the_others(app_module, client, monkeypatch):
+    def extract(url):
+        if url == 'https://gone.test/':
+            raise requests.exceptions.HTTPError('404 Not Found', response=SimpleNamespace(status_code=404))
+        if url == 'https://empty.test/':
+            return {'text': '', 'url': url}
+        return {'text': ARTICLE, 'url': url, 'headers': ['Running Shoes Guide'], 'meta_description': ''}
+    
+    monkeypatch.setattr(app_module.services.text_extractor, 'extract', extract)
+    
+    response = client.post('/api/batch/create', json={
+        'name': 'mixed', 'target_keyword': 'running shoes',
+        'urls': ['https://site.test/shoes', 'https://gone.test/', 'https://empty.test/', 'https://site.test/boots']
+    })
+    assert response.status_code == 200
+    batch_id = response.get_json()['batch_id']
+    
+    deadline = time.time() + 10
+    status = client.get(f'/api/batch/status/{batch_id}').get_json()
+    while status['status'] != 'completed' and time.time() < deadline:
+        time.sleep(0.05)
+        status = client.get(f'/api/batch/status/{batch_id}').get_json()
+    
+    items = {item['url']: item for item in status['items']}
+    assert (status['status'], status['completed_urls'], status['total_urls']) == ('completed', 4, 4)
+    
+    # A 404 isn't retried
+    assert (items['https://gone.test/']['status'], items['https://gone.test/']['attempts']) == ('failed', 1)
+    assert '404' in items['https://gone.test/']['error']
+    assert (items['https://empty.test/']['status'], items['https://empty.test/']['error']) == (
+        'failed', 'Could not extract content'
+    )
+    
+    for url in ('https://site.test/shoes', 'https://site.test/boots'):
+        assert items[url]['status'] == 'completed'
+        report = client.get(f"/api/history/{items[url]['analysis_id']}").get_json()
+        assert report['overall_score'] == items[url]['overall_score']
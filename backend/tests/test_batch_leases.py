@@ -0,0 +1,66 @@
+import pytest
+from utils import history_tracker
+
+@pytest.fixture
+def batch(tracker, clock, monkeypatch):
+    monkeypatch.setattr(history_tracker, 'time', clock)
+    return tracker.create_batch('leases', [
+        {'url': 'https://a.test', 'target_keyword': 'trail'},
+        {'url': 'https://b.test', 'target_keyword': 'road'},
+        {'url': 'https://c.test', 'target_keyword': 'trail'}
+    ])
+
+def test_claims_are_exclusive_and_grouped_by_keyword(tracker, batch):
+    first = tracker.claim_batch_items(batch, 'worker-1', limit=2, lease_seconds=60, max_attempts=3)
+    second = tracker.claim_batch_items(batch, 'worker-2', limit=2, lease_seconds=60, max_attempts=3)
+    
+    assert [item['url'] for item in first] == ['https://b.test', 'https://a.test']
+    assert [item['url'] for item in second] == ['https://c.test']
+    assert [item['attempts'] for item in first + second] == [1, 1, 1]
+    assert tracker.claim_batch_items(batch, 'worker-3', limit=2, lease_seconds=60, max_attempts=3) == []
+    assert tracker.get_batch_lease_state(batch)['leased'] == 3
+
+def test_expired_lease_is_reclaimed_and_the_old_owner_loses_it(tracker, batch, clock):
+    item = tracker.claim_batch_items(batch, 'worker-1', limit=1, lease_seconds=60, max_attempts=3)[0]
+    clock.advance(61)
+    
+    reclaimed = tracker.claim_batch_items(batch, 'worker-2', limit=3, lease_seconds=60, max_attempts=3)
+    
+    assert (reclaimed[0]['id'], reclaimed[0]['attempts']) == (item['id'], 2)
+    assert not tracker.update_batch_item(batch, item['url'], 'completed', overall_score=80, lease_owner='worker-1')
+    assert tracker.update_batch_item(batch, item['url'], 'completed', overall_score=70, lease_owner='worker-2')
+    
+    status = tracker.get_batch_status(batch)
+    assert status['completed_urls'] == 1
+    assert [row['overall_score'] for row in status['items'] if row['id'] == item['id']] == [70]
+
+def test_renewed_lease_is_not_reclaimed(tracker, batch, clock):
+    items = tracker.claim_batch_items(batch, 'worker-1', limit=3, lease_seconds=60, max_attempts=3)
+    clock.advance(50)
+    
+    assert tracker.renew_batch_leases('worker-1', [item['id'] for item in items], 60) == 3
+    assert tracker.renew_batch_leases('worker-2', [item['id'] for item in items], 60) == 0
+    clock.advance(50)
+    
+    assert tracker.claim_batch_items(batch, 'worker-2', limit=3, lease_seconds=60, max_attempts=3) == []
+
+def test_items_out_of_attempts_fail_and_finish_the_batch(tracker, batch, clock):
+    for _ in range(2):
+        tracker.claim_batch_items(batch, 'worker-1', limit=3, lease_seconds=60, max_attempts=2)
+        clock.advance(61)
+    
+    assert tracker.claim_batch_items(batch, 'worker-2', limit=3, lease_seconds=60, max_attempts=2) == []
+    
+    status = tracker.get_batch_status(batch)
+    assert {row['status'] for row in status['items']} == {'failed'}
+    assert {row['error'] for row in status['items']} == {'Exceeded retry attempts'}
+    assert (status['completed_urls'], status['status']) == (3, 'completed')
+    assert tracker.get_unfinished_batches() == []
+
+def test_released_item_goes_back_to_the_queue(tracker, batch):
+    item = tracker.claim_batch_items(batch, 'worker-1', limit=1, lease_seconds=60, max_attempts=3)[0]
+    
+    tracker.release_batch_item(item['id'], 'worker-1', error='shutting down')
+    
+    assert tracker.get_batch_lease_state(batch) == {'pending': 3, 'leased': 0, 'next_expiry': None}
+    assert tracker.get_unfinished_batches() == [batch]
@@ -0,0 +1,62 @@
+import random
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+from utils.batch_similarity import BatchSimilarity
+
+def _texts(rng, vocabulary, count, words=300):
+    return [' '.join(rng.choice(vocabulary) for _ in range(words)) for _ in range(count)]
+
+def _single_url_similarities(text, competitor_texts, max_features=500):
+    """What DifferentiationAnalyzer computes for one page on its own"""
+    matrix = TfidfVectorizer(max_features=max_features, stop_words='english').fit_transform([text] + competitor_texts)
+    return cosine_similarity(matrix[0:1], matrix[1:])[0]
+
+def test_matches_a_separate_fit_per_document():
+    # Vocabularies larger than max_features, so the term selection matters
+    rng = random.Random(7)
+    vocabulary = [f'term{index}' for index in range(1500)]
+    competitor_groups = {
+        'running shoes': _texts(rng, vocabulary[:900], 4),
+        'trail shoes': _texts(rng, vocabulary[600:], 3)
+    }
+    documents = [(text, 'running shoes') for text in _texts(rng, vocabulary[:900], 2)]
+    documents += [(text, 'trail shoes') for text in _texts(rng, vocabulary[600:], 2)]
+    
+    rows = BatchSimilarity(max_features=500).compute(documents, competitor_groups)
+    
+    for (text, key), row in zip(documents, rows):
+        assert np.allclose(row, _single_url_similarities(text, competitor_groups[key]))
+
+def test_matches_when_term_counts_tie_at_the_vocabulary_limit():
+    # Short texts over a small vocabulary: many terms share the count at the cut-off
+    rng = random.Random(11)
+    vocabulary = [f'term{index}' for index in range(60)]
+    competitor_groups = {key: _texts(rng, vocabulary, 3, words=25) for key in ('a', 'b', 'c')}
+    documents = [(text, rng.choice('abc')) for text in _texts(rng, vocabulary, 12, words=25)]
+    
+    rows = BatchSimilarity(max_features=20).compute(documents, competitor_groups)
+    
+    for (text, key), row in zip(documents, rows):
+        assert np.allclose(row, _single_url_similarities(text, competitor_groups[key], max_features=20))
+
+def test_documents_without_competitors_get_none():
+    rows = BatchSimilarity().compute(
+        [('running shoes for trails', 'running shoes'), ('hiking boots', 'hiking boots')],
+        {'running shoes': ['trail running shoes', 'road shoes']}
+    )
+    
+    assert rows[0] is not None and len(rows[0]) == 2
+    assert rows[1] is None
+
+def test_empty_competitor_groups_get_none():
+    rows = BatchSimilarity().compute(
+        [('running shoes', 'empty'), ('trail shoes', 'running shoes')],
+        {'empty': [], 'running shoes': ['trail running shoes']}
+    )
+    
+    assert rows[0] is None
+    assert np.allclose(rows[1], _single_url_similarities('trail shoes', ['trail running shoes']))
+
+def test_stop_word_only_texts_get_none():
+    assert BatchSimilarity().compute([('the and of', 'k')], {'k': ['a the']}) == [None]
@@ -0,0 +1,121 @@
+import time
+import requests
+from types import SimpleNamespace
+from utils.batch_engine import BatchEngine
+
+def _report(url, score):
+    return {'url': url, 'target_keyword': '', 'overall_score': score, 'seo': {'score': score}}
+
+def test_duplicate_urls_are_updated_by_item_id(tracker):
+    batch = tracker.create_batch('dupes', ['https://a.test', 'https://a.test'])
+    items = tracker.get_batch_status(batch)['items']
+    
+    updated = tracker.update_batch_items(batch, [
+        {'id': items[0]['id'], 'status': 'completed', 'overall_score': 60, 'results': _report('https://a.test', 60)},
+        {'id': items[1]['id'], 'status': 'failed', 'error': 'timeout'}
+    ])
+    
+    status = tracker.get_batch_status(batch)
+    assert updated == 2
+    assert [(row['status'], row['overall_score'], row['error']) for row in status['items']] == [
+        ('completed', 60, None), ('failed', None, 'timeout')
+    ]
+    assert (status['completed_urls'], status['status']) == (2, 'completed')
+
+def test_update_by_url_takes_the_first_unfinished_duplicate(tracker):
+    batch = tracker.create_batch('dupes', ['https://a.test', 'https://a.test'])
+    
+    assert tracker.update_batch_item(batch, 'https://a.test', 'completed', overall_score=50)
+    assert tracker.update_batch_item(batch, 'https://a.test', 'completed', overall_score=70)
+    
+    assert [row['overall_score'] for row in tracker.get_batch_status(batch)['items']] == [50, 70]
+
+def test_results_are_saved_with_the_item(tracker):
+    batch = tracker.create_batch('save', ['https://a.test'])
+    item = tracker.get_batch_status(batch)['items'][0]
+    
+    tracker.update_batch_items(batch, [
+        {'id': item['id'], 'status': 'completed', 'overall_score': 64, 'results': _report('https://a.test', 64)}
+    ])
+    
+    analysis_id = tracker.get_batch_status(batch)['items'][0]['analysis_id']
+    assert tracker.get_analysis(analysis_id)['overall_score'] == 64
+
+def test_results_for_a_lost_lease_are_not_saved(tracker):
+    batch = tracker.create_batch('lost', ['https://a.test'])
+    item = tracker.claim_batch_items(batch, 'worker-1', limit=1, lease_seconds=60, max_attempts=3)[0]
+    
+    updated = tracker.update_batch_items(batch, [
+        {'id': item['id'], 'status': 'completed', 'overall_score': 64, 'results': _report('https://a.test', 64)}
+    ], lease_owner='worker-2')
+    
+    assert updated == 0
+    assert tracker.get_history() == []
+    assert tracker.get_batch_status(batch)['items'][0]['status'] == 'running'
+
+def test_finished_items_are_counted_once(tracker):
+    batch = tracker.create_batch('recount', ['https://a.test', 'https://b.test'])
+    item = tracker.get_batch_status(batch)['items'][0]
+    
+    for _ in range(2):
+        tracker.update_batch_items(batch, [{'id': item['id'], 'status': 'failed', 'error': 'gone'}])
+    
+    status = tracker.get_batch_status(batch)
+    assert (status['completed_urls'], status['status']) == (1, 'pending')
+
+def test_engine_retries_transient_extraction_failures(tracker):
+    attempts = {}
+    
+    def extract(url):
+        attempts[url] = attempts.get(url, 0) + 1
+        if url == 'https://flaky.test' and attempts[url] == 1:
+            raise requests.exceptions.ConnectionError('connection reset')
+        if url == 'https://gone.test':
+            raise requests.exceptions.HTTPError('404 Not Found', response=SimpleNamespace(status_code=404))
+        return {'text': f'content of {url}'}
+    
+    def analyze_url(url, target_keyword, corpus, content_data, similarities, save=False):
+        return _report(url, 75)
+    
+    services = SimpleNamespace(history=tracker, text_extractor=SimpleNamespace(extract=extract))
+    engine = BatchEngine(analyze_url, services, workers=2, wave_size=5, max_active_batches=1, max_attempts=3)
+    batch = tracker.create_batch('retry', ['https://flaky.test', 'https://gone.test'])
+    
+    try:
+        engine.enqueue(batch)
+        deadline = time.time() + 10
+        while tracker.get_batch_status(batch)['status'] != 'completed' and time.time() < deadline:
+            time.sleep(0.05)
+    finally:
+        engine.shutdown()
+    
+    items = {row['url']: row for row in tracker.get_batch_status(batch)['items']}
+    assert (items['https://flaky.test']['status'], items['https://flaky.test']['attempts']) == ('completed', 2)
+    assert (items['https://gone.test']['status'], items['https://gone.test']['attempts']) == ('failed', 1)
+    assert tracker.get_analysis(items['https://flaky.test']['analysis_id'])['overall_score'] == 75
+
+def test_engine_drops_a_keywords_corpus_once_it_is_drained(tracker):
+    services = SimpleNamespace(history=tracker, scraper=None)
+    engine = BatchEngine(None, services, workers=1, wave_size=2, max_active_batches=1)
+    batch = tracker.create_batch('keywords', [
+        {'url': f'https://{keyword}.test/{index}', 'target_keyword': keyword}
+        for keyword in ('boots', 'sandals', 'shoes') for index in range(3)
+    ])
+    held = []
+    
+    def run_wave(batch_id, wave, corpora):
+        held.append((sorted(corpora), id(corpora.get('sandals'))))
+        tracker.update_batch_items(batch_id, [{'id': item['id'], 'status': 'failed', 'error': 'skipped'} for item in wave])
+    
+    engine._run_wave_or_release = run_wave
+    try:
+        engine._run_batch(batch)
+    finally:
+        engine.shutdown()
+    
+    assert [keywords for keywords, _ in held] == [
+        ['boots'], ['boots', 'sandals'], ['sandals'], ['shoes'], ['shoes']
+    ]
+    
+    # A keyword spanning two waves keeps its corpus
+    assert held[1][1] == held[2][1]
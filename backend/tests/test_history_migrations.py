@@ -0,0 +1,156 @@
+import json
+import sqlite3
+import pytest
+from utils.history_tracker import HistoryTracker
+from utils.retention_manager import RetentionManager
+
+# history.db as the first release created it (user_version 0)
+ORIGINAL_SCHEMA = '''
+    CREATE TABLE analysis_history (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp TEXT NOT NULL,
+        url TEXT,
+        target_keyword TEXT,
+        word_count INTEGER,
+        overall_score REAL,
+        seo_score REAL,
+        serp_score REAL,
+        aeo_score REAL,
+        humanization_score REAL,
+        differentiation_score REAL,
+        full_results TEXT,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE TABLE batch_analysis (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        batch_id TEXT NOT NULL,
+        batch_name TEXT,
+        total_urls INTEGER,
+        completed_urls INTEGER,
+        status TEXT,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        completed_at TEXT
+    );
+    CREATE TABLE batch_items (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        batch_id TEXT NOT NULL,
+        url TEXT NOT NULL,
+        status TEXT,
+        overall_score REAL,
+        error TEXT,
+        analysis_id INTEGER,
+        FOREIGN KEY (analysis_id) REFERENCES analysis_history(id)
+    );
+'''
+
+ANALYSES = [
+    ('https://a.test/shoes', 'running shoes', 60.0, '2024-01-01 10:00:00'),
+    ('https://b.test/boots', 'hiking boots', 80.0, '2024-01-02 11:00:00'),
+    ('https://c.test/trail', 'running shoes', None, '2024-01-03 12:00:00')
+]
+
+@pytest.fixture
+def original_db(tmp_path):
+    path = str(tmp_path / 'original.db')
+    conn = sqlite3.connect(path)
+    conn.executescript(ORIGINAL_SCHEMA)
+    for url, keyword, score, created_at in ANALYSES:
+        full_results = {'url': url, 'target_keyword': keyword, 'overall_score': score, 'body': 'x' * 2000}
+        conn.execute('''
+            INSERT INTO analysis_history (timestamp, url, target_keyword, overall_score, seo_score, full_results, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (created_at, url, keyword, score, score, json.dumps(full_results), created_at))
+    conn.execute("INSERT INTO batch_analysis (batch_id, batch_name, total_urls, completed_urls, status) VALUES ('old', 'old', 1, 0, 'pending')")
+    conn.execute("INSERT INTO batch_items (batch_id, url, status) VALUES ('old', 'https://a.test/shoes', 'pending')")
+    conn.commit()
+    conn.close()
+    return path
+
+@pytest.fixture
+def migrated(original_db):
+    tracker = HistoryTracker(db_path=original_db)
+    yield tracker
+    tracker.close()
+
+def test_all_migrations_are_applied(migrated):
+    conn = migrated._connect()
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    
+    assert conn.execute('PRAGMA user_version').fetchone()[0] == 5
+    assert {'analysis_history_fts', 'analysis_stats', 'analysis_results', 'analysis_daily'} <= tables
+
+def test_substring_search_covers_existing_rows(migrated):
+    # 'unning' only matches through the trigram index or LIKE, never a prefix
+    assert [row['url'] for row in migrated.get_history(keyword='unning')] == [
+        'https://c.test/trail', 'https://a.test/shoes'
+    ]
+
+def test_full_text_index_is_created_when_a_later_open_supports_it(original_db, migrated):
+    # As left by a SQLite build without FTS5: every migration applied, no full-text index
+    conn = migrated._connect()
+    for trigger in ('insert', 'delete', 'update'):
+        conn.execute(f'DROP TRIGGER analysis_history_fts_{trigger}')
+    conn.execute('DROP TABLE analysis_history_fts')
+    migrated.close()
+    
+    reopened = HistoryTracker(db_path=original_db)
+    reopened.save_analysis({'url': 'https://d.test/sandals', 'target_keyword': 'running sandals', 'overall_score': 50})
+    
+    assert reopened._fts_enabled
+    assert [row['url'] for row in reopened.get_history(keyword='unning')] == [
+        'https://d.test/sandals', 'https://c.test/trail', 'https://a.test/shoes'
+    ]
+    assert reopened._connect().execute(
+        "SELECT COUNT(*) FROM analysis_history_fts WHERE analysis_history_fts MATCH 'unning'"
+    ).fetchone()[0] == 3
+    reopened.close()
+
+def test_created_ts_is_backfilled(migrated):
+    rows = migrated._connect().execute('SELECT created_ts FROM analysis_history ORDER BY id').fetchall()
+    
+    assert [row[0] for row in rows] == [1704103200, 1704193200, 1704283200]
+
+def test_statistics_include_existing_rows(migrated):
+    stats = migrated.get_statistics()
+    
+    assert stats['total_analyses'] == 3
+    assert stats['avg_scores']['overall'] == 70.0
+    assert stats['top_keywords'] == [{'keyword': 'running shoes', 'count': 2}, {'keyword': 'hiking boots', 'count': 1}]
+
+def test_full_results_are_moved_out_of_the_history_table(migrated):
+    conn = migrated._connect()
+    
+    assert conn.execute('SELECT COUNT(*) FROM analysis_history WHERE full_results IS NOT NULL').fetchone()[0] == 0
+    assert conn.execute('SELECT COUNT(*) FROM analysis_results WHERE created_ts IS NULL').fetchone()[0] == 0
+    assert migrated.get_analysis(2)['url'] == 'https://b.test/boots'
+
+def test_old_batches_keep_working(migrated):
+    assert migrated.get_unfinished_batches() == ['old']
+    assert migrated.update_batch_item('old', 'https://a.test/shoes', 'completed', overall_score=60)
+    assert migrated.get_batch_status('old')['status'] == 'completed'
+
+def test_reopening_does_not_migrate_again(original_db, migrated):
+    reopened = HistoryTracker(db_path=original_db)
+    
+    assert reopened.get_statistics()['total_analyses'] == 3
+    reopened.close()
+
+def test_incremental_vacuum_needs_one_full_vacuum_on_old_files(migrated, tracker):
+    assert not tracker.needs_full_vacuum()
+    assert migrated.needs_full_vacuum()
+    
+    migrated.full_vacuum()
+    
+    assert not migrated.needs_full_vacuum()
+
+def test_retention_skips_the_full_vacuum_on_files_over_the_limit(migrated, tmp_path):
+    retention = RetentionManager(migrated, archive_dir=str(tmp_path / 'archive'), interval=0, full_vacuum_max_mb=0)
+    
+    assert retention.run_once()['pages_vacuumed'] == 0
+    assert migrated.needs_full_vacuum()
+    
+    # What --full-vacuum does
+    retention.full_vacuum_max_mb = float('inf')
+    retention.run_once()
+    
+    assert not migrated.needs_full_vacuum()
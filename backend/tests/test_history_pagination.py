@@ -0,0 +1,59 @@
+import pytest
+
+def _save(tracker, count, keyword='running shoes'):
+    return tracker.save_many([
+        {'url': f'https://site.test/{index}', 'target_keyword': keyword, 'overall_score': index}
+        for index in range(count)
+    ])
+
+def _walk(tracker, limit, **filters):
+    pages = []
+    cursor = None
+    while True:
+        page = tracker.get_history_page(limit, fields=['id'], cursor=cursor, **filters)
+        pages.append([row['id'] for row in page['items']])
+        cursor = page['next_cursor']
+        if cursor is None:
+            return pages
+
+def test_pages_cover_every_row_once_newest_first(tracker):
+    # Rows saved within one second share created_at; the id breaks the tie
+    ids = _save(tracker, 7)
+    
+    assert _walk(tracker, 3) == [ids[6:3:-1], ids[3:0:-1], ids[:1]]
+
+def test_exact_multiple_has_no_empty_last_page(tracker):
+    ids = _save(tracker, 4)
+    
+    assert _walk(tracker, 2) == [ids[3:1:-1], ids[1::-1]]
+
+def test_new_rows_do_not_shift_later_pages(tracker):
+    ids = _save(tracker, 4)
+    first = tracker.get_history_page(2, fields=['id'])
+    
+    _save(tracker, 2)
+    second = tracker.get_history_page(2, fields=['id'], cursor=first['next_cursor'])
+    
+    assert [row['id'] for row in second['items']] == ids[1::-1]
+
+def test_filters_apply_across_pages(tracker):
+    trail = _save(tracker, 3, keyword='trail shoes')
+    _save(tracker, 3, keyword='hiking boots')
+    
+    assert _walk(tracker, 2, keyword='trail') == [trail[:0:-1], trail[:1]]
+
+def test_fields_select_columns(tracker):
+    _save(tracker, 1)
+    
+    assert tracker.get_history_page(10, fields=['url', 'overall_score'])['items'] == [
+        {'url': 'https://site.test/0', 'overall_score': 0}
+    ]
+
+def test_unknown_fields_are_rejected(tracker):
+    with pytest.raises(ValueError, match='Unknown fields: full_results'):
+        tracker.get_history_page(10, fields=['url', 'full_results'])
+
+@pytest.mark.parametrize('cursor', ['not-a-cursor', 'WzEsMl0', 'e30'])
+def test_malformed_cursors_are_rejected(tracker, cursor):
+    with pytest.raises(ValueError, match='Invalid cursor'):
+        tracker.get_history_page(10, cursor=cursor)
@@ -0,0 +1,72 @@
+import time
+from datetime import datetime, timezone
+import pytest
+
+DAY = 86400
+
+def _save_at(tracker, created_ts_scores):
+    """Save one analysis per (created_ts, score) pair, dated `created_ts`"""
+    ids = tracker.save_many([
+        {'url': f'https://site.test/{index}', 'target_keyword': 'running shoes', 'overall_score': score}
+        for index, (_, score) in enumerate(created_ts_scores)
+    ])
+    for analysis_id, (created_ts, _) in zip(ids, created_ts_scores):
+        tracker._connect().execute('UPDATE analysis_history SET created_ts = ? WHERE id = ?', (created_ts, analysis_id))
+    return ids
+
+def _iso(ts):
+    return datetime.fromtimestamp(ts, timezone.utc).strftime('%Y-%m-%dT%H:%M:%S')
+
+@pytest.fixture
+def monday():
+    """Midnight (UTC) starting a Monday one to two weeks ago"""
+    today = int(time.time()) // DAY
+    
+    # Day 0 of the Unix epoch was a Thursday
+    return (today - (today + 3) % 7 - 7) * DAY
+
+@pytest.fixture(autouse=True)
+def local_time_zone(monkeypatch):
+    """Buckets are UTC whatever the server's time zone"""
+    monkeypatch.setenv('TZ', 'America/New_York')
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+def test_day_buckets_split_at_utc_midnight(tracker, monday):
+    _save_at(tracker, [(monday - 1, 40), (monday, 60), (monday + DAY - 1, 80), (monday + DAY, 90)])
+    
+    progress = tracker.get_progress_data(days=30, bucket='day')
+    
+    assert [(row['timestamp'], row['count'], row['overall_score']) for row in progress] == [
+        (_iso(monday - DAY), 1, 40.0), (_iso(monday), 2, 70.0), (_iso(monday + DAY), 1, 90.0)
+    ]
+
+def test_week_buckets_start_on_monday(tracker, monday):
+    # Sunday's last second, Monday's first, and the next Sunday's last
+    _save_at(tracker, [(monday - 1, 40), (monday, 60), (monday + 7 * DAY - 1, 80)])
+    
+    progress = tracker.get_progress_data(days=30, bucket='week')
+    
+    assert [(row['timestamp'], row['count'], row['overall_score']) for row in progress] == [
+        (_iso(monday - 7 * DAY), 1, 40.0), (_iso(monday), 2, 70.0)
+    ]
+    assert datetime.fromisoformat(progress[1]['timestamp']).weekday() == 0
+
+def test_hour_buckets_split_on_the_hour(tracker, monday):
+    _save_at(tracker, [(monday + 3599, 40), (monday + 3600, 60)])
+    
+    progress = tracker.get_progress_data(days=30, bucket='hour')
+    
+    assert [row['timestamp'] for row in progress] == [_iso(monday), _iso(monday + 3600)]
+
+def test_rolled_up_days_share_the_utc_day_buckets(tracker, monday):
+    old = _save_at(tracker, [(monday + 60, 40)])
+    _save_at(tracker, [(monday + DAY - 60, 80)])
+    tracker.roll_up_analyses(old)
+    
+    progress = tracker.get_progress_data(days=30, bucket='day')
+    
+    assert [(row['timestamp'], row['count'], row['overall_score']) for row in progress] == [(_iso(monday), 2, 60.0)]
+    assert (progress[0]['overall_score_min'], progress[0]['overall_score_max']) == (40.0, 80.0)
@@ -0,0 +1,108 @@
+import gzip
+import json
+import os
+import time
+from datetime import datetime, timezone
+import pytest
+from utils.retention_manager import RetentionManager
+
+DAY = 86400
+
+def _backdate(tracker, ids, created_ts):
+    """Move analyses (and their stored results) back to `created_ts`"""
+    conn = tracker._connect()
+    for table, key in [('analysis_history', 'id'), ('analysis_results', 'analysis_id')]:
+        conn.execute(
+            f'UPDATE {table} SET created_ts = ? WHERE {key} IN (SELECT value FROM json_each(?))',
+            (created_ts, json.dumps(ids))
+        )
+
+def _read_segments(archive_dir, kind):
+    rows = []
+    for name in sorted(os.listdir(archive_dir)):
+        if name.startswith(f'history-{kind}-'):
+            with gzip.open(os.path.join(archive_dir, name), 'rt', encoding='utf-8') as segment:
+                rows.extend(json.loads(line) for line in segment)
+    return rows
+
+@pytest.fixture
+def day_start():
+    """Midnight (UTC) of a day past score retention"""
+    return (int(time.time()) // DAY - 100) * DAY
+
+@pytest.fixture
+def retention(tracker, tmp_path):
+    return RetentionManager(
+        tracker, full_results_days=30, scores_days=90, archive_dir=str(tmp_path / 'archive'),
+        interval=0, segment_rows=2
+    )
+
+def _save(tracker, scores, keyword='running shoes'):
+    return tracker.save_many([
+        {'url': f'https://site.test/{index}', 'target_keyword': keyword, 'overall_score': score, 'body': 'x' * 5000}
+        for index, score in enumerate(scores)
+    ])
+
+def test_full_results_past_retention_are_archived(tracker, retention):
+    old = _save(tracker, [40, 50, 60])
+    recent = _save(tracker, [70])
+    _backdate(tracker, old, int(time.time()) - 40 * DAY)
+    
+    summary = retention.run_once()
+    
+    assert (summary['results_archived'], summary['analyses_rolled_up']) == (3, 0)
+    assert [row['id'] for row in _read_segments(retention.archive_dir, 'results')] == old
+    assert _read_segments(retention.archive_dir, 'results')[0]['full_results']['overall_score'] == 40
+    assert tracker.get_analysis(old[0])['full_results'] is None
+    assert tracker.get_analysis(old[0])['overall_score'] == 40
+    assert tracker.get_analysis(recent[0])['full_results']['overall_score'] == 70
+
+def test_analyses_past_retention_are_rolled_up(tracker, retention, day_start):
+    old = _save(tracker, [40, 90, None])
+    _save(tracker, [70])
+    _backdate(tracker, old, day_start + 3600)
+    
+    summary = retention.run_once()
+    
+    assert summary['analyses_rolled_up'] == 3
+    assert [row['id'] for row in _read_segments(retention.archive_dir, 'scores')] == old
+    assert [row['overall_score'] for row in tracker.get_history()] == [70]
+    
+    # Rolled up over two segments into one day
+    daily = tracker._connect().execute('''
+        SELECT day_ts, target_keyword, analyses, overall_score_sum, overall_score_count,
+               overall_score_min, overall_score_max
+        FROM analysis_daily
+    ''').fetchall()
+    assert daily == [(day_start, 'running shoes', 3, 130.0, 2, 40.0, 90.0)]
+    
+    # Statistics are all-time totals
+    assert tracker.get_statistics()['total_analyses'] == 4
+
+def test_bucketed_progress_includes_rolled_up_days(tracker, retention, day_start):
+    old = _save(tracker, [40, 90])
+    _backdate(tracker, old, day_start + 3600)
+    retention.run_once()
+    
+    # A window that starts inside the rolled-up day still includes it
+    days = (time.time() - (day_start + 1800)) / DAY
+    progress = tracker.get_progress_data(days=days, bucket='day')
+    
+    day = datetime.fromtimestamp(day_start, timezone.utc).strftime('%Y-%m-%dT%H:%M:%S')
+    assert (progress[0]['timestamp'], progress[0]['count'], progress[0]['overall_score']) == (day, 2, 65.0)
+    assert (progress[0]['overall_score_min'], progress[0]['overall_score_max']) == (40.0, 90.0)
+    
+    # Rolled-up days can't be filtered by URL or split into hours
+    assert tracker.get_progress_data(days=days, bucket='day', url='site.test') == []
+    assert tracker.get_progress_data(days=days, bucket='hour') == []
+
+def test_freed_pages_are_returned_to_the_file_system(tracker, retention):
+    old = _save(tracker, list(range(40)))
+    _backdate(tracker, old, int(time.time()) - 40 * DAY)
+    pages = tracker._connect().execute('PRAGMA page_count').fetchone()[0]
+    
+    summary = retention.run_once()
+    
+    assert summary['pages_vacuumed'] > 0
+    assert tracker._connect().execute('PRAGMA page_count').fetchone()[0] == pages - summary['pages_vacuumed']
+    assert tracker._connect().execute('PRAGMA freelist_count').fetchone()[0] == 0
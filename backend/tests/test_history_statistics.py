@@ -0,0 +1,81 @@
+import json
+import time
+from utils.history_tracker import SCORE_COLUMNS
+
+ANALYSES = [
+    ('running shoes', 80, 70), ('running shoes', 60, None), ('trail shoes', 45, 50),
+    ('', 90, 85), (None, 30, None), ('hiking boots', None, 40), ('trail shoes', 75, 65)
+]
+
+def _save(tracker, analyses):
+    return tracker.save_many([
+        {'url': f'https://site.test/{index}', 'target_keyword': keyword, 'overall_score': overall,
+         'seo': {'score': seo} if seo is not None else {}}
+        for index, (keyword, overall, seo) in enumerate(analyses)
+    ])
+
+def _from_scratch(tracker):
+    """get_statistics computed from the history rows and rolled-up days themselves"""
+    conn = tracker._connect()
+    sources = [('analysis_history', 'COUNT(*)', 'TOTAL({0}), COUNT({0})'),
+               ('analysis_daily', 'TOTAL(analyses)', 'TOTAL({0}_sum), TOTAL({0}_count)')]
+    
+    total = sum(conn.execute(f'SELECT {count} FROM {table}').fetchone()[0] for table, count, _ in sources)
+    
+    avg_scores = {}
+    for column in SCORE_COLUMNS:
+        score_sum = score_count = 0
+        for table, _, aggregates in sources:
+            row = conn.execute(f'SELECT {aggregates.format(column)} FROM {table}').fetchone()
+            score_sum += row[0]
+            score_count += row[1]
+        average = score_sum / score_count if score_count else None
+        avg_scores[column[:-len('_score')]] = round(average, 1) if average else 0
+    
+    counts = {}
+    for table, count, _ in sources:
+        for keyword, analyses in conn.execute(
+            f"SELECT target_keyword, {count} FROM {table} WHERE target_keyword != '' GROUP BY 1"
+        ):
+            counts[keyword] = counts.get(keyword, 0) + int(analyses)
+    top_keywords = sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:5]
+    
+    return {
+        'total_analyses': int(total),
+        'avg_scores': avg_scores,
+        'top_keywords': [{'keyword': keyword, 'count': count} for keyword, count in top_keywords]
+    }
+
+def test_totals_match_the_history_after_saves(tracker):
+    _save(tracker, ANALYSES)
+    _save(tracker, ANALYSES[:3])
+    
+    assert tracker.get_statistics() == _from_scratch(tracker)
+    assert tracker.get_statistics()['total_analyses'] == 10
+
+def test_totals_match_after_analyses_are_rolled_up(tracker):
+    ids = _save(tracker, ANALYSES)
+    old = ids[1:5]
+    tracker._connect().execute(
+        'UPDATE analysis_history SET created_ts = ? WHERE id IN (SELECT value FROM json_each(?))',
+        (int(time.time()) - 400 * 86400, json.dumps(old))
+    )
+    
+    assert tracker.roll_up_analyses(old) == len(old)
+    assert tracker._connect().execute('SELECT COUNT(*) FROM analysis_history').fetchone()[0] == len(ids) - len(old)
+    
+    # Rolled-up analyses still count: the totals are all-time
+    assert tracker.get_statistics() == _from_scratch(tracker)
+    assert tracker.get_statistics()['total_analyses'] == len(ids)
+
+def test_totals_match_after_reset(tracker):
+    _save(tracker, ANALYSES)
+    
+    tracker.reset()
+    
+    assert tracker.get_statistics() == _from_scratch(tracker)
+    assert tracker.get_statistics()['total_analyses'] == 0
+    
+    _save(tracker, ANALYSES[:2])
+    assert tracker.get_statistics() == _from_scratch(tracker)
+    assert tracker.get_statistics()['top_keywords'] == [{'keyword': 'running shoes', 'count': 2}]
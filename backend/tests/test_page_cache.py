@@ -0,0 +1,142 @@
+import threading
+import pytest
+import requests
+from utils import page_cache, serp_scraper
+from utils.page_cache import PageCache
+from utils.serp_cache import SERPCache
+from utils.serp_scraper import SERPScraper
+
+PAGE_URL = 'https://competitor.test/guide'
+PAGE_HTML = b'<html><body><main><h1>Guide</h1><p>Running shoes for every runner.</p></main></body></html>'
+
+class FakeResponse:
+    def __init__(self, status_code, content=b'', headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+    
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f'{self.status_code} error')
+
+class FakeHTTP:
+    """Answers each get() with the next queued response (or raises it)"""
+    
+    def __init__(self):
+        self.responses = []
+        self.requests = []
+    
+    def get(self, url, headers=None, timeout=None):
+        self.requests.append(headers or {})
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+@pytest.fixture
+def cache(tmp_path, clock, monkeypatch):
+    monkeypatch.delenv('PAGE_CACHE_ENABLED', raising=False)
+    monkeypatch.setattr(page_cache, 'time', clock)
+    return PageCache(db_path=str(tmp_path / 'page_cache.db'), ttl=60, max_entries=2)
+
+@pytest.fixture
+def http():
+    return FakeHTTP()
+
+@pytest.fixture
+def scraper(tmp_path, cache, http, monkeypatch):
+    serp = SERPCache(db_path=str(tmp_path / 'serp_cache.db'))
+    monkeypatch.setattr(serp_scraper, 'get_page_cache', lambda: cache)
+    monkeypatch.setattr(serp_scraper, 'get_serp_cache', lambda: serp)
+    monkeypatch.setattr(serp_scraper, 'get_http_client', lambda: http)
+    return SERPScraper()
+
+def test_lookup_reports_freshness(cache, clock):
+    assert cache.lookup(PAGE_URL) is None
+    
+    cache.store(PAGE_URL, {'text': 'cached'}, etag='"v1"')
+    assert cache.lookup(PAGE_URL) == {'content': {'text': 'cached'}, 'etag': '"v1"', 'last_modified': None, 'fresh': True}
+    
+    clock.advance(61)
+    assert cache.lookup(PAGE_URL)['fresh'] is False
+    
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['stale']) == (1, 1, 1)
+
+def test_least_recently_used_pages_are_evicted(cache, clock):
+    cache.store('https://a.test', {'text': 'a'})
+    clock.advance(1)
+    cache.store('https://b.test', {'text': 'b'})
+    clock.advance(1)
+    cache.lookup('https://a.test')
+    clock.advance(1)
+    cache.store('https://c.test', {'text': 'c'})
+    
+    assert cache.lookup('https://b.test') is None
+    assert cache.lookup('https://a.test') is not None
+    assert cache.stats()['evictions'] == 1
+
+def test_fresh_page_is_served_without_a_request(scraper, http):
+    http.responses.append(FakeResponse(200, PAGE_HTML, {'ETag': '"v1"'}))
+    
+    first = scraper._fetch_page(PAGE_URL)
+    
+    assert scraper._fetch_page(PAGE_URL) == first
+    assert len(http.requests) == 1
+
+def test_stale_page_is_revalidated_with_validators(scraper, http, cache, clock):
+    http.responses.append(FakeResponse(200, PAGE_HTML, {'ETag': '"v1"', 'Last-Modified': 'Tue, 01 Oct 2024 00:00:00 GMT'}))
+    first = scraper._fetch_page(PAGE_URL)
+    clock.advance(61)
+    
+    http.responses.append(FakeResponse(304))
+    assert scraper._fetch_page(PAGE_URL) == first
+    assert http.requests[1]['If-None-Match'] == '"v1"'
+    assert http.requests[1]['If-Modified-Since'] == 'Tue, 01 Oct 2024 00:00:00 GMT'
+    assert cache.stats()['revalidated'] == 1
+    
+    # Revalidation restarts the TTL
+    assert scraper._fetch_page(PAGE_URL) == first
+    assert len(http.requests) == 2
+
+@pytest.mark.parametrize('failure', [
+    requests.exceptions.ConnectionError('unreachable'),
+    FakeResponse(503)
+])
+def test_stale_page_is_served_when_revalidation_fails(scraper, http, cache, clock, failure):
+    http.responses.append(FakeResponse(200, PAGE_HTML))
+    first = scraper._fetch_page(PAGE_URL)
+    clock.advance(61)
+    
+    http.responses.append(failure)
+    
+    assert scraper._fetch_page(PAGE_URL) == first
+    assert cache.stats()['stale_served'] == 1
+
+def test_uncached_page_failure_is_raised(scraper, http):
+    http.responses.append(FakeResponse(503))
+    
+    with pytest.raises(requests.exceptions.HTTPError):
+        scraper._fetch_page(PAGE_URL)
+
+def test_concurrent_fetchers_share_the_cache(cache):
+    errors = []
+    
+    def work(worker):
+        try:
+            for index in range(50):
+                cache.store(f'https://{worker}.test/{index % 5}', {'text': str(index)})
+                cache.lookup(f'https://{(worker + 1) % 8}.test/{index % 5}')
+        except Exception as e:
+            errors.append(e)
+        finally:
+            cache.close()
+    
+    threads = [threading.Thread(target=work, args=(worker,)) for worker in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert errors == []
+    assert cache.stats()['entries'] == 2
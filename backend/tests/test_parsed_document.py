@@ -0,0 +1,90 @@
+import re
+import pytest
+from utils.parsed_document import ParsedDocument
+
+ARTICLE = (
+    "# Running Shoes Guide\n\nRunning shoes are defined as footwear built for running. "
+    "In my experience, cushioned running shoes cut injuries by 20%! We tested 12 pairs in 2025.\n\n"
+    "## How do you choose running shoes?\n\n- Check the fit\n- Check the drop\n\n"
+    "According to a 2024 study, most runners replace their shoes every 500 miles... Don't wait longer.\n"
+)
+
+TEXTS = {
+    'article': ARTICLE,
+    'empty': '',
+    'no terminator': 'running shoes for trail and road',
+    'unicode': 'Café crème brûlée — naïve façade?\n\nΣωκράτης έγραψε… 東京の ランニング シューズ!'
+}
+
+# Each analyzer call as build_analysis_tasks makes it, with the document in place of `text`
+ANALYZER_CALLS = {
+    'seo': lambda services, text: services.seo.analyze(text, ['Running Shoes Guide'], 'A guide', 'running shoes'),
+    'serp_performance': lambda services, text: services.serp.analyze(text, 'running shoes', 'https://site.test'),
+    'aeo': lambda services, text: services.aeo.analyze(text, ['How do you choose running shoes?']),
+    'humanization': lambda services, text: services.humanization.analyze(text),
+    'differentiation': lambda services, text: services.differentiation.analyze(text, 'running shoes'),
+    'sentiment': lambda services, text: services.sentiment.analyze(text),
+    'entities': lambda services, text: services.entities.analyze(text),
+    'freshness': lambda services, text: services.freshness.analyze(text),
+    'plagiarism': lambda services, text: services.plagiarism.analyze(text),
+    'schema': lambda services, text: services.schema.generate(text, 'https://site.test', 'running shoes')
+}
+
+def _outcome(call):
+    """The call's result, or the error it raised"""
+    try:
+        return call()
+    except Exception as e:
+        return type(e), str(e)
+
+@pytest.mark.parametrize('text_name', TEXTS)
+@pytest.mark.parametrize('name', ANALYZER_CALLS)
+def test_analyzers_give_the_same_output_for_text_and_document(app_module, monkeypatch, name, text_name):
+    call = ANALYZER_CALLS[name]
+    text = TEXTS[text_name]
+    
+    # The schema's datePublished/dateModified would differ between the two calls
+    monkeypatch.setattr(type(app_module.services.schema), 'current_date', '2025-01-01T00:00:00')
+    
+    assert _outcome(lambda: call(app_module.services, ParsedDocument(text))) == _outcome(
+        lambda: call(app_module.services, text)
+    )
+
+@pytest.mark.parametrize('text', TEXTS.values(), ids=list(TEXTS))
+def test_views_match_the_expressions_they_replace(text):
+    doc = ParsedDocument(text)
+    
+    assert doc.words == text.split()
+    assert doc.word_count == len(text.split())
+    assert doc.sentences == re.split(r'[.!?]+', text)
+    assert doc.paragraphs == text.split('\n\n')
+    assert [token for token, _, _ in doc.word_spans] == doc.words
+    assert all(text[start:end] == token for token, start, end in doc.word_spans)
+
+def test_empty_text():
+    doc = ParsedDocument(None)
+    
+    assert (doc.words, doc.word_count, doc.word_spans) == ([], 0, [])
+    assert doc.sentences == ['']
+    assert doc.paragraphs == ['']
+
+def test_text_without_a_sentence_terminator_is_one_sentence():
+    doc = ParsedDocument('running shoes for trail and road')
+    
+    assert doc.sentences == ['running shoes for trail and road']
+    assert doc.paragraphs == ['running shoes for trail and road']
+
+def test_unicode_text():
+    doc = ParsedDocument(TEXTS['unicode'])
+    
+    assert doc.words[:3] == ['Café', 'crème', 'brûlée']
+    assert doc.word_spans[-1] == ('シューズ!', len(TEXTS['unicode']) - 5, len(TEXTS['unicode']))
+    assert doc.sentences == ['Café crème brûlée — naïve façade', '\n\nΣωκράτης έγραψε… 東京の ランニング シューズ', '']
+    assert len(doc.paragraphs) == 2
+    assert doc.word_frequencies['façade'] == 1
+
+def test_of_reuses_a_parsed_document():
+    doc = ParsedDocument('running shoes')
+    
+    assert ParsedDocument.of(doc) is doc
+    assert ParsedDocument.of('running shoes').text == 'running shoes'
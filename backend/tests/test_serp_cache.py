@@ -0,0 +1,117 @@
+import sqlite3
+import threading
+from types import SimpleNamespace
+import pytest
+from utils import serp_cache, serp_scraper
+from utils.serp_cache import SERPCache
+
+@pytest.fixture
+def cache(tmp_path, clock, monkeypatch):
+    monkeypatch.delenv('SERP_CACHE_ENABLED', raising=False)
+    monkeypatch.setattr(serp_cache, 'time', clock)
+    return SERPCache(db_path=str(tmp_path / 'serp_cache.db'), ttl=60, max_entries=3)
+
+def test_hit_within_ttl(cache):
+    cache.set('organic', 'running shoes', 10, [{'url': 'https://a.com'}])
+    
+    assert cache.get('organic', 'running shoes', 10) == [{'url': 'https://a.com'}]
+    assert cache.stats()['hits'] == 1
+
+def test_queries_are_case_and_whitespace_insensitive(cache):
+    cache.set('organic', 'Running  Shoes', 10, ['cached'])
+    
+    assert cache.get('organic', ' running shoes ', 10) == ['cached']
+
+def test_key_includes_result_count_and_locale(cache):
+    cache.set('organic', 'running shoes', 10, ['us'])
+    
+    assert cache.get('organic', 'running shoes', 20) is None
+    assert cache.get('organic', 'running shoes', 10, gl='uk') is None
+    assert cache.get('paa', 'running shoes', 10) is None
+
+def test_expired_entry_is_a_miss_and_removed(cache, clock):
+    cache.set('organic', 'running shoes', 10, ['old'])
+    clock.advance(61)
+    
+    assert cache.get('organic', 'running shoes', 10) is None
+    assert cache.stats()['entries'] == 0
+    assert cache.stats()['misses'] == 1
+
+def test_least_recently_used_entries_are_evicted(cache, clock):
+    for query in ['a', 'b', 'c']:
+        cache.set('organic', query, 10, [query])
+        clock.advance(1)
+    
+    # Reading 'a' makes 'b' the least recently used
+    cache.get('organic', 'a', 10)
+    clock.advance(1)
+    cache.set('organic', 'd', 10, ['d'])
+    
+    assert cache.get('organic', 'b', 10) is None
+    assert [cache.get('organic', query, 10) for query in ['a', 'c', 'd']] == [['a'], ['c'], ['d']]
+    assert cache.stats()['evictions'] == 1
+
+def test_disabled_cache_stores_nothing(tmp_path, monkeypatch):
+    monkeypatch.setenv('SERP_CACHE_ENABLED', 'false')
+    cache = SERPCache(db_path=str(tmp_path / 'serp_cache.db'))
+    
+    cache.set('organic', 'running shoes', 10, ['cached'])
+    
+    assert cache.get('organic', 'running shoes', 10) is None
+    assert cache.stats()['entries'] == 0
+
+class BrokenCache:
+    def get(self, *args):
+        raise sqlite3.OperationalError('database is locked')
+    
+    def set(self, *args):
+        raise sqlite3.OperationalError('database is locked')
+
+class SerperHTTP:
+    """Answers the Serper.dev search; any other request fails the test"""
+    
+    def __init__(self):
+        self.calls = []
+    
+    def post(self, url, **kwargs):
+        self.calls.append(url)
+        organic = [{'link': 'https://a.com', 'title': 'A', 'snippet': 'a', 'position': 1}]
+        return SimpleNamespace(status_code=200, json=lambda: {'organic': organic})
+    
+    def get(self, url, **kwargs):
+        self.calls.append(url)
+        raise AssertionError(f'Unexpected request to {url}')
+
+def test_cache_errors_never_cause_a_second_paid_call(monkeypatch):
+    http = SerperHTTP()
+    monkeypatch.setattr(serp_scraper, 'get_serp_cache', lambda: BrokenCache())
+    monkeypatch.setattr(serp_scraper, 'get_page_cache', lambda: None)
+    monkeypatch.setattr(serp_scraper, 'get_http_client', lambda: http)
+    
+    results = serp_scraper.SERPScraper().search_google('running shoes')
+    
+    assert [result['url'] for result in results] == ['https://a.com']
+    assert http.calls == ['https://google.serper.dev/search']
+
+def test_concurrent_lookups_and_writes_do_not_fail(cache):
+    cache.max_entries = 20
+    errors = []
+    
+    def work(worker):
+        try:
+            for index in range(50):
+                cache.set('organic', f'query {worker} {index % 30}', 10, [index])
+                cache.get('organic', f'query {(worker + 1) % 8} {index % 30}', 10)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            cache.close()
+    
+    threads = [threading.Thread(target=work, args=(worker,)) for worker in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert errors == []
+    assert cache.stats()['entries'] == 20
@@ -0,0 +1,213 @@
+import json
+import os
+import sqlite3
+import time
+from datetime import datetime, timedelta
+import pytest
+from utils.share_link_manager import ShareLinkManager
+
+REPORT = {'url': 'https://site.test/guide', 'overall_score': 72, 'seo': {'score': 80}}
+
+@pytest.fixture
+def legacy_file(tmp_path):
+    return str(tmp_path / 'shared_reports.json')
+
+@pytest.fixture
+def shares(tmp_path, legacy_file):
+    # No background thread; views are written by flush_views()
+    manager = ShareLinkManager(db_path=str(tmp_path / 'shares.db'), legacy_file=legacy_file, flush_interval=0)
+    yield manager
+    manager.close()
+
+def _legacy_share(results, expires_in_days, view_count=0):
+    now = datetime.now()
+    return {
+        'results': results,
+        'created_at': now.isoformat(),
+        'expires_at': (now + timedelta(days=expires_in_days)).isoformat(),
+        'view_count': view_count
+    }
+
+def test_created_link_serves_the_report(shares):
+    link = shares.create_share_link(REPORT)
+    
+    assert link['url'] == f"/share/{link['token']}"
+    assert shares.get_shared_report(link['token']) == REPORT
+    assert shares.get_shared_report('unknown') is None
+
+def test_deleted_link_is_gone(shares):
+    token = shares.create_share_link(REPORT)['token']
+    
+    assert shares.delete_share_link(token)
+    assert shares.get_shared_report(token) is None
+    assert not shares.delete_share_link(token)
+
+def test_expired_links_are_not_served_and_cleaned_up(shares):
+    expired = shares.create_share_link(REPORT, expiry_days=-1)['token']
+    live = shares.create_share_link(REPORT)['token']
+    
+    assert shares.get_shared_report(expired) is None
+    assert shares.cleanup_expired() == 1
+    assert shares.get_shared_report(live) == REPORT
+
+def test_legacy_json_shares_are_imported_once(tmp_path, legacy_file):
+    with open(legacy_file, 'w') as f:
+        json.dump({
+            'live-token': _legacy_share(REPORT, 5, view_count=4),
+            'expired-token': _legacy_share(REPORT, -5),
+            'broken-token': {'results': REPORT}
+        }, f)
+    
+    manager = ShareLinkManager(db_path=str(tmp_path / 'shares.db'), legacy_file=legacy_file, flush_interval=0)
+    
+    assert manager.get_shared_report('live-token') == REPORT
+    assert manager.get_shared_report('expired-token') is None
+    assert not os.path.exists(legacy_file)
+    assert os.path.exists(legacy_file + '.migrated')
+    assert manager._connect().execute(
+        "SELECT view_count FROM shared_reports WHERE token = 'live-token'"
+    ).fetchone()[0] == 4
+    manager.close()
+
+def test_unreadable_legacy_file_is_kept_for_the_next_start(tmp_path, legacy_file):
+    with open(legacy_file, 'w') as f:
+        f.write('{"live-token": ')
+    
+    manager = ShareLinkManager(db_path=str(tmp_path / 'shares.db'), legacy_file=legacy_file, flush_interval=0)
+    
+    assert os.path.exists(legacy_file)
+    assert not os.path.exists(legacy_file + '.migrated')
+    manager.close()
+
+def test_reset_clears_links_in_place(shares):
+    token = shares.create_share_link(REPORT)['token']
+    
+    shares.reset()
+    
+    assert shares.get_shared_report(token) is None
+    assert os.path.exists(shares.db_path)
+    assert shares.get_shared_report(shares.create_share_link(REPORT)['token']) == REPORT
+
+def _view_count(manager, token):
+    return manager._connect().execute('SELECT view_count FROM shared_reports WHERE token = ?', (token,)).fetchone()[0]
+
+def test_views_are_written_in_batches(shares):
+    token = shares.create_share_link(REPORT)['token']
+    for _ in range(3):
+        shares.get_shared_report(token)
+    
+    assert _view_count(shares, token) == 0
+    assert shares.flush_views() == 3
+    assert _view_count(shares, token) == 3
+    assert shares.flush_views() == 0
+
+def test_shutdown_writes_pending_views(shares):
+    token = shares.create_share_link(REPORT)['token']
+    shares.get_shared_report(token)
+    
+    shares.shutdown()
+    
+    assert _view_count(shares, token) == 1
+
+def test_reset_drops_pending_views(shares):
+    shares.get_shared_report(shares.create_share_link(REPORT)['token'])
+    
+    shares.reset()
+    
+    assert shares.flush_views() == 0
+
+def test_background_thread_only_runs_once_started(tmp_path, legacy_file):
+    manager = ShareLinkManager(
+        db_path=str(tmp_path / 'shares.db'), legacy_file=legacy_file, flush_interval=60, flush_threshold=2
+    )
+    assert manager._flusher is None
+    
+    manager.start()
+    token = manager.create_share_link(REPORT)['token']
+    manager.get_shared_report(token)
+    manager.get_shared_report(token)
+    
+    # The threshold wakes the thread long before the interval
+    deadline = time.time() + 5
+    while _view_count(manager, token) < 2 and time.time() < deadline:
+        time.sleep(0.01)
+    
+    assert _view_count(manager, token) == 2
+    manager.shutdown()
+    assert not manager._flusher.is_alive()
+
+def _payloads(manager):
+    return manager._connect().execute('SELECT hash, ref_count FROM share_payloads ORDER BY ref_count').fetchall()
+
+def test_identical_reports_share_one_payload(shares):
+    shares.create_share_link(REPORT)
+    shares.create_share_link(dict(reversed(list(REPORT.items()))))
+    shares.create_share_link({'url': 'https://other.test', 'overall_score': 10})
+    
+    assert [ref_count for _, ref_count in _payloads(shares)] == [1, 2]
+
+def test_payload_is_deleted_with_its_last_link(shares):
+    first = shares.create_share_link(REPORT)['token']
+    second = shares.create_share_link(REPORT)['token']
+    
+    shares.delete_share_link(first)
+    assert [ref_count for _, ref_count in _payloads(shares)] == [1]
+    assert shares.get_shared_report(second) == REPORT
+    
+    shares.delete_share_link(second)
+    assert _payloads(shares) == []
+
+def test_cleanup_releases_payloads_of_expired_links(shares):
+    shares.create_share_link(REPORT, expiry_days=-1)
+    shares.create_share_link(REPORT, expiry_days=-1)
+    live = shares.create_share_link({'url': 'https://other.test', 'overall_score': 10})['token']
+    
+    assert shares.cleanup_expired() == 2
+    assert [ref_count for _, ref_count in _payloads(shares)] == [1]
+    assert shares.get_shared_report(live) is not None
+
+def test_inline_results_are_moved_to_payloads(tmp_path, legacy_file):
+    # shares.db as it was before payloads were deduplicated (user_version 0)
+    db_path = str(tmp_path / 'shares.db')
+    conn = sqlite3.connect(db_path)
+    conn.execute('''
+        CREATE TABLE shared_reports (
+            token TEXT PRIMARY KEY,
+            results TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            expires_at REAL NOT NULL,
+            view_count INTEGER DEFAULT 0
+        )
+    ''')
+    conn.execute('CREATE INDEX idx_shares_expires_at ON shared_reports(expires_at)')
+    now = time.time()
+    conn.executemany('INSERT INTO shared_reports VALUES (?, ?, ?, ?, ?)', [
+        ('first', json.dumps(REPORT), now, now + 3600, 3),
+        ('second', json.dumps(dict(reversed(list(REPORT.items())))), now, now + 3600, 0)
+    ])
+    conn.commit()
+    conn.close()
+    
+    manager = ShareLinkManager(db_path=db_path, legacy_file=legacy_file, flush_interval=0)
+    
+    assert manager._connect().execute('PRAGMA user_version').fetchone()[0] == 1
+    assert [ref_count for _, ref_count in _payloads(manager)] == [2]
+    assert manager.get_shared_report('first') == REPORT
+    assert manager.get_shared_report('second') == REPORT
+    assert _view_count(manager, 'first') == 3
+    manager.close()
+
+def test_threshold_flushes_inline_without_the_background_thread(tmp_path, legacy_file):
+    manager = ShareLinkManager(
+        db_path=str(tmp_path / 'shares.db'), legacy_file=legacy_file, flush_interval=0, flush_threshold=2
+    )
+    expired = manager.create_share_link(REPORT, expiry_days=-1)['token']
+    token = manager.create_share_link(REPORT)['token']
+    
+    manager.get_shared_report(token)
+    assert _view_count(manager, token) == 0
+    manager.get_shared_report(token)
+    
+    assert _view_count(manager, token) == 2
+    assert manager.delete_share_link(expired) is False
+    manager.close()
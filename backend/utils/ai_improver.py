@@ -1,6 +1,6 @@
 import os
-import requests
 from groq import Groq
+from utils.http_client import get_http_client
 
 class AIContentImprover:
     """AI-powered content improvement suggestions using Groq (fast & free)"""
@@ -27,6 +27,9 @@ class AIContentImprover:
             print(f"Gemini API key found (length: {len(self.gemini_api_key)})")
         else:
             print("GEMINI_API_KEY environment variable not found or empty")
+        
+        # Shared keep-alive connection pools (used for Gemini)
+        self.http = get_http_client()
     
     def analyze_and_suggest(self, content, analysis_results):
         """
@@ -180,7 +183,7 @@ Keep suggestions concise and practical."""
         # Fallback to Gemini
         if self.gemini_api_key:
             try:
-                response = requests.post(
+                response = self.http.post(
                     f'https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:generateContent?key={self.gemini_api_key}',
                     json={
                         'contents': [{
@@ -293,7 +296,7 @@ Improved version:"""
         if self.gemini_api_key:
             try:
                 print(f"Trying Gemini API for rewrite...")
-                response = requests.post(
+                response = self.http.post(
                     f'https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:generateContent?key={self.gemini_api_key}',
                     json={
                         'contents': [{
@@ -0,0 +1,131 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+class AnalysisTask:
+    """A single analyzer call in the analysis dependency graph"""
+    
+    def __init__(self, name, func, args=(), kwargs=None, kind='cpu', depends_on=None):
+        """
+        Args:
+            name: Result key for this task (e.g. 'seo', 'serp_performance')
+            func: Callable that performs the analysis
+            args: Positional arguments for func
+            kwargs: Keyword arguments for func
+            kind: 'network' for I/O-bound tasks, 'cpu' for text analysis
+            depends_on: Names of tasks that must finish first. Their results
+                are passed to func as keyword arguments named after the task.
+        """
+        self.name = name
+        self.func = func
+        self.args = tuple(args)
+        self.kwargs = dict(kwargs or {})
+        self.kind = kind
+        self.depends_on = list(depends_on or [])
+
+class AnalysisEngine:
+    """
+    Run analyzer tasks concurrently while respecting their dependencies
+    
+    CPU tasks run on threads by default, so they hold the GIL in turn: the gain comes
+    from overlapping them with the network tasks (SERP and competitor fetches), not from
+    running them in parallel. Process mode (ANALYSIS_CPU_MODE=process) pickles each
+    analyzer and document per call, which costs more than the analyzers themselves
+    (about 30 ms of CPU work per page); compare with utils/benchmark_analysis.py --cpu-mode.
+    """
+    
+    def __init__(self, network_workers=None, cpu_workers=None, cpu_mode=None):
+        self.network_workers = network_workers or int(os.getenv('ANALYSIS_NETWORK_WORKERS', 16))
+        self.cpu_workers = cpu_workers or int(os.getenv('ANALYSIS_CPU_WORKERS', os.cpu_count() or 4))
+        self.cpu_mode = cpu_mode or os.getenv('ANALYSIS_CPU_MODE', 'thread')
+        
+        # Network-bound analyzers spend their time waiting on sockets, so threads are enough
+        self._network_pool = ThreadPoolExecutor(
+            max_workers=self.network_workers,
+            thread_name_prefix='analysis-net'
+        )
+        
+        # CPU-bound analyzers can optionally run in separate processes to sidestep the GIL
+        if self.cpu_mode == 'process':
+            self._cpu_pool = ProcessPoolExecutor(max_workers=self.cpu_workers)
+        else:
+            self._cpu_pool = ThreadPoolExecutor(
+                max_workers=self.cpu_workers,
+                thread_name_prefix='analysis-cpu'
+            )
+    
+    def run(self, tasks):
+        """
+        Run all tasks and return a dict of results keyed by task name
+        """
+        return dict(self.iter_results(tasks))
+    
+    def iter_results(self, tasks):
+        """
+        Run all tasks, yielding (name, result) tuples as each one finishes.
+        Tasks start as soon as all of their dependencies are done.
+        If any task raises, pending tasks are cancelled and the error is re-raised.
+        """
+        tasks_by_name = {task.name: task for task in tasks}
+        self._validate(tasks_by_name)
+        
+        results = {}
+        waiting = dict(tasks_by_name)
+        running = {}
+        
+        try:
+            while waiting or running:
+                # Submit every task whose dependencies are satisfied
+                for name, task in list(waiting.items()):
+                    if all(dep in results for dep in task.depends_on):
+                        future = self._submit(task, results)
+                        running[future] = name
+                        del waiting[name]
+                
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                
+                for future in done:
+                    name = running.pop(future)
+                    results[name] = future.result()
+                    yield name, results[name]
+        
+        finally:
+            for future in running:
+                future.cancel()
+    
+    def shutdown(self, wait=True):
+        """Stop the worker pools"""
+        self._network_pool.shutdown(wait=wait)
+        self._cpu_pool.shutdown(wait=wait)
+    
+    def _submit(self, task, results):
+        """Submit a task to the pool that matches its kind"""
+        kwargs = dict(task.kwargs)
+        for dep in task.depends_on:
+            kwargs[dep] = results[dep]
+        
+        pool = self._network_pool if task.kind == 'network' else self._cpu_pool
+        return pool.submit(task.func, *task.args, **kwargs)
+    
+    def _validate(self, tasks_by_name):
+        """Reject unknown dependencies and dependency cycles"""
+        for task in tasks_by_name.values():
+            for dep in task.depends_on:
+                if dep not in tasks_by_name:
+                    raise ValueError(f"Task '{task.name}' depends on unknown task '{dep}'")
+        
+        visited = set()
+        visiting = set()
+        
+        def visit(name):
+            if name in visited:
+                return
+            if name in visiting:
+                raise ValueError(f"Dependency cycle detected at task '{name}'")
+            visiting.add(name)
+            for dep in tasks_by_name[name].depends_on:
+                visit(dep)
+            visiting.remove(name)
+            visited.add(name)
+        
+        for name in tasks_by_name:
+            visit(name)
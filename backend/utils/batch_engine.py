@@ -0,0 +1,269 @@
+import os
+import time
+import uuid
+import socket
+import threading
+import requests
+from concurrent.futures import ThreadPoolExecutor, wait
+from utils.competitor_corpus import CompetitorCorpus
+from utils.batch_similarity import BatchSimilarity
+
+class BatchEngine:
+    """
+    Server-side batch runner: drains batch URLs on a worker pool and
+    records each item's outcome through HistoryTracker.update_batch_items.
+    Items sharing a target keyword share one CompetitorCorpus, so each
+    keyword's SERP query and competitor pages are fetched once per batch.
+    Items are claimed in keyword order and a corpus is dropped once its
+    keyword is drained, so at most a wave's keywords are held in memory.
+    Items are processed in waves: extract every page of the wave, fit one
+    TF-IDF model for the whole wave, analyze the items concurrently, then
+    save the wave's reports and item statuses in one transaction.
+    
+    Work is leased from batch_items: each wave claims its items with an
+    expiring lease that a heartbeat thread renews while they run. Leases left
+    behind by a crashed worker expire and are claimed again (up to
+    max_attempts), so several processes can drain one batch and a restarted
+    server resumes where it stopped.
+    """
+    
+    def __init__(self, analyze_url, services, workers=None, wave_size=None, max_active_batches=None,
+                 lease_seconds=None, max_attempts=None):
+        """
+        Args:
+            analyze_url: Callable (url, target_keyword, corpus, content_data, similarities, save=False)
+                -> unsaved results dict (with overall_score), or None if no content
+            services: ServiceRegistry (history tracker, text extractor, scraper, analyzers)
+            workers: Number of URLs extracted and analyzed concurrently
+            wave_size: Number of items claimed together and sharing one TF-IDF fit
+            max_active_batches: Number of batches drained concurrently
+            lease_seconds: How long a claimed item stays reserved without a heartbeat
+            max_attempts: Claims allowed per item before it is marked failed
+        """
+        self.analyze_url = analyze_url
+        self.services = services
+        self.tracker = services.history
+        self.workers = workers or int(os.getenv('BATCH_WORKERS', 8))
+        self.wave_size = wave_size or int(os.getenv('BATCH_WAVE_SIZE', 50))
+        self.max_active_batches = max_active_batches or int(os.getenv('BATCH_MAX_ACTIVE', 2))
+        self.lease_seconds = lease_seconds or int(os.getenv('BATCH_LEASE_SECONDS', 120))
+        self.max_attempts = max_attempts or int(os.getenv('BATCH_MAX_ATTEMPTS', 3))
+        self.similarity = BatchSimilarity()
+        
+        # Pause before retrying after an error outside a wave
+        self.retry_delay = 5
+        
+        # Identifies this process's leases
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='batch-worker')
+        self._coordinator = ThreadPoolExecutor(max_workers=self.max_active_batches, thread_name_prefix='batch-planner')
+        
+        # Items this process currently holds leases on
+        self._held = set()
+        self._active_batches = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        
+        self._heartbeat = threading.Thread(target=self._renew_leases, name='batch-heartbeat', daemon=True)
+        self._heartbeat.start()
+    
+    def enqueue(self, batch_id):
+        """Start draining a batch whose items are already stored in batch_items"""
+        with self._lock:
+            if batch_id in self._active_batches:
+                return
+            self._active_batches.add(batch_id)
+        
+        self.tracker.update_batch_status(batch_id, 'running')
+        self._coordinator.submit(self._run_batch, batch_id)
+    
+    def resume(self):
+        """Pick up every batch left unfinished (e.g. by a restart)"""
+        batch_ids = self.tracker.get_unfinished_batches()
+        for batch_id in batch_ids:
+            self.enqueue(batch_id)
+        return batch_ids
+    
+    def shutdown(self, wait=True):
+        """Stop the worker pools and heartbeat (unfinished leases expire and are reclaimed later)"""
+        self._stop.set()
+        self._coordinator.shutdown(wait=wait)
+        self._executor.shutdown(wait=wait)
+    
+    def _run_batch(self, batch_id):
+        """Claim and process waves until no item of the batch is left"""
+        corpora = {}
+        
+        try:
+            while not self._stop.is_set():
+                try:
+                    items = self.tracker.claim_batch_items(
+                        batch_id, self.owner, self.wave_size, self.lease_seconds, self.max_attempts
+                    )
+                    
+                    if items:
+                        # One corpus per keyword, fetched by the first wave that needs it. Claims come in
+                        # keyword order, so keywords missing from this wave are drained and their corpora
+                        # are dropped (an item retried later refetches through the SERP and page caches)
+                        keywords = {item['target_keyword'] for item in items if item['target_keyword']}
+                        corpora = {
+                            keyword: corpora.get(keyword) or CompetitorCorpus(keyword, self.services.scraper)
+                            for keyword in keywords
+                        }
+                        
+                        self._run_wave_or_release(batch_id, items, corpora)
+                        continue
+                    
+                    # Nothing claimable; wait if other workers still hold leases, in case they die
+                    state = self.tracker.get_batch_lease_state(batch_id)
+                    if not state['pending'] and not state['leased']:
+                        break
+                    
+                    wait_seconds = (state['next_expiry'] or time.time()) - time.time()
+                    self._stop.wait(min(max(wait_seconds, 1), self.lease_seconds))
+                
+                except Exception as e:
+                    # e.g. the database is briefly unavailable; the batch is retried, not abandoned
+                    print(f"Error in batch {batch_id}: {str(e)}")
+                    self._stop.wait(self.retry_delay)
+        
+        finally:
+            with self._lock:
+                self._active_batches.discard(batch_id)
+    
+    def _run_wave_or_release(self, batch_id, wave, corpora):
+        """Run a wave; if it fails as a whole, give its items back to the queue (each claim used an attempt)"""
+        try:
+            self._run_wave(batch_id, wave, corpora)
+        except Exception as e:
+            print(f"Error in batch {batch_id} wave: {str(e)}")
+            for item in wave:
+                self.tracker.release_batch_item(item['id'], self.owner, error=str(e))
+    
+    def _run_wave(self, batch_id, wave, corpora):
+        """Extract, score similarity and analyze one wave of claimed items"""
+        with self._lock:
+            self._held.update(item['id'] for item in wave)
+        
+        try:
+            # Extract every page of the wave concurrently
+            extracted = list(self._executor.map(self._extract, [item['url'] for item in wave]))
+            contents = [content for content, _ in extracted]
+            
+            # Fetch SERP data and competitor pages once per keyword in the wave
+            keywords = sorted({item['target_keyword'] for item in wave if item['target_keyword']})
+            list(self._executor.map(lambda keyword: corpora[keyword].prefetch(), keywords))
+            
+            # One TF-IDF fit and one sparse product for every document in the wave
+            competitor_groups = {
+                keyword: self.services.differentiation.gather_competitor_content(corpora[keyword])
+                for keyword in keywords
+            }
+            ready = [
+                (item, content) for item, content in zip(wave, contents)
+                if content and content.get('text')
+            ]
+            similarities = self.similarity.compute(
+                [(content['text'], item['target_keyword'] or '') for item, content in ready],
+                competitor_groups
+            )
+            similarities_by_id = {item['id']: row for (item, _), row in zip(ready, similarities)}
+            
+            futures = [
+                self._executor.submit(
+                    self._process_item, item, corpora.get(item['target_keyword']),
+                    content, similarities_by_id.get(item['id']), extract_error
+                )
+                for item, (content, extract_error) in zip(wave, extracted)
+            ]
+            wait(futures)
+            
+            self._record_wave(batch_id, wave, [future.result() for future in futures])
+        
+        finally:
+            with self._lock:
+                self._held.difference_update(item['id'] for item in wave)
+    
+    def _extract(self, url):
+        """
+        Extract one page
+        Returns tuple (content, error); error is the exception when extraction failed
+        (recorded when the item is processed)
+        """
+        try:
+            return self.services.text_extractor.extract(url), None
+        except Exception as e:
+            print(f"Error extracting batch item {url}: {str(e)}")
+            return None, e
+    
+    def _process_item(self, item, corpus=None, content_data=None, similarities=None, extract_error=None):
+        """
+        Analyze one claimed item
+        Returns tuple (results, error, retryable); results is None when the item failed,
+        retryable says whether another attempt could succeed
+        """
+        if extract_error is not None:
+            return None, str(extract_error), self._is_transient(extract_error)
+        
+        if content_data is None or not content_data.get('text'):
+            return None, 'Could not extract content', False
+        
+        try:
+            results = self.analyze_url(
+                item['url'], item['target_keyword'] or '', corpus, content_data, similarities, save=False
+            )
+        except Exception as e:
+            print(f"Error analyzing batch item {item['url']}: {str(e)}")
+            return None, str(e), True
+        
+        if not results:
+            return None, 'Could not extract content', False
+        return results, None, False
+    
+    def _is_transient(self, error):
+        """Whether a fetch error is worth retrying: timeouts, connection errors, 429 and 5xx responses"""
+        while error is not None:
+            if isinstance(error, (TimeoutError, requests.exceptions.Timeout, requests.exceptions.ConnectionError)):
+                return True
+            if isinstance(error, requests.exceptions.HTTPError):
+                status = error.response.status_code if error.response is not None else None
+                return status is None or status == 429 or status >= 500
+            error = error.__cause__
+        return False
+    
+    def _record_wave(self, batch_id, wave, outcomes):
+        """Save a wave's reports and item statuses in one transaction (only for items we still hold)"""
+        updates = []
+        for item, (results, error, retryable) in zip(wave, outcomes):
+            if results:
+                updates.append({
+                    'id': item['id'],
+                    'status': 'completed',
+                    'overall_score': results['overall_score'],
+                    'results': results
+                })
+            elif retryable and item['attempts'] < self.max_attempts:
+                # Back to the queue for another attempt
+                updates.append({'id': item['id'], 'status': 'pending', 'error': error})
+            else:
+                updates.append({'id': item['id'], 'status': 'failed', 'error': error})
+        
+        try:
+            self.tracker.update_batch_items(batch_id, updates, lease_owner=self.owner)
+        except Exception as e:
+            # Nothing was saved; leases expire and the items are retried
+            print(f"Error recording batch {batch_id} results: {str(e)}")
+    
+    def _renew_leases(self):
+        """Heartbeat: keep leases on in-flight items alive"""
+        interval = max(self.lease_seconds / 3, 1)
+        
+        while not self._stop.wait(interval):
+            with self._lock:
+                item_ids = list(self._held)
+            
+            try:
+                self.tracker.renew_batch_leases(self.owner, item_ids, self.lease_seconds)
+            except Exception as e:
+                print(f"Error renewing batch leases: {str(e)}")
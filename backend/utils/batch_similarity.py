@@ -0,0 +1,117 @@
+import os
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import CountVectorizer
+
+class BatchSimilarity:
+    """
+    Document-vs-competitor TF-IDF similarities for a whole batch wave.
+    Every batch document and competitor text is tokenized once per wave, and
+    every document is scored against the competitors in one sparse product.
+    Each document's terms and IDF are still the ones DifferentiationAnalyzer
+    would fit on its own rows (the document plus its group's competitors):
+    they are carried as a per-document weight matrix, so batch and
+    single-URL scores for the same page are the same.
+    """
+    
+    def __init__(self, max_features=None):
+        # Same vocabulary size as DifferentiationAnalyzer's own TF-IDF fit
+        self.max_features = max_features or int(os.getenv('BATCH_TFIDF_MAX_FEATURES', 500))
+    
+    def compute(self, documents, competitor_groups):
+        """
+        Args:
+            documents: List of (text, group_key) tuples
+            competitor_groups: Dict of group_key -> list of competitor texts
+        
+        Returns list with one similarity array per document, aligned with its
+        group's competitor texts (None when the group has no competitors)
+        """
+        if not documents:
+            return []
+        
+        # Lay every group's competitor texts out in one block of rows
+        competitor_texts = []
+        spans = []
+        group_index = {}
+        for key, texts in competitor_groups.items():
+            group_index[key] = len(spans)
+            spans.append((len(competitor_texts), len(competitor_texts) + len(texts)))
+            competitor_texts.extend(texts)
+        
+        if not competitor_texts:
+            return [None] * len(documents)
+        
+        try:
+            counts = CountVectorizer(stop_words='english').fit_transform(
+                [text for text, _ in documents] + competitor_texts
+            ).tocsr().astype(np.float64)
+        except ValueError as e:
+            # Empty vocabulary (e.g. only stop words); analyzers fall back to their own fit
+            print(f"Error in batch similarity: {str(e)}")
+            return [None] * len(documents)
+        
+        document_count = len(documents)
+        doc_counts = counts[:document_count]
+        competitor_counts = counts[document_count:]
+        
+        # Documents whose group is missing or empty point at an extra empty group
+        groups = np.array([group_index.get(key, len(spans)) for _, key in documents])
+        weights = self._idf_weights(doc_counts, competitor_counts, spans, groups)
+        
+        # Cosine similarity under document i's weights w: sum(d * w^2 * c) / (|d * w| * |c * w|)
+        products = (doc_counts.multiply(weights).tocsr() @ competitor_counts.T).tocsr()
+        competitor_norms = (weights @ competitor_counts.multiply(competitor_counts).T).tocsr()
+        doc_norms = np.sqrt(np.asarray(doc_counts.multiply(doc_counts).multiply(weights).sum(axis=1)).ravel())
+        doc_norms[doc_norms == 0] = 1
+        
+        rows = []
+        for index, group in enumerate(groups):
+            # No competitors, or no terms in the document's own fit (where that fit would fail)
+            if group == len(spans) or spans[group][1] <= spans[group][0] or not weights[index].nnz:
+                rows.append(None)
+                continue
+            
+            start, end = spans[group]
+            norms = np.sqrt(competitor_norms[index, start:end].toarray().ravel())
+            norms[norms == 0] = 1
+            rows.append(products[index, start:end].toarray().ravel() / (doc_norms[index] * norms))
+        
+        return rows
+    
+    def _idf_weights(self, doc_counts, competitor_counts, spans, groups):
+        """
+        Squared IDF per document and term, over the terms TfidfVectorizer(max_features)
+        fitted on the document and its group's competitors alone would keep (0 elsewhere)
+        """
+        # Group-to-competitor indicator, with the extra empty group last
+        group_rows = np.concatenate([np.full(end - start, group) for group, (start, end) in enumerate(spans)])
+        membership = sp.csr_matrix(
+            (np.ones(len(group_rows)), (group_rows, np.arange(len(group_rows)))),
+            shape=(len(spans) + 1, competitor_counts.shape[0])
+        )
+        group_terms = (membership @ competitor_counts).tocsr()[groups]
+        group_frequency = (membership @ (competitor_counts > 0).astype(np.float64)).tocsr()[groups]
+        
+        # Term counts and document frequencies of each document's own rows (same sparsity pattern)
+        term_counts = (doc_counts + group_terms).tocsr()
+        document_frequency = ((doc_counts > 0).astype(np.float64) + group_frequency).tocsr()
+        term_counts.sort_indices()
+        document_frequency.sort_indices()
+        
+        # Smoothed IDF, TfidfVectorizer's default, over 1 + group size rows
+        row_lengths = np.diff(term_counts.indptr)
+        group_sizes = np.array([end - start for start, end in spans] + [0])
+        block_rows = np.repeat(group_sizes[groups] + 1, row_lengths)
+        idf = np.log((block_rows + 1) / (document_frequency.data + 1)) + 1
+        
+        # Keep each document's most frequent terms, picked the way TfidfVectorizer picks them
+        for index in np.flatnonzero(row_lengths > self.max_features):
+            start, end = term_counts.indptr[index], term_counts.indptr[index + 1]
+            dropped = np.ones(end - start, dtype=bool)
+            dropped[(-term_counts.data[start:end]).argsort()[:self.max_features]] = False
+            idf[start:end][dropped] = 0
+        
+        weights = sp.csr_matrix((idf ** 2, term_counts.indices, term_counts.indptr), shape=term_counts.shape)
+        weights.eliminate_zeros()
+        return weights
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark the analyzer engine against the sequential analysis path
+Run this script from the backend directory:
+
+    python utils/benchmark_analysis.py [--offline] [--cpu-mode process] [--keyword "running shoes"] [file.txt]
+
+With --offline, SERP lookups return mock results after a simulated network delay
+so the benchmark does not spend paid API calls.
+"""
+
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.analysis_engine import AnalysisEngine
+from utils.serp_scraper import SERPScraper
+
+SAMPLE_TEXT = """# The Complete Guide to Content Audits
+
+A content audit is defined as a structured review of every page on a site. In my experience, teams that audit
+quarterly grow organic traffic 30% faster. We tested this across 12 sites in 2025.
+
+## Why does it matter?
+
+Search engines reward fresh, useful content. According to Google, helpful content is written for people first.
+
+- Inventory every URL
+- Score each page
+- Decide to keep, update or remove
+
+Don't skip the last step. You'll find that pruning thin pages is often the biggest win.
+""" * 20
+
+def _use_offline_serp(delay):
+    """Replace the SERP API with mock results after a simulated delay"""
+    def search_google(self, query, num_results=10):
+        time.sleep(delay)
+        return self._get_mock_serp_results(query)[:num_results]
+    
+    SERPScraper.search_google = search_google
+
+def benchmark(text, keyword, rounds=3, cpu_mode=None):
+    """Time the sequential path and the engine path over several rounds"""
+    from app import build_analysis_tasks
+    
+    engine = AnalysisEngine(cpu_mode=cpu_mode)
+    
+    print("=" * 60)
+    print("ANALYZER BENCHMARK")
+    print(f"CPU pool: {engine.cpu_mode}")
+    print("=" * 60)
+    
+    for round_number in range(1, rounds + 1):
+        tasks = build_analysis_tasks(text, [], '', keyword, None)
+        
+        # Sequential path: every analyzer waits for the previous one
+        timings = {}
+        sequential_results = {}
+        start = time.perf_counter()
+        for task in tasks:
+            kwargs = dict(task.kwargs)
+            for dep in task.depends_on:
+                kwargs[dep] = sequential_results[dep]
+            task_start = time.perf_counter()
+            sequential_results[task.name] = task.func(*task.args, **kwargs)
+            timings[task.name] = time.perf_counter() - task_start
+        sequential_total = time.perf_counter() - start
+        
+        # Engine path: independent analyzers run concurrently
+        start = time.perf_counter()
+        engine_results = engine.run(build_analysis_tasks(text, [], '', keyword, None))
+        engine_total = time.perf_counter() - start
+        
+        slowest_name = max(timings, key=timings.get)
+        same_scores = all(
+            sequential_results[name].get('score') == engine_results[name].get('score')
+            for name in sequential_results if name != 'corpus'
+        )
+        
+        print(f"\nRound {round_number}")
+        for name, elapsed in sorted(timings.items(), key=lambda item: -item[1]):
+            print(f"  {name:<18} {elapsed * 1000:8.1f} ms")
+        print(f"  Sum of analyzers   {sum(timings.values()) * 1000:8.1f} ms")
+        print(f"  Slowest ({slowest_name}) {timings[slowest_name] * 1000:8.1f} ms")
+        print(f"  Sequential total   {sequential_total * 1000:8.1f} ms")
+        print(f"  Engine total       {engine_total * 1000:8.1f} ms")
+        print(f"  Identical scores   {'yes' if same_scores else 'NO'}")
+    
+    engine.shutdown()
+    print("\n" + "=" * 60)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the analyzer engine')
+    parser.add_argument('file', nargs='?', help='Text file to analyze (defaults to a built-in sample)')
+    parser.add_argument('--keyword', default='content audit', help='Target keyword')
+    parser.add_argument('--rounds', type=int, default=3, help='Number of benchmark rounds')
+    parser.add_argument('--offline', action='store_true', help='Use mock SERP results with simulated latency')
+    parser.add_argument('--delay', type=float, default=1.0, help='Simulated SERP latency in seconds (offline mode)')
+    parser.add_argument('--cpu-mode', choices=['thread', 'process'], help='Pool for CPU tasks (defaults to ANALYSIS_CPU_MODE)')
+    args = parser.parse_args()
+    
+    if args.offline:
+        _use_offline_serp(args.delay)
+    
+    text = SAMPLE_TEXT
+    if args.file:
+        with open(args.file, 'r', encoding='utf-8') as f:
+            text = f.read()
+    
+    try:
+        benchmark(text, args.keyword, args.rounds, args.cpu_mode)
+        sys.exit(0)
+    except Exception as e:
+        print(f"\n✗ Benchmark failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark batch competitor similarities against one TF-IDF fit per document
+Run this script from the backend directory:
+
+    python utils/benchmark_similarity.py [--documents 50] [--keywords 5] [--competitors 10]
+
+Documents and competitor pages are generated from a synthetic vocabulary, so
+no SERP lookups or page downloads are made.
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+from utils.batch_similarity import BatchSimilarity
+
+def _texts(rng, vocabulary, count, words):
+    return [' '.join(rng.choice(vocabulary) for _ in range(words)) for _ in range(count)]
+
+def _separate_fits(documents, competitor_groups):
+    """What DifferentiationAnalyzer computes: one TF-IDF fit per document and its competitors"""
+    rows = []
+    for text, key in documents:
+        matrix = TfidfVectorizer(max_features=500, stop_words='english').fit_transform(
+            [text] + competitor_groups[key]
+        )
+        rows.append(cosine_similarity(matrix[0:1], matrix[1:])[0])
+    return rows
+
+def benchmark(document_count, keyword_count, competitor_count, words, rounds=3):
+    """Time separate fits and the batch computation over several rounds"""
+    rng = random.Random(42)
+    vocabulary = [f'term{index}' for index in range(5000)]
+    
+    # Each keyword's pages share a slice of the vocabulary, as pages on one topic do
+    competitor_groups = {}
+    topics = {}
+    for index in range(keyword_count):
+        topics[f'keyword {index}'] = vocabulary[index * 400:index * 400 + 1500]
+        competitor_groups[f'keyword {index}'] = _texts(rng, topics[f'keyword {index}'], competitor_count, words)
+    
+    keys = list(competitor_groups)
+    documents = [(_texts(rng, topics[key], 1, words)[0], key) for key in (rng.choice(keys) for _ in range(document_count))]
+    
+    similarity = BatchSimilarity(max_features=500)
+    
+    print("=" * 60)
+    print("BATCH SIMILARITY BENCHMARK")
+    print(f"{document_count} documents, {keyword_count} keywords, {competitor_count} competitors each, {words} words per page")
+    print("=" * 60)
+    
+    for round_number in range(1, rounds + 1):
+        start = time.perf_counter()
+        separate_rows = _separate_fits(documents, competitor_groups)
+        separate_total = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        batch_rows = similarity.compute(documents, competitor_groups)
+        batch_total = time.perf_counter() - start
+        
+        same = all(np.allclose(batch, separate) for batch, separate in zip(batch_rows, separate_rows))
+        
+        print(f"\nRound {round_number}")
+        print(f"  Separate fits      {separate_total * 1000:8.1f} ms")
+        print(f"  Batch              {batch_total * 1000:8.1f} ms")
+        print(f"  Speedup            {separate_total / batch_total:8.1f}x")
+        print(f"  Identical results  {'yes' if same else 'NO'}")
+    
+    print("\n" + "=" * 60)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark batch competitor similarities')
+    parser.add_argument('--documents', type=int, default=50, help='Batch documents in the wave')
+    parser.add_argument('--keywords', type=int, default=5, help='Distinct target keywords')
+    parser.add_argument('--competitors', type=int, default=10, help='Competitor pages per keyword')
+    parser.add_argument('--words', type=int, default=1500, help='Words per page')
+    parser.add_argument('--rounds', type=int, default=3, help='Number of benchmark rounds')
+    args = parser.parse_args()
+    
+    try:
+        benchmark(args.documents, args.keywords, args.competitors, args.words, args.rounds)
+        sys.exit(0)
+    except Exception as e:
+        print(f"\n✗ Benchmark failed: {e}")
+        sys.exit(1)
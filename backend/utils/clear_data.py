@@ -13,7 +13,9 @@ def clear_all_data():
     # Define database files to delete
     db_files = [
         'backend/data/history.db',
-        'backend/data/shares.db'  # If it exists
+        'backend/data/shares.db',  # If it exists
+        'backend/data/serp_cache.db',
+        'backend/data/page_cache.db'
     ]
     
     print("=" * 60)
@@ -22,6 +24,9 @@ def clear_all_data():
     
     deleted_count = 0
     
+    # WAL-mode databases keep recent writes in -wal/-shm files next to the database
+    db_files += [f"{db_file}{suffix}" for db_file in db_files for suffix in ('-wal', '-shm')]
+    
     for db_file in db_files:
         if os.path.exists(db_file):
             try:
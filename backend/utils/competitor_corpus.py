@@ -0,0 +1,89 @@
+import os
+import threading
+from utils.serp_scraper import SERPScraper
+
+class CompetitorCorpus:
+    """
+    SERP results and parsed competitor pages for one keyword.
+    Built once per analysis and shared by the SERP-based analyzers so that
+    the SERP query and each competitor page are only fetched once.
+    """
+    
+    def __init__(self, target_keyword, scraper=None, num_results=10):
+        self.target_keyword = target_keyword
+        self.scraper = scraper or SERPScraper()
+        self.num_results = num_results
+        
+        # Bulk fetch settings for competitor sweeps
+        self.fetch_concurrency = int(os.getenv('COMPETITOR_FETCH_CONCURRENCY', 8))
+        self.fetch_deadline = float(os.getenv('COMPETITOR_FETCH_DEADLINE', 15))
+        self.fetch_per_host = int(os.getenv('COMPETITOR_FETCH_PER_HOST', 2))
+        
+        self._serp_results = None
+        self._pages = {}
+        self.page_status = {}
+        self._lock = threading.Lock()
+        self._prefetch_lock = threading.Lock()
+        self._url_locks = {}
+    
+    @classmethod
+    def build(cls, target_keyword, scraper=None, num_results=10):
+        """Create a corpus, run its SERP query and fetch all competitor pages up front"""
+        corpus = cls(target_keyword, scraper, num_results)
+        corpus.prefetch()
+        return corpus
+    
+    @property
+    def serp_results(self):
+        """SERP results for the keyword (fetched on first access)"""
+        with self._lock:
+            if self._serp_results is None:
+                self._serp_results = self.scraper.search_google(self.target_keyword, num_results=self.num_results)
+            return self._serp_results
+    
+    def top_results(self, limit):
+        """First `limit` SERP results"""
+        return self.serp_results[:limit]
+    
+    def prefetch(self, limit=None):
+        """
+        Fetch the top `limit` competitor pages in parallel (all results by default).
+        Pages that fail or miss the deadline are stored as empty content so
+        analyzers never fall back to slow one-by-one fetching.
+        """
+        urls = [result['url'] for result in self.top_results(limit or self.num_results)]
+        
+        # One sweep at a time, so callers sharing the corpus wait instead of fetching the same pages
+        with self._prefetch_lock:
+            with self._lock:
+                missing = [url for url in urls if url not in self._pages]
+            
+            if not missing:
+                return
+            
+            fetched = self.scraper.extract_pages(
+                missing,
+                max_concurrency=self.fetch_concurrency,
+                deadline=self.fetch_deadline,
+                per_host_limit=self.fetch_per_host
+            )
+            
+            with self._lock:
+                for url, page in fetched.items():
+                    self._pages.setdefault(url, page['content'])
+                    self.page_status[url] = page['status']
+    
+    def get_page(self, url):
+        """Parsed content for a competitor URL (each URL is fetched at most once)"""
+        with self._lock:
+            url_lock = self._url_locks.setdefault(url, threading.Lock())
+        
+        # Lock per URL so concurrent analyzers wait for one fetch instead of repeating it
+        with url_lock:
+            if url not in self._pages:
+                self._pages[url] = self.scraper.extract_page_content(url)
+            return self._pages[url]
+    
+    def get_pages(self, urls):
+        """Parsed content for several competitor URLs, in order"""
+        return [self.get_page(url) for url in urls]
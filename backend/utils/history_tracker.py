@@ -1,25 +1,65 @@
 import sqlite3
 import json
+import base64
+import secrets
+import time
+import zlib
 from datetime import datetime
 import os
+from utils.sqlite_store import SQLiteStore
 
-class HistoryTracker:
-    """Track and manage analysis history in SQLite database"""
+# Batch item statuses that count towards batch_analysis.completed_urls
+FINISHED_STATUSES = ('completed', 'failed')
+
+# Trigram full-text search needs at least this many characters; shorter terms use LIKE
+MIN_FTS_TERM_LENGTH = 3
+
+# Columns returned by history listings (full results are loaded separately by id)
+SUMMARY_COLUMNS = [
+    'id', 'timestamp', 'url', 'target_keyword', 'word_count',
+    'overall_score', 'seo_score', 'serp_score', 'aeo_score', 'humanization_score', 'differentiation_score',
+    'created_at'
+]
+
+# Bucket sizes (seconds) for aggregated progress data
+PROGRESS_BUCKETS = {'hour': 3600, 'day': 86400, 'week': 7 * 86400}
+
+# Score columns aggregated in bucketed progress data
+SCORE_COLUMNS = [
+    'overall_score', 'seo_score', 'serp_score', 'aeo_score', 'humanization_score', 'differentiation_score'
+]
+
+# A limited listing whose filter matches more rows than this finds its page sooner
+# by walking the created_at index than by sorting every full-text match
+FTS_MAX_LISTING_MATCHES = 1000
+
+class HistoryTracker(SQLiteStore):
+    """
+    Track and manage analysis history in SQLite database.
+    Each thread reuses one connection in WAL mode, so dashboard reads run
+    against a snapshot while batch workers write, and neither waits on the other.
+    """
     
-    def __init__(self, db_path='data/history.db'):
-        self.db_path = db_path
-        
-        # Create data directory if it doesn't exist
-        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    def __init__(self, db_path='data/history.db', cache_size_kb=None, mmap_size=None, busy_timeout_ms=None):
+        # Connection tuning (cache_size is per connection)
+        super().__init__(
+            db_path,
+            cache_size_kb=cache_size_kb or int(os.getenv('HISTORY_DB_CACHE_KB', 16384)),
+            mmap_size=mmap_size if mmap_size is not None else int(os.getenv('HISTORY_DB_MMAP_BYTES', 256 * 1024 * 1024)),
+            busy_timeout_ms=busy_timeout_ms or int(os.getenv('HISTORY_DB_BUSY_TIMEOUT_MS', 30000))
+        )
         
         # Initialize database
         self._init_database()
     
-    def _init_database(self):
-        """Create tables if they don't exist"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
+    def _create_schema(self, cursor):
+        """Create missing tables and apply pending migrations, inside the caller's transaction"""
+        self._create_tables(cursor)
+        self._migrate(cursor)
+        self._fts_enabled = self._create_full_text_index(cursor)
+    
+    def _create_tables(self, cursor):
+        """Create missing tables and columns"""
         # Analysis history table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS analysis_history (
@@ -35,7 +75,8 @@ class HistoryTracker:
                 humanization_score REAL,
                 differentiation_score REAL,
                 full_results TEXT,
-                created_at TEXT DEFAULT CURRENT_TIMESTAMP
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                created_ts INTEGER
             )
         ''')
         
@@ -63,26 +104,275 @@ class HistoryTracker:
                 overall_score REAL,
                 error TEXT,
                 analysis_id INTEGER,
+                target_keyword TEXT,
+                lease_owner TEXT,
+                lease_expires_at REAL,
+                attempts INTEGER DEFAULT 0,
                 FOREIGN KEY (analysis_id) REFERENCES analysis_history(id)
             )
         ''')
         
-        conn.commit()
-        conn.close()
+        # Older databases predate per-item keywords and work leases
+        self._add_missing_columns(cursor, 'batch_items', [
+            ('target_keyword', 'TEXT'),
+            ('lease_owner', 'TEXT'),
+            ('lease_expires_at', 'REAL'),
+            ('attempts', 'INTEGER DEFAULT 0')
+        ])
     
-    def save_analysis(self, results):
-        """Save analysis results to history"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def _add_missing_columns(self, cursor, table, columns):
+        """Add the (column, definition) pairs a table doesn't have yet"""
+        cursor.execute(f'PRAGMA table_info({table})')
+        existing_columns = [row[1] for row in cursor.fetchall()]
+        for column, definition in columns:
+            if column not in existing_columns:
+                cursor.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
+    
+    def _migrate(self, cursor):
+        """Apply the migrations an existing database hasn't seen yet (tracked in PRAGMA user_version)"""
+        cursor.execute('PRAGMA user_version')
+        version = cursor.fetchone()[0]
+        
+        migrations = [
+            self._add_search_indexes,
+            self._add_created_ts,
+            self._add_statistics_table,
+            self._move_full_results,
+            self._add_daily_rollups
+        ]
+        for target_version, migration in enumerate(migrations, start=1):
+            if version < target_version:
+                migration(cursor)
+        
+        if version < len(migrations):
+            cursor.execute(f'PRAGMA user_version = {len(migrations)}')
+    
+    def _add_search_indexes(self, cursor):
+        """Migration 1: B-tree indexes for filters and sorting (the full-text index is created on open)"""
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_history_created_at ON analysis_history(created_at, id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_history_keyword ON analysis_history(target_keyword)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_history_url ON analysis_history(url)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_batch_analysis_batch ON batch_analysis(batch_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_batch_items_batch_url ON batch_items(batch_id, url)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_batch_items_status ON batch_items(status, batch_id)')
+    
+    def _create_full_text_index(self, cursor):
+        """
+        Create the trigram full-text index for substring search if it is missing; returns whether it exists
+        Checked on every open rather than as a migration, so a database first opened by
+        a SQLite build without FTS5 gets the index once a build with it opens the file
+        """
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'analysis_history_fts'")
+        if cursor.fetchone() is not None:
+            return True
+        
+        # External-content table: the index refers to analysis_history rows instead of copying them
+        try:
+            cursor.execute('''
+                CREATE VIRTUAL TABLE IF NOT EXISTS analysis_history_fts USING fts5(
+                    target_keyword, url,
+                    content='analysis_history', content_rowid='id', tokenize='trigram'
+                )
+            ''')
+        except sqlite3.OperationalError as e:
+            # SQLite builds without FTS5 (or older than 3.34) keep searching with LIKE
+            print(f"Full-text history search unavailable: {str(e)}")
+            return False
         
         cursor.execute('''
-            INSERT INTO analysis_history (
-                timestamp, url, target_keyword, word_count,
-                overall_score, seo_score, serp_score, aeo_score,
-                humanization_score, differentiation_score, full_results
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            datetime.now().isoformat(),
+            CREATE TRIGGER IF NOT EXISTS analysis_history_fts_insert AFTER INSERT ON analysis_history BEGIN
+                INSERT INTO analysis_history_fts (rowid, target_keyword, url)
+                VALUES (new.id, new.target_keyword, new.url);
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS analysis_history_fts_delete AFTER DELETE ON analysis_history BEGIN
+                INSERT INTO analysis_history_fts (analysis_history_fts, rowid, target_keyword, url)
+                VALUES ('delete', old.id, old.target_keyword, old.url);
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS analysis_history_fts_update
+            AFTER UPDATE OF target_keyword, url ON analysis_history BEGIN
+                INSERT INTO analysis_history_fts (analysis_history_fts, rowid, target_keyword, url)
+                VALUES ('delete', old.id, old.target_keyword, old.url);
+                INSERT INTO analysis_history_fts (rowid, target_keyword, url)
+                VALUES (new.id, new.target_keyword, new.url);
+            END
+        ''')
+        
+        # Index the rows that existed before the index
+        cursor.execute("INSERT INTO analysis_history_fts (analysis_history_fts) VALUES ('rebuild')")
+        return True
+    
+    def _add_created_ts(self, cursor):
+        """Migration 2: indexed Unix time of created_at, so time ranges compare a plain column"""
+        self._add_missing_columns(cursor, 'analysis_history', [('created_ts', 'INTEGER')])
+        cursor.execute('''
+            UPDATE analysis_history SET created_ts = CAST(strftime('%s', created_at) AS INTEGER)
+            WHERE created_ts IS NULL
+        ''')
+        
+        # Covers the score columns so bucketed progress aggregates without reading table rows
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_history_created_ts ON analysis_history(
+                created_ts, overall_score, seo_score, serp_score, aeo_score,
+                humanization_score, differentiation_score
+            )
+        ''')
+    
+    def _add_statistics_table(self, cursor):
+        """
+        Migration 3: running totals behind get_statistics, one 'global' row and one row
+        per non-empty target keyword, maintained by the transactions that add history rows
+        """
+        score_columns = ',\n'.join(
+            f'{column}_sum REAL DEFAULT 0, {column}_count INTEGER DEFAULT 0' for column in SCORE_COLUMNS
+        )
+        cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS analysis_stats (
+                scope TEXT NOT NULL,
+                keyword TEXT NOT NULL,
+                analyses INTEGER DEFAULT 0,
+                {score_columns},
+                PRIMARY KEY (scope, keyword)
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_stats_top ON analysis_stats(scope, analyses DESC, keyword)')
+        
+        cursor.execute('DELETE FROM analysis_stats')
+        self._update_statistics(cursor, '1=1', ())
+    
+    def _update_statistics(self, cursor, where, params, sign=1):
+        """
+        Add the analysis_history rows matching `where` to analysis_stats (or subtract them with sign=-1)
+        Runs inside the caller's transaction so the totals always match the history table
+        """
+        aggregates = ', '.join(
+            f'{sign} * TOTAL({column}), {sign} * COUNT({column})' for column in SCORE_COLUMNS
+        )
+        targets = ', '.join(f'{column}_sum, {column}_count' for column in SCORE_COLUMNS)
+        increments = ', '.join(
+            f'{name} = {name} + excluded.{name}'
+            for column in SCORE_COLUMNS for name in (f'{column}_sum', f'{column}_count')
+        )
+        
+        for scope, keyword, filters, group_by in [
+            ('global', "''", '', ''),
+            ('keyword', 'target_keyword', " AND target_keyword IS NOT NULL AND target_keyword != ''",
+             ' GROUP BY target_keyword')
+        ]:
+            cursor.execute(f'''
+                INSERT INTO analysis_stats (scope, keyword, analyses, {targets})
+                SELECT '{scope}', {keyword}, {sign} * COUNT(*), {aggregates}
+                FROM analysis_history
+                WHERE {where}{filters}{group_by}
+                ON CONFLICT (scope, keyword) DO UPDATE SET
+                    analyses = analyses + excluded.analyses, {increments}
+            ''', params)
+    
+    def _move_full_results(self, cursor):
+        """Migration 4: move full_results out of analysis_history into compressed analysis_results rows"""
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS analysis_results (
+                analysis_id INTEGER PRIMARY KEY,
+                data BLOB NOT NULL,
+                FOREIGN KEY (analysis_id) REFERENCES analysis_history(id)
+            )
+        ''')
+        
+        # Chunked so a large history isn't loaded into memory at once
+        last_id = 0
+        while True:
+            cursor.execute('''
+                SELECT id, full_results FROM analysis_history
+                WHERE id > ? AND full_results IS NOT NULL
+                ORDER BY id LIMIT 500
+            ''', (last_id,))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            
+            cursor.executemany(
+                'INSERT OR REPLACE INTO analysis_results (analysis_id, data) VALUES (?, ?)',
+                [(analysis_id, zlib.compress(full_results.encode('utf-8'))) for analysis_id, full_results in rows]
+            )
+            last_id = rows[-1][0]
+        
+        # The column stays (older code may still select it) but no longer holds data;
+        # the pages it frees are returned to the file system by RetentionManager
+        cursor.execute('UPDATE analysis_history SET full_results = NULL WHERE full_results IS NOT NULL')
+    
+    def _add_daily_rollups(self, cursor):
+        """
+        Migration 5: per-day, per-keyword aggregates for analyses past score retention,
+        and an indexed creation time on stored results so expired ones are found by range
+        """
+        score_columns = ',\n'.join(
+            f'{column}_sum REAL, {column}_count INTEGER, {column}_min REAL, {column}_max REAL'
+            for column in SCORE_COLUMNS
+        )
+        cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS analysis_daily (
+                day_ts INTEGER NOT NULL,
+                target_keyword TEXT NOT NULL,
+                analyses INTEGER,
+                {score_columns},
+                PRIMARY KEY (day_ts, target_keyword)
+            )
+        ''')
+        
+        self._add_missing_columns(cursor, 'analysis_results', [('created_ts', 'INTEGER')])
+        cursor.execute('''
+            UPDATE analysis_results SET created_ts = (
+                SELECT created_ts FROM analysis_history WHERE id = analysis_results.analysis_id
+            )
+            WHERE created_ts IS NULL
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_results_created_ts ON analysis_results(created_ts)')
+    
+    def _contains_filter(self, cursor, column, term, limit=None):
+        """
+        SQL condition (with its parameter) matching rows whose column contains `term`
+        Uses the trigram index, except for terms too short for it and, in listings
+        with a `limit`, terms so common that an ordered LIKE scan stops sooner
+        """
+        if self._fts_enabled and len(term) >= MIN_FTS_TERM_LENGTH:
+            # A quoted trigram phrase matches the term as a case-insensitive substring
+            match = f'{column} : "' + term.replace('"', '""') + '"'
+            
+            common = False
+            if limit is not None:
+                cursor.execute('''
+                    SELECT COUNT(*) FROM (
+                        SELECT rowid FROM analysis_history_fts WHERE analysis_history_fts MATCH ? LIMIT ?
+                    )
+                ''', (match, FTS_MAX_LISTING_MATCHES + 1))
+                common = cursor.fetchone()[0] > FTS_MAX_LISTING_MATCHES
+            
+            if not common:
+                return ' AND id IN (SELECT rowid FROM analysis_history_fts WHERE analysis_history_fts MATCH ?)', match
+        
+        return f' AND {column} LIKE ?', f'%{term}%'
+    
+    def save_analysis(self, results):
+        """Save analysis results to history"""
+        return self.save_many([results])[0]
+    
+    def save_many(self, results_list):
+        """Save several analysis results in one transaction, returning their ids in order"""
+        if not results_list:
+            return []
+        
+        rows, blobs = self._analysis_rows(results_list)
+        with self._transaction() as cursor:
+            return self._insert_analyses(cursor, rows, blobs)
+    
+    def _analysis_rows(self, results_list):
+        """Summary rows and compressed full results to insert (built before taking the write lock)"""
+        timestamp = datetime.now().isoformat()
+        rows = [(
+            timestamp,
             results.get('url'),
             results.get('target_keyword'),
             results.get('word_count'),
@@ -91,205 +381,616 @@ class HistoryTracker:
             results.get('serp_performance', {}).get('score'),
             results.get('aeo', {}).get('score'),
             results.get('humanization', {}).get('score'),
-            results.get('differentiation', {}).get('score'),
-            json.dumps(results)
-        ))
+            results.get('differentiation', {}).get('score')
+        ) for results in results_list]
+        
+        blobs = [
+            zlib.compress(json.dumps(results, separators=(',', ':')).encode('utf-8'))
+            for results in results_list
+        ]
+        return rows, blobs
+    
+    def _insert_analyses(self, cursor, rows, blobs):
+        """Insert prepared analyses inside the caller's transaction, returning their ids in order"""
+        if not rows:
+            return []
         
-        analysis_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+        # Holding the write lock keeps the new AUTOINCREMENT ids consecutive
+        cursor.executemany('''
+            INSERT INTO analysis_history (
+                timestamp, url, target_keyword, word_count,
+                overall_score, seo_score, serp_score, aeo_score,
+                humanization_score, differentiation_score, created_ts
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CAST(strftime('%s', 'now') AS INTEGER))
+        ''', rows)
+        cursor.execute('SELECT last_insert_rowid()')
+        last_id = cursor.fetchone()[0]
+        first_id = last_id - len(rows) + 1
         
-        return analysis_id
-    
-    def get_history(self, limit=50, keyword=None, url=None):
-        """Retrieve analysis history"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor.executemany('''
+            INSERT INTO analysis_results (analysis_id, data, created_ts)
+            SELECT id, ?, created_ts FROM analysis_history WHERE id = ?
+        ''', zip(blobs, range(first_id, last_id + 1)))
         
-        query = 'SELECT * FROM analysis_history WHERE 1=1'
+        self._update_statistics(cursor, 'id BETWEEN ? AND ?', (first_id, last_id))
+        
+        return list(range(first_id, last_id + 1))
+    
+    def get_history(self, limit=50, keyword=None, url=None, fields=None):
+        """Retrieve analysis history (summary columns; see get_analysis for full results)"""
+        return self.get_history_page(limit, keyword, url, fields)['items']
+    
+    def get_history_page(self, limit=50, keyword=None, url=None, fields=None, cursor=None):
+        """
+        Retrieve one page of analysis history, newest first
+        `fields` selects a subset of SUMMARY_COLUMNS; `cursor` is the previous page's next_cursor
+        Returns dict with: items, next_cursor (None on the last page)
+        Raises ValueError for unknown fields or a malformed cursor
+        """
+        fields = list(fields or SUMMARY_COLUMNS)
+        unknown = [field for field in fields if field not in SUMMARY_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        
+        # The sort key is always selected so the next cursor can be built from the last row
+        columns = fields + [column for column in ('created_at', 'id') if column not in fields]
+        
+        db_cursor = self._connect().cursor()
+        
+        query = f"SELECT {', '.join(columns)} FROM analysis_history WHERE 1=1"
         params = []
         
-        if keyword:
-            query += ' AND target_keyword LIKE ?'
-            params.append(f'%{keyword}%')
+        # Keyset pagination: continue strictly after the last (created_at, id) seen, using the index
+        if cursor:
+            query += ' AND (created_at, id) < (?, ?)'
+            params.extend(self._decode_cursor(cursor))
         
-        if url:
-            query += ' AND url LIKE ?'
-            params.append(f'%{url}%')
+        for column, term in [('target_keyword', keyword), ('url', url)]:
+            if term:
+                condition, param = self._contains_filter(db_cursor, column, term, limit)
+                query += condition
+                params.append(param)
         
-        query += ' ORDER BY created_at DESC LIMIT ?'
-        params.append(limit)
+        # One extra row tells whether another page follows
+        query += ' ORDER BY created_at DESC, id DESC LIMIT ?'
+        params.append(limit + 1)
         
-        cursor.execute(query, params)
-        columns = [desc[0] for desc in cursor.description]
-        results = [dict(zip(columns, row)) for row in cursor.fetchall()]
-        
-        conn.close()
-        return results
-    
-    def get_progress_data(self, keyword=None, url=None, days=30):
-        """Get score progression over time"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        query = '''
-            SELECT 
-                timestamp,
-                overall_score,
-                seo_score,
-                serp_score,
-                aeo_score,
-                humanization_score,
-                differentiation_score,
-                target_keyword,
-                url
-            FROM analysis_history
-            WHERE datetime(created_at) >= datetime('now', '-' || ? || ' days')
-        '''
-        params = [days]
-        
-        if keyword:
-            query += ' AND target_keyword LIKE ?'
-            params.append(f'%{keyword}%')
-        
-        if url:
-            query += ' AND url LIKE ?'
-            params.append(f'%{url}%')
-        
-        query += ' ORDER BY created_at ASC'
+        db_cursor.execute(query, params)
+        rows = [dict(zip(columns, row)) for row in db_cursor.fetchall()]
+        
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = self._encode_cursor(rows[-1]['created_at'], rows[-1]['id'])
+        
+        items = [{field: row[field] for field in fields} for row in rows]
+        return {'items': items, 'next_cursor': next_cursor}
+    
+    def _encode_cursor(self, created_at, analysis_id):
+        """Opaque pagination token for a (created_at, id) position"""
+        position = json.dumps([created_at, analysis_id], separators=(',', ':'))
+        return base64.urlsafe_b64encode(position.encode('utf-8')).decode('ascii').rstrip('=')
+    
+    def _decode_cursor(self, cursor):
+        """Inverse of _encode_cursor, returns (created_at, id)"""
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            created_at, analysis_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        except (ValueError, TypeError, UnicodeError):
+            raise ValueError('Invalid cursor')
+        
+        if not isinstance(created_at, str) or not isinstance(analysis_id, int):
+            raise ValueError('Invalid cursor')
+        
+        return created_at, analysis_id
+    
+    def get_analysis(self, analysis_id):
+        """
+        Load one analysis with its full results
+        Returns the summary columns plus full_results (dict), or None if unknown
+        """
+        cursor = self._connect().cursor()
+        
+        cursor.execute(f'''
+            SELECT {', '.join('h.' + column for column in SUMMARY_COLUMNS)}, r.data
+            FROM analysis_history h
+            LEFT JOIN analysis_results r ON r.analysis_id = h.id
+            WHERE h.id = ?
+        ''', (analysis_id,))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        
+        analysis = dict(zip(SUMMARY_COLUMNS, row[:-1]))
+        analysis['full_results'] = json.loads(zlib.decompress(row[-1])) if row[-1] is not None else None
+        return analysis
+    
+    def get_progress_data(self, keyword=None, url=None, days=30, bucket=None):
+        """
+        Get score progression over time
+        With `bucket` (hour, day or week), returns one row per bucket with: timestamp (bucket start, UTC),
+        count, and per score column its average (under the column name) plus <column>_min and <column>_max
+        """
+        if bucket is not None and bucket not in PROGRESS_BUCKETS:
+            raise ValueError(f"Unknown bucket '{bucket}', expected one of: {', '.join(PROGRESS_BUCKETS)}")
+        
+        cursor = self._connect().cursor()
+        
+        where = ' WHERE created_ts >= ?'
+        params = [int(time.time() - float(days) * 86400)]
+        
+        for column, term in [('target_keyword', keyword), ('url', url)]:
+            if term:
+                condition, param = self._contains_filter(cursor, column, term)
+                where += condition
+                params.append(param)
+        
+        if bucket:
+            # Week buckets start on Monday (the Unix epoch was a Thursday)
+            size = PROGRESS_BUCKETS[bucket]
+            offset = 3 * 86400 if bucket == 'week' else 0
+            
+            def bucket_of(column):
+                return f'(({column} + {offset}) / {size}) * {size} - {offset}'
+            
+            # Live rows pre-aggregated per bucket, and rolled-up days (see roll_up_analyses),
+            # in one shape: sums, counts, min and max
+            source_columns = ', '.join(
+                f'{column}_sum, {column}_count, {column}_min, {column}_max' for column in SCORE_COLUMNS
+            )
+            live_columns = ', '.join(
+                f'TOTAL({column}), COUNT({column}), MIN({column}), MAX({column})' for column in SCORE_COLUMNS
+            )
+            source = (
+                f"SELECT {bucket_of('created_ts')}, COUNT(*), {live_columns} "
+                'FROM analysis_history' + where + ' GROUP BY 1'
+            )
+            
+            # Rolled-up days have no URL and can't be split into hours
+            if bucket != 'hour' and not url:
+                # A rolled-up day is kept whole if the window starts inside it
+                source += f' UNION ALL SELECT day_ts, analyses, {source_columns} FROM analysis_daily WHERE day_ts >= ?'
+                params.append((params[0] // 86400) * 86400)
+                if keyword:
+                    source += ' AND target_keyword LIKE ?'
+                    params.append(f'%{keyword}%')
+            
+            aggregates = ',\n'.join(
+                f'ROUND(SUM({column}_sum) / SUM({column}_count), 1) AS {column}, '
+                f'MIN({column}_min) AS {column}_min, MAX({column}_max) AS {column}_max'
+                for column in SCORE_COLUMNS
+            )
+            query = f'''
+                WITH source (ts, analyses, {source_columns}) AS ({source})
+                SELECT
+                    strftime('%Y-%m-%dT%H:%M:%S', {bucket_of('ts')}, 'unixepoch') AS timestamp,
+                    SUM(analyses) AS count,
+                    {aggregates}
+                FROM source
+                GROUP BY 1
+                ORDER BY 1
+            '''
+        else:
+            query = '''
+                SELECT 
+                    timestamp,
+                    overall_score,
+                    seo_score,
+                    serp_score,
+                    aeo_score,
+                    humanization_score,
+                    differentiation_score,
+                    target_keyword,
+                    url
+                FROM analysis_history
+            ''' + where + ' ORDER BY created_ts ASC, id ASC'
         
         cursor.execute(query, params)
         columns = [desc[0] for desc in cursor.description]
-        results = [dict(zip(columns, row)) for row in cursor.fetchall()]
-        
-        conn.close()
-        return results
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
     
     def get_statistics(self):
-        """Get overall statistics"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        """
+        Get overall statistics (read from the analysis_stats running totals)
+        The totals are all-time: analyses rolled up by retention still count
+        """
+        cursor = self._connect().cursor()
         
         stats = {}
         
+        cursor.execute("SELECT * FROM analysis_stats WHERE scope = 'global'")
+        columns = [desc[0] for desc in cursor.description]
+        row = cursor.fetchone()
+        totals = dict(zip(columns, row)) if row else {}
+        
         # Total analyses
-        cursor.execute('SELECT COUNT(*) FROM analysis_history')
-        stats['total_analyses'] = cursor.fetchone()[0]
+        stats['total_analyses'] = totals.get('analyses', 0)
         
-        # Average scores
-        cursor.execute('''
-            SELECT 
-                AVG(overall_score) as avg_overall,
-                AVG(seo_score) as avg_seo,
-                AVG(serp_score) as avg_serp,
-                AVG(aeo_score) as avg_aeo,
-                AVG(humanization_score) as avg_humanization,
-                AVG(differentiation_score) as avg_differentiation
-            FROM analysis_history
-        ''')
-        avg_scores = cursor.fetchone()
-        stats['avg_scores'] = {
-            'overall': round(avg_scores[0], 1) if avg_scores[0] else 0,
-            'seo': round(avg_scores[1], 1) if avg_scores[1] else 0,
-            'serp': round(avg_scores[2], 1) if avg_scores[2] else 0,
-            'aeo': round(avg_scores[3], 1) if avg_scores[3] else 0,
-            'humanization': round(avg_scores[4], 1) if avg_scores[4] else 0,
-            'differentiation': round(avg_scores[5], 1) if avg_scores[5] else 0
-        }
+        # Average scores (over the analyses that have each score)
+        stats['avg_scores'] = {}
+        for column in SCORE_COLUMNS:
+            count = totals.get(f'{column}_count')
+            average = totals[f'{column}_sum'] / count if count else None
+            stats['avg_scores'][column[:-len('_score')]] = round(average, 1) if average else 0
         
         # Top keywords
         cursor.execute('''
-            SELECT target_keyword, COUNT(*) as count
-            FROM analysis_history
-            WHERE target_keyword IS NOT NULL AND target_keyword != ''
-            GROUP BY target_keyword
-            ORDER BY count DESC
+            SELECT keyword, analyses FROM analysis_stats
+            WHERE scope = 'keyword' AND analyses > 0
+            ORDER BY analyses DESC, keyword
             LIMIT 5
         ''')
         stats['top_keywords'] = [{'keyword': row[0], 'count': row[1]} for row in cursor.fetchall()]
         
-        conn.close()
         return stats
     
+    def get_expired_results(self, before_ts, limit):
+        """
+        Up to `limit` of the oldest analyses created before `before_ts` that still store full results
+        Returns list of dicts with the summary columns plus full_results
+        """
+        cursor = self._connect().cursor()
+        
+        cursor.execute(f'''
+            SELECT {', '.join('h.' + column for column in SUMMARY_COLUMNS)}, r.data
+            FROM analysis_results r
+            JOIN analysis_history h ON h.id = r.analysis_id
+            WHERE r.created_ts < ?
+            ORDER BY r.created_ts, r.analysis_id
+            LIMIT ?
+        ''', (before_ts, limit))
+        
+        expired = []
+        for row in cursor.fetchall():
+            analysis = dict(zip(SUMMARY_COLUMNS, row[:-1]))
+            analysis['full_results'] = json.loads(zlib.decompress(row[-1]))
+            expired.append(analysis)
+        return expired
+    
+    def delete_results(self, analysis_ids):
+        """Drop the stored full results of some analyses (their summary rows stay)"""
+        self._connect().execute(
+            'DELETE FROM analysis_results WHERE analysis_id IN (SELECT value FROM json_each(?))',
+            (json.dumps(list(analysis_ids)),)
+        )
+    
+    def get_expired_analyses(self, before_ts, limit):
+        """Up to `limit` of the oldest analyses created before `before_ts` (summary columns)"""
+        cursor = self._connect().cursor()
+        
+        cursor.execute(f'''
+            SELECT {', '.join(SUMMARY_COLUMNS)} FROM analysis_history
+            WHERE created_ts < ?
+            ORDER BY created_ts, id
+            LIMIT ?
+        ''', (before_ts, limit))
+        return [dict(zip(SUMMARY_COLUMNS, row)) for row in cursor.fetchall()]
+    
+    def roll_up_analyses(self, analysis_ids):
+        """
+        Fold analyses into the per-day, per-keyword analysis_daily aggregates and delete them
+        (with any stored full results). Bucketed progress data keeps including them.
+        """
+        ids = json.dumps(list(analysis_ids))
+        
+        aggregates = ', '.join(
+            f'TOTAL({column}), COUNT({column}), MIN({column}), MAX({column})' for column in SCORE_COLUMNS
+        )
+        targets = ', '.join(
+            f'{column}_sum, {column}_count, {column}_min, {column}_max' for column in SCORE_COLUMNS
+        )
+        # Scalar MIN/MAX return NULL if either side is NULL, hence the COALESCEs
+        merges = ', '.join(
+            f'{column}_sum = {column}_sum + excluded.{column}_sum, '
+            f'{column}_count = {column}_count + excluded.{column}_count, '
+            f'{column}_min = MIN(COALESCE({column}_min, excluded.{column}_min), '
+            f'COALESCE(excluded.{column}_min, {column}_min)), '
+            f'{column}_max = MAX(COALESCE({column}_max, excluded.{column}_max), '
+            f'COALESCE(excluded.{column}_max, {column}_max))'
+            for column in SCORE_COLUMNS
+        )
+        
+        with self._transaction() as cursor:
+            cursor.execute(f'''
+                INSERT INTO analysis_daily (day_ts, target_keyword, analyses, {targets})
+                SELECT (created_ts / 86400) * 86400, COALESCE(target_keyword, ''), COUNT(*), {aggregates}
+                FROM analysis_history
+                WHERE id IN (SELECT value FROM json_each(?))
+                GROUP BY 1, 2
+                ON CONFLICT (day_ts, target_keyword) DO UPDATE SET
+                    analyses = analyses + excluded.analyses, {merges}
+            ''', (ids,))
+            
+            cursor.execute('DELETE FROM analysis_results WHERE analysis_id IN (SELECT value FROM json_each(?))', (ids,))
+            cursor.execute('DELETE FROM analysis_history WHERE id IN (SELECT value FROM json_each(?))', (ids,))
+            return cursor.rowcount
+    
+    def needs_full_vacuum(self):
+        """Whether the file was created without incremental auto-vacuum and needs one full VACUUM to switch"""
+        return self._connect().execute('PRAGMA auto_vacuum').fetchone()[0] != 2
+    
+    def full_vacuum(self):
+        """
+        Rewrite the whole file, switching it to incremental auto-vacuum; returns the number of pages released
+        Writers wait for the write lock until it finishes, so it isn't run on startup
+        """
+        conn = self._connect()
+        before = conn.execute('PRAGMA page_count').fetchone()[0]
+        conn.execute('VACUUM')
+        
+        # Switching modes adds a pointer-map page, so a file without free pages can grow by one
+        return max(0, before - conn.execute('PRAGMA page_count').fetchone()[0])
+    
+    def incremental_vacuum(self, pages):
+        """Return up to `pages` free pages to the file system; returns the number released"""
+        conn = self._connect()
+        before = conn.execute('PRAGMA freelist_count').fetchone()[0]
+        if not before:
+            return 0
+        
+        # executescript steps the pragma to completion (execute would free a single page)
+        conn.executescript(f'PRAGMA incremental_vacuum({int(pages)})')
+        return before - conn.execute('PRAGMA freelist_count').fetchone()[0]
+    
     def create_batch(self, batch_name, urls):
-        """Create a new batch analysis"""
-        batch_id = datetime.now().strftime('%Y%m%d_%H%M%S')
-        
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        """
+        Create a new batch analysis
+        `urls` holds URL strings or dicts with url and target_keyword
+        """
+        # Random suffix keeps batches created in the same second apart
+        batch_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{secrets.token_hex(3)}"
+        
+        rows = []
+        for item in urls:
+            if isinstance(item, dict):
+                rows.append((batch_id, item['url'], item.get('target_keyword') or ''))
+            else:
+                rows.append((batch_id, item, ''))
+        
+        with self._transaction() as cursor:
+            # Create batch record
+            cursor.execute('''
+                INSERT INTO batch_analysis (batch_id, batch_name, total_urls, completed_urls, status)
+                VALUES (?, ?, ?, 0, 'pending')
+            ''', (batch_id, batch_name, len(urls)))
+            
+            # Create batch items
+            cursor.executemany('''
+                INSERT INTO batch_items (batch_id, url, status, target_keyword)
+                VALUES (?, ?, 'pending', ?)
+            ''', rows)
         
-        # Create batch record
+        return batch_id
+    
+    def update_batch_status(self, batch_id, status):
+        """Set the status of a batch (e.g. 'running' once its items are queued)"""
+        # A batch that already finished stays completed
+        self._connect().execute('''
+            UPDATE batch_analysis SET status = ?
+            WHERE batch_id = ? AND status != 'completed'
+        ''', (status, batch_id))
+    
+    def update_batch_item(self, batch_id, url, status, overall_score=None, error=None, analysis_id=None, lease_owner=None):
+        """
+        Update batch item status and release its lease
+        A URL listed more than once updates its first unfinished item
+        With `lease_owner`, the update only applies while that worker still holds the lease
+        Returns True if the item was updated
+        """
+        cursor = self._connect().cursor()
         cursor.execute('''
-            INSERT INTO batch_analysis (batch_id, batch_name, total_urls, completed_urls, status)
-            VALUES (?, ?, ?, 0, 'pending')
-        ''', (batch_id, batch_name, len(urls)))
-        
-        # Create batch items
-        for url in urls:
+            SELECT id FROM batch_items
+            WHERE batch_id = ? AND url = ?
+            ORDER BY status IN ('completed', 'failed'), id
+            LIMIT 1
+        ''', (batch_id, url))
+        row = cursor.fetchone()
+        if row is None:
+            return False
+        
+        update = {
+            'id': row[0],
+            'status': status,
+            'overall_score': overall_score,
+            'error': error,
+            'analysis_id': analysis_id
+        }
+        return self.update_batch_items(batch_id, [update], lease_owner) > 0
+    
+    def update_batch_items(self, batch_id, updates, lease_owner=None):
+        """
+        Update several batch items in one transaction and release their leases
+        `updates` holds dicts with: id (batch item id), status, overall_score, error, and
+        analysis_id or results (saved to history in the same transaction, which sets analysis_id)
+        With `lease_owner`, only items that worker still holds are updated (and have their results saved)
+        Returns the number of items updated
+        """
+        if not updates:
+            return 0
+        
+        saving = [update for update in updates if update.get('results') is not None]
+        rows, blobs = self._analysis_rows([update['results'] for update in saving])
+        
+        with self._transaction() as cursor:
+            previous = self._get_batch_item_statuses(cursor, batch_id, [update['id'] for update in updates], lease_owner)
+            selected = [update for update in updates if update['id'] in previous]
+            
+            # Results for items whose lease was lost are dropped; whoever holds them now saves their own
+            held = [index for index, update in enumerate(saving) if update['id'] in previous]
+            analysis_ids = dict(zip(
+                [saving[index]['id'] for index in held],
+                self._insert_analyses(cursor, [rows[index] for index in held], [blobs[index] for index in held])
+            ))
+            
+            cursor.executemany('''
+                UPDATE batch_items
+                SET status = ?, overall_score = ?, error = ?, analysis_id = ?,
+                    lease_owner = NULL, lease_expires_at = NULL
+                WHERE id = ?
+            ''', [
+                (
+                    update['status'], update.get('overall_score'), update.get('error'),
+                    analysis_ids.get(update['id'], update.get('analysis_id')), update['id']
+                )
+                for update in selected
+            ])
+            
+            # Only items finishing now count towards progress, not finished items being overwritten
+            self._add_batch_progress(cursor, batch_id, sum(
+                1 for update in selected
+                if update['status'] in FINISHED_STATUSES and previous[update['id']] not in FINISHED_STATUSES
+            ))
+        
+        return len(selected)
+    
+    def _get_batch_item_statuses(self, cursor, batch_id, item_ids, lease_owner=None):
+        """Current status of the given items of a batch (only those `lease_owner` holds, if given), by id"""
+        cursor.execute('''
+            SELECT id, status FROM batch_items
+            WHERE batch_id = ? AND id IN (SELECT value FROM json_each(?))
+        ''' + (' AND lease_owner = ?' if lease_owner else ''), (
+            batch_id, json.dumps(list(item_ids))
+        ) + ((lease_owner,) if lease_owner else ()))
+        return dict(cursor.fetchall())
+    
+    def claim_batch_items(self, batch_id, owner, limit, lease_seconds, max_attempts):
+        """
+        Lease up to `limit` claimable items of a batch to `owner`
+        Claimable items are pending, or running with an expired lease (their worker died)
+        Expired items that already used max_attempts are marked failed instead
+        Returns list of dicts with: id, url, target_keyword, attempts
+        """
+        now = time.time()
+        
+        # Take the write lock up front so two workers can't claim the same rows
+        with self._transaction() as cursor:
+            cursor.execute('''
+                UPDATE batch_items
+                SET status = 'failed', error = 'Exceeded retry attempts',
+                    lease_owner = NULL, lease_expires_at = NULL
+                WHERE batch_id = ?
+                  AND (status = 'pending' OR (status = 'running' AND lease_expires_at < ?))
+                  AND attempts >= ?
+            ''', (batch_id, now, max_attempts))
+            
+            self._add_batch_progress(cursor, batch_id, cursor.rowcount)
+            
+            # Keyword groups stay together so each wave shares as few corpora as possible
             cursor.execute('''
-                INSERT INTO batch_items (batch_id, url, status)
-                VALUES (?, ?, 'pending')
-            ''', (batch_id, url))
+                SELECT id, url, target_keyword, attempts FROM batch_items
+                WHERE batch_id = ?
+                  AND (status = 'pending' OR (status = 'running' AND lease_expires_at < ?))
+                  AND COALESCE(attempts, 0) < ?
+                ORDER BY target_keyword, id
+                LIMIT ?
+            ''', (batch_id, now, max_attempts, limit))
+            columns = [desc[0] for desc in cursor.description]
+            items = [dict(zip(columns, row)) for row in cursor.fetchall()]
+            
+            cursor.executemany('''
+                UPDATE batch_items
+                SET status = 'running', lease_owner = ?, lease_expires_at = ?,
+                    attempts = COALESCE(attempts, 0) + 1
+                WHERE id = ?
+            ''', [(owner, now + lease_seconds, item['id']) for item in items])
+        
+        for item in items:
+            item['attempts'] = (item['attempts'] or 0) + 1
+        
+        return items
+    
+    def renew_batch_leases(self, owner, item_ids, lease_seconds):
+        """Extend the leases `owner` still holds on the given items (heartbeat)"""
+        if not item_ids:
+            return 0
+        
+        with self._transaction() as cursor:
+            cursor.executemany('''
+                UPDATE batch_items SET lease_expires_at = ?
+                WHERE id = ? AND lease_owner = ? AND status = 'running'
+            ''', [(time.time() + lease_seconds, item_id, owner) for item_id in item_ids])
+            
+            return cursor.rowcount
+    
+    def release_batch_item(self, item_id, owner, error=None):
+        """Give a leased item back to the queue so it can be retried"""
+        self._connect().execute('''
+            UPDATE batch_items
+            SET status = 'pending', error = ?, lease_owner = NULL, lease_expires_at = NULL
+            WHERE id = ? AND lease_owner = ?
+        ''', (error, item_id, owner))
+    
+    def get_batch_lease_state(self, batch_id):
+        """
+        Count a batch's unfinished items
+        Returns dict with: pending, leased (held by a live worker), next_expiry
+        """
+        cursor = self._connect().cursor()
         
-        conn.commit()
-        conn.close()
+        cursor.execute('''
+            SELECT
+                SUM(CASE WHEN status = 'pending' THEN 1 ELSE 0 END),
+                SUM(CASE WHEN status = 'running' THEN 1 ELSE 0 END),
+                MIN(CASE WHEN status = 'running' THEN lease_expires_at END)
+            FROM batch_items
+            WHERE batch_id = ?
+        ''', (batch_id,))
+        pending, leased, next_expiry = cursor.fetchone()
         
-        return batch_id
+        return {'pending': pending or 0, 'leased': leased or 0, 'next_expiry': next_expiry}
     
-    def update_batch_item(self, batch_id, url, status, overall_score=None, error=None, analysis_id=None):
-        """Update batch item status"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def get_unfinished_batches(self):
+        """Batch ids that still have pending or running items (e.g. after a restart)"""
+        cursor = self._connect().cursor()
         
         cursor.execute('''
-            UPDATE batch_items
-            SET status = ?, overall_score = ?, error = ?, analysis_id = ?
-            WHERE batch_id = ? AND url = ?
-        ''', (status, overall_score, error, analysis_id, batch_id, url))
+            SELECT DISTINCT batch_id FROM batch_items
+            WHERE status IN ('pending', 'running')
+            ORDER BY batch_id
+        ''')
+        return [row[0] for row in cursor.fetchall()]
+    
+    def _add_batch_progress(self, cursor, batch_id, finished):
+        """Add newly finished items to the batch counter and mark the batch completed when all are done"""
+        if finished <= 0:
+            return
         
-        # Update batch progress
         cursor.execute('''
             UPDATE batch_analysis
-            SET completed_urls = (
-                SELECT COUNT(*) FROM batch_items
-                WHERE batch_id = ? AND status IN ('completed', 'failed')
-            )
+            SET completed_urls = completed_urls + ?
             WHERE batch_id = ?
-        ''', (batch_id, batch_id))
+        ''', (finished, batch_id))
         
         # Check if batch is complete
         cursor.execute('''
-            SELECT total_urls, completed_urls FROM batch_analysis
-            WHERE batch_id = ?
-        ''', (batch_id,))
-        total, completed = cursor.fetchone()
-        
-        if total == completed:
-            cursor.execute('''
-                UPDATE batch_analysis
-                SET status = 'completed', completed_at = ?
-                WHERE batch_id = ?
-            ''', (datetime.now().isoformat(), batch_id))
-        
-        conn.commit()
-        conn.close()
+            UPDATE batch_analysis
+            SET status = 'completed', completed_at = ?
+            WHERE batch_id = ? AND completed_urls >= total_urls AND status != 'completed'
+        ''', (datetime.now().isoformat(), batch_id))
     
     def get_batch_status(self, batch_id):
         """Get batch analysis status"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
+        cursor = self._connect().cursor()
+        
+        # Read both tables from one snapshot so the counter matches the items
+        cursor.execute('BEGIN')
+        try:
+            return self._read_batch_status(cursor, batch_id)
+        finally:
+            cursor.execute('COMMIT')
+    
+    def _read_batch_status(self, cursor, batch_id):
+        """Read a batch record and its items"""
         # Get batch info
         cursor.execute('SELECT * FROM batch_analysis WHERE batch_id = ?', (batch_id,))
         columns = [desc[0] for desc in cursor.description]
         batch = dict(zip(columns, cursor.fetchone()))
         
         # Get batch items
-        cursor.execute('SELECT * FROM batch_items WHERE batch_id = ?', (batch_id,))
+        cursor.execute('SELECT * FROM batch_items WHERE batch_id = ? ORDER BY id', (batch_id,))
         columns = [desc[0] for desc in cursor.description]
         items = [dict(zip(columns, row)) for row in cursor.fetchall()]
         
         batch['items'] = items
         
-        conn.close()
         return batch
@@ -0,0 +1,87 @@
+import os
+import threading
+from http.cookiejar import DefaultCookiePolicy
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Advertise brotli only when a decoder is installed (urllib3 decodes it transparently)
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    ACCEPT_ENCODING = 'gzip, deflate'
+
+class HTTPClient:
+    """Process-wide HTTP client with keep-alive connection pools per host"""
+    
+    def __init__(self, pool_connections=None, pool_maxsize=None, retries=None, backoff_factor=None, backoff_jitter=None):
+        # Number of hosts to keep pools for, and connections kept alive per host
+        self.pool_connections = pool_connections or int(os.getenv('HTTP_POOL_CONNECTIONS', 32))
+        self.pool_maxsize = pool_maxsize or int(os.getenv('HTTP_POOL_MAXSIZE', 16))
+        
+        # Retry settings (only idempotent methods are retried)
+        self.retries = retries if retries is not None else int(os.getenv('HTTP_RETRIES', 2))
+        self.backoff_factor = backoff_factor if backoff_factor is not None else float(os.getenv('HTTP_BACKOFF_FACTOR', 0.3))
+        self.backoff_jitter = backoff_jitter if backoff_jitter is not None else float(os.getenv('HTTP_BACKOFF_JITTER', 0.3))
+        
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            max_retries=self._build_retry()
+        )
+        
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers['Accept-Encoding'] = ACCEPT_ENCODING
+        
+        # Don't carry cookies between unrelated requests (matches bare requests.get behaviour)
+        self.session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    
+    def _build_retry(self):
+        """Retry policy for connection errors and transient HTTP statuses"""
+        options = {
+            'total': self.retries,
+            'backoff_factor': self.backoff_factor,
+            'status_forcelist': (429, 500, 502, 503, 504),
+            'allowed_methods': Retry.DEFAULT_ALLOWED_METHODS,  # GET, HEAD, PUT, DELETE, OPTIONS, TRACE
+            'raise_on_status': False,
+            'respect_retry_after_header': True
+        }
+        
+        try:
+            return Retry(backoff_jitter=self.backoff_jitter, **options)
+        except TypeError:
+            # urllib3 < 2.0 has no jitter support
+            return Retry(**options)
+    
+    def get(self, url, **kwargs):
+        """Send a GET request through the shared pools"""
+        return self.session.get(url, **kwargs)
+    
+    def post(self, url, **kwargs):
+        """Send a POST request through the shared pools"""
+        return self.session.post(url, **kwargs)
+    
+    def request(self, method, url, **kwargs):
+        """Send a request with any method through the shared pools"""
+        return self.session.request(method, url, **kwargs)
+    
+    def close(self):
+        """Close all pooled connections"""
+        self.session.close()
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_http_client():
+    """Return the process-wide HTTP client, creating it on first use"""
+    global _client
+    
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = HTTPClient()
+    
+    return _client
@@ -0,0 +1,129 @@
+import os
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+class Job:
+    """State of one background job, with per-step progress"""
+    
+    def __init__(self, steps=None):
+        self.id = uuid.uuid4().hex
+        self.status = 'queued'  # queued -> running -> completed | failed
+        self.steps = {step: 'pending' for step in (steps or [])}
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._lock = threading.Lock()
+    
+    def complete_step(self, step):
+        """Mark one step (e.g. an analyzer) as finished"""
+        with self._lock:
+            self.steps[step] = 'completed'
+    
+    def to_dict(self):
+        """Snapshot of the job for API responses"""
+        with self._lock:
+            completed = sum(1 for status in self.steps.values() if status == 'completed')
+            return {
+                'job_id': self.id,
+                'status': self.status,
+                'progress': dict(self.steps),
+                'completed_steps': completed,
+                'total_steps': len(self.steps),
+                'result': self.result,
+                'error': self.error,
+                'created_at': self.created_at,
+                'started_at': self.started_at,
+                'finished_at': self.finished_at
+            }
+
+class JobManager:
+    """
+    Bounded pool of reusable worker threads for long-running audits.
+    New jobs are rejected once max_queue jobs are queued or running.
+    """
+    
+    def __init__(self, workers=None, max_queue=None, result_ttl=None):
+        self.workers = workers or int(os.getenv('JOB_WORKERS', 4))
+        self.max_queue = max_queue or int(os.getenv('JOB_MAX_QUEUE', 32))
+        self.result_ttl = result_ttl if result_ttl is not None else int(os.getenv('JOB_RESULT_TTL', 3600))
+        
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='job-worker')
+        self._jobs = {}
+        self._active = 0  # Queued + running jobs
+        self._lock = threading.Lock()
+    
+    def submit(self, func, *args, steps=None):
+        """
+        Queue func(job, *args) on the worker pool
+        Returns the new Job, or None if the queue is full
+        """
+        with self._lock:
+            self._purge_finished()
+            
+            if self._active >= self.max_queue:
+                return None
+            
+            job = Job(steps)
+            self._jobs[job.id] = job
+            self._active += 1
+        
+        self._executor.submit(self._run, job, func, args)
+        return job
+    
+    def get(self, job_id):
+        """Return a snapshot of the job, or None if unknown or expired"""
+        with self._lock:
+            # Expired results go even when no new job is submitted
+            self._purge_finished()
+            job = self._jobs.get(job_id)
+        return job.to_dict() if job else None
+    
+    def stats(self):
+        """Return worker and queue depth counters"""
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'max_queue': self.max_queue,
+                'active': self._active,
+                'tracked_jobs': len(self._jobs)
+            }
+    
+    def shutdown(self, wait=True):
+        """Stop the worker pool"""
+        self._executor.shutdown(wait=wait)
+    
+    def _run(self, job, func, args):
+        """Run a job on a worker thread and record its outcome"""
+        with job._lock:
+            job.status = 'running'
+            job.started_at = time.time()
+        
+        try:
+            result = func(job, *args)
+            with job._lock:
+                job.result = result
+                job.status = 'completed'
+        except Exception as e:
+            print(f"Error in job {job.id}: {str(e)}")
+            with job._lock:
+                job.error = str(e)
+                job.status = 'failed'
+        finally:
+            with job._lock:
+                job.finished_at = time.time()
+            with self._lock:
+                self._active -= 1
+    
+    def _purge_finished(self):
+        """Forget finished jobs older than result_ttl (caller holds the lock)"""
+        cutoff = time.time() - self.result_ttl
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished_at is not None and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
@@ -0,0 +1,164 @@
+import json
+import time
+import threading
+import os
+from utils.sqlite_store import SQLiteStore
+
+class PageCache(SQLiteStore):
+    """
+    Disk-backed cache of parsed competitor pages with HTTP revalidation data.
+    Concurrent page fetchers share per-thread WAL connections (see SQLiteStore),
+    so lookups read while another thread writes and writers wait for the lock instead of failing.
+    """
+    
+    def __init__(self, db_path='data/page_cache.db', ttl=None, max_entries=None):
+        super().__init__(db_path)
+        
+        self.ttl = ttl if ttl is not None else int(os.getenv('PAGE_CACHE_TTL', 43200))
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv('PAGE_CACHE_MAX_ENTRIES', 2000))
+        self.enabled = os.getenv('PAGE_CACHE_ENABLED', 'true').lower() != 'false'
+        
+        # Counters for this process
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.revalidated = 0
+        self.stale_served = 0
+        self.evictions = 0
+        self._stats_lock = threading.Lock()
+        
+        self._init_database()
+    
+    def _create_schema(self, cursor):
+        """Create cache table if it doesn't exist"""
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS page_cache (
+                url TEXT PRIMARY KEY,
+                content TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                last_accessed REAL NOT NULL
+            )
+        ''')
+        
+        # Used to find least recently used entries for eviction
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_page_cache_last_accessed ON page_cache (last_accessed)')
+    
+    def lookup(self, url):
+        """
+        Look up a cached page
+        Returns dict with: content, etag, last_modified, fresh (None if not cached)
+        Stale entries are still returned so the caller can revalidate them
+        """
+        if not self.enabled:
+            return None
+        
+        now = time.time()
+        
+        conn = self._connect()
+        
+        # The read doesn't take the write lock; only the access time update does
+        row = conn.execute(
+            'SELECT content, etag, last_modified, fetched_at FROM page_cache WHERE url = ?', (url,)
+        ).fetchone()
+        
+        if row:
+            conn.execute('UPDATE page_cache SET last_accessed = ? WHERE url = ?', (now, url))
+        
+        if not row:
+            with self._stats_lock:
+                self.misses += 1
+            return None
+        
+        fresh = now - row[3] <= self.ttl
+        with self._stats_lock:
+            if fresh:
+                self.hits += 1
+            else:
+                self.stale += 1
+        
+        return {
+            'content': json.loads(row[0]),
+            'etag': row[1],
+            'last_modified': row[2],
+            'fresh': fresh
+        }
+    
+    def store(self, url, content, etag=None, last_modified=None):
+        """Store a parsed page and evict least recently used entries over the size limit"""
+        if not self.enabled:
+            return
+        
+        now = time.time()
+        
+        content = json.dumps(content)
+        
+        with self._transaction() as cursor:
+            cursor.execute('''
+                INSERT OR REPLACE INTO page_cache (url, content, etag, last_modified, fetched_at, last_accessed)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (url, content, etag, last_modified, now, now))
+            
+            cursor.execute('SELECT COUNT(*) FROM page_cache')
+            overflow = cursor.fetchone()[0] - self.max_entries
+            
+            if overflow > 0:
+                cursor.execute('''
+                    DELETE FROM page_cache WHERE url IN (
+                        SELECT url FROM page_cache ORDER BY last_accessed ASC LIMIT ?
+                    )
+                ''', (overflow,))
+                with self._stats_lock:
+                    self.evictions += cursor.rowcount
+    
+    def mark_revalidated(self, url):
+        """Restart the TTL of an entry after the server answered 304 Not Modified"""
+        self._connect().execute('UPDATE page_cache SET fetched_at = ? WHERE url = ?', (time.time(), url))
+        
+        with self._stats_lock:
+            self.revalidated += 1
+    
+    def mark_stale_served(self, url):
+        """Count a stale entry served because revalidating it failed"""
+        with self._stats_lock:
+            self.stale_served += 1
+    
+    def clear(self):
+        """Remove all cached pages"""
+        self._connect().execute('DELETE FROM page_cache')
+    
+    def stats(self):
+        """Return hit/miss/revalidation counters and cache size"""
+        entries = self._connect().execute('SELECT COUNT(*) FROM page_cache').fetchone()[0]
+        
+        with self._stats_lock:
+            # Stale entries cost a request to revalidate, so they aren't hits
+            lookups = self.hits + self.misses + self.stale
+            return {
+                'enabled': self.enabled,
+                'entries': entries,
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'stale': self.stale,
+                'revalidated': self.revalidated,
+                'stale_served': self.stale_served,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups * 100, 1) if lookups else 0
+            }
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_page_cache():
+    """Return the process-wide page cache, creating it on first use"""
+    global _cache
+    
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = PageCache()
+    
+    return _cache
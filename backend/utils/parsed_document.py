@@ -0,0 +1,73 @@
+import re
+from collections import Counter
+from functools import cached_property
+
+class ParsedDocument:
+    """
+    Content text tokenized once per request and shared by all analyzers.
+    Every view is computed lazily on first use and then cached.
+    """
+    
+    def __init__(self, text):
+        self.text = text or ''
+    
+    @classmethod
+    def of(cls, text):
+        """Return `text` unchanged if it is already a ParsedDocument, otherwise wrap it"""
+        return text if isinstance(text, cls) else cls(text)
+    
+    @cached_property
+    def lower(self):
+        """Lowercased text"""
+        return self.text.lower()
+    
+    @cached_property
+    def words(self):
+        """Whitespace-separated tokens (same as text.split())"""
+        return self.text.split()
+    
+    @cached_property
+    def word_count(self):
+        """Number of whitespace-separated tokens"""
+        return len(self.words)
+    
+    @cached_property
+    def word_spans(self):
+        """Whitespace-separated tokens with offsets: list of (token, start, end)"""
+        return [(match.group(), match.start(), match.end()) for match in re.finditer(r'\S+', self.text)]
+    
+    @cached_property
+    def word_frequencies(self):
+        """Counter of lowercase word-character runs (what \\bword\\b patterns match)"""
+        return Counter(re.findall(r'\w+', self.lower))
+    
+    @cached_property
+    def alpha_words(self):
+        """Lowercase alphabetic words of 3+ letters"""
+        return re.findall(r'\b[a-zA-Z]{3,}\b', self.lower)
+    
+    @cached_property
+    def normalized_words(self):
+        """Lowercase words with punctuation removed"""
+        return re.sub(r'[^\w\s]', '', self.lower).split()
+    
+    @cached_property
+    def sentences(self):
+        """Raw pieces between sentence terminators (unstripped, may be empty)"""
+        return re.split(r'[.!?]+', self.text)
+    
+    @cached_property
+    def paragraphs(self):
+        """Blocks separated by blank lines"""
+        return self.text.split('\n\n')
+    
+    @cached_property
+    def lines(self):
+        """Individual lines"""
+        return self.text.split('\n')
+    
+    def __str__(self):
+        return self.text
+    
+    def __len__(self):
+        return len(self.text)
@@ -0,0 +1,192 @@
+import os
+import sys
+import json
+import gzip
+import time
+import argparse
+import threading
+from datetime import datetime
+
+class RetentionManager:
+    """
+    Keeps history.db small while keeping the history itself:
+    - full results older than full_results_days are archived and dropped (score rows stay)
+    - analyses older than scores_days are archived and rolled into daily aggregates
+    - free pages are returned to the file system by incremental VACUUM in small steps
+      (files created before incremental auto-vacuum get one full VACUUM first, when
+      they are at most full_vacuum_max_mb; larger files wait for --full-vacuum below)
+    Archived rows are written to gzip-compressed JSON Lines segments in archive_dir.
+    """
+    
+    def __init__(self, tracker, full_results_days=None, scores_days=None, archive_dir=None, interval=None,
+                 segment_rows=None, vacuum_pages=None, full_vacuum_max_mb=None):
+        """
+        Args:
+            tracker: HistoryTracker whose database is maintained
+            full_results_days: Age after which full results are archived
+            scores_days: Age after which analyses are archived and rolled into daily aggregates
+            archive_dir: Directory for the .jsonl.gz segments
+            interval: Seconds between retention passes (0 disables the background thread)
+            segment_rows: Rows per segment file, and per short write transaction
+            vacuum_pages: Pages released per incremental VACUUM step
+            full_vacuum_max_mb: Largest file the one-off full VACUUM runs on in the background
+                (it holds the write lock throughout, and writers give up after the busy timeout)
+        """
+        self.tracker = tracker
+        self.full_results_days = full_results_days or int(os.getenv('HISTORY_FULL_RESULTS_DAYS', 90))
+        self.scores_days = scores_days or int(os.getenv('HISTORY_SCORES_DAYS', 365))
+        self.archive_dir = archive_dir or os.getenv(
+            'HISTORY_ARCHIVE_DIR', os.path.join(os.path.dirname(tracker.db_path), 'archive')
+        )
+        self.interval = interval if interval is not None else int(os.getenv('HISTORY_RETENTION_INTERVAL', 3600))
+        self.segment_rows = segment_rows or int(os.getenv('HISTORY_ARCHIVE_SEGMENT_ROWS', 500))
+        self.vacuum_pages = vacuum_pages or int(os.getenv('HISTORY_VACUUM_PAGES', 256))
+        self.full_vacuum_max_mb = (
+            full_vacuum_max_mb if full_vacuum_max_mb is not None else float(os.getenv('HISTORY_FULL_VACUUM_MAX_MB', 64))
+        )
+        
+        # Pause between vacuum steps so request writes get the lock in between
+        self.vacuum_pause = 0.05
+        
+        self._stop = threading.Event()
+        self._thread = None
+        self._full_vacuum_skipped = False
+    
+    def start(self):
+        """Run retention passes in a background thread"""
+        if self.interval <= 0 or self._thread is not None:
+            return
+        
+        self._thread = threading.Thread(target=self._run, name='history-retention', daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Stop the background thread after its current step"""
+        self._stop.set()
+    
+    def run_once(self):
+        """
+        Apply the retention policies once
+        Returns dict with: results_archived, analyses_rolled_up, pages_vacuumed
+        """
+        now = time.time()
+        
+        # Full results never outlive the analysis row that owns them
+        results_cutoff = int(now - min(self.full_results_days, self.scores_days) * 86400)
+        scores_cutoff = int(now - self.scores_days * 86400)
+        
+        return {
+            'results_archived': self._archive_results(results_cutoff),
+            'analyses_rolled_up': self._roll_up_analyses(scores_cutoff),
+            'pages_vacuumed': self._vacuum()
+        }
+    
+    def _run(self):
+        """Background loop"""
+        while not self._stop.is_set():
+            try:
+                summary = self.run_once()
+                if summary['results_archived'] or summary['analyses_rolled_up']:
+                    print(f"✓ History retention: {summary}")
+            except Exception as e:
+                print(f"Error in history retention: {str(e)}")
+            
+            self._stop.wait(self.interval)
+    
+    def _archive_results(self, before_ts):
+        """Archive and drop expired full results, one segment at a time"""
+        archived = 0
+        
+        while not self._stop.is_set():
+            rows = self.tracker.get_expired_results(before_ts, self.segment_rows)
+            if not rows:
+                break
+            
+            # The segment is on disk before anything is deleted
+            self._write_segment('results', rows)
+            self.tracker.delete_results([row['id'] for row in rows])
+            archived += len(rows)
+        
+        return archived
+    
+    def _roll_up_analyses(self, before_ts):
+        """Archive expired analyses and fold them into daily aggregates, one segment at a time"""
+        rolled_up = 0
+        
+        while not self._stop.is_set():
+            rows = self.tracker.get_expired_analyses(before_ts, self.segment_rows)
+            if not rows:
+                break
+            
+            self._write_segment('scores', rows)
+            rolled_up += self.tracker.roll_up_analyses([row['id'] for row in rows])
+        
+        return rolled_up
+    
+    def _vacuum(self):
+        """Release free pages in small steps"""
+        released = 0
+        
+        # Once per older file, in this thread rather than on startup
+        if not self._stop.is_set() and self.tracker.needs_full_vacuum():
+            if self._full_vacuum_allowed():
+                released += self.tracker.full_vacuum()
+            
+            # Incremental steps don't apply until the file is switched; free pages stay until then
+            else:
+                return released
+        
+        while not self._stop.is_set():
+            pages = self.tracker.incremental_vacuum(self.vacuum_pages)
+            if not pages:
+                break
+            
+            released += pages
+            self._stop.wait(self.vacuum_pause)
+        
+        return released
+    
+    def _full_vacuum_allowed(self):
+        """Whether the file is small enough to rewrite without stalling writers past the busy timeout"""
+        size_mb = os.path.getsize(self.tracker.db_path) / (1024 * 1024)
+        if size_mb <= self.full_vacuum_max_mb:
+            return True
+        
+        if not self._full_vacuum_skipped:
+            print(f"History database is {size_mb:.0f} MB; skipping its one-off full VACUUM "
+                  f"(run python -m utils.retention_manager --full-vacuum during a quiet period)")
+            self._full_vacuum_skipped = True
+        return False
+    
+    def _write_segment(self, kind, rows):
+        """Write rows to a new .jsonl.gz segment (atomically, via a temporary file)"""
+        os.makedirs(self.archive_dir, exist_ok=True)
+        
+        name = f"history-{kind}-{datetime.now().strftime('%Y%m%d_%H%M%S')}-{rows[0]['id']}-{rows[-1]['id']}.jsonl.gz"
+        path = os.path.join(self.archive_dir, name)
+        temp_path = path + '.tmp'
+        
+        with gzip.open(temp_path, 'wt', encoding='utf-8') as segment:
+            for row in rows:
+                segment.write(json.dumps(row, separators=(',', ':')) + '\n')
+        
+        os.replace(temp_path, path)
+        return path
+
+if __name__ == '__main__':
+    # One retention pass, for deployments without a long-running server (run from the backend directory,
+    # e.g. by a scheduled job: python -m utils.retention_manager)
+    from utils.history_tracker import HistoryTracker
+    
+    parser = argparse.ArgumentParser(description='Apply the history retention policies once')
+    parser.add_argument('--full-vacuum', action='store_true',
+                        help='Run the one-off full VACUUM whatever the file size (writers wait until it finishes)')
+    args = parser.parse_args()
+    
+    try:
+        manager = RetentionManager(HistoryTracker(), full_vacuum_max_mb=float('inf') if args.full_vacuum else None)
+        print(f"✓ History retention: {manager.run_once()}")
+        sys.exit(0)
+    except Exception as e:
+        print(f"\n✗ History retention failed: {e}")
+        sys.exit(1)
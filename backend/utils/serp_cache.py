@@ -0,0 +1,153 @@
+import json
+import time
+import threading
+import os
+from utils.sqlite_store import SQLiteStore
+
+class SERPCache(SQLiteStore):
+    """
+    Disk-backed cache for paid SERP API responses.
+    Lookups from concurrent fetchers share per-thread WAL connections (see SQLiteStore),
+    so they read while another thread writes and wait for the write lock instead of failing.
+    """
+    
+    def __init__(self, db_path='data/serp_cache.db', ttl=None, max_entries=None):
+        super().__init__(db_path)
+        
+        self.ttl = ttl if ttl is not None else int(os.getenv('SERP_CACHE_TTL', 86400))
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv('SERP_CACHE_MAX_ENTRIES', 5000))
+        self.enabled = os.getenv('SERP_CACHE_ENABLED', 'true').lower() != 'false'
+        
+        # Counters for this process
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._stats_lock = threading.Lock()
+        
+        self._init_database()
+    
+    def _create_schema(self, cursor):
+        """Create cache table if it doesn't exist"""
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS serp_cache (
+                namespace TEXT NOT NULL,
+                query TEXT NOT NULL,
+                num_results INTEGER NOT NULL,
+                gl TEXT NOT NULL,
+                hl TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_accessed REAL NOT NULL,
+                PRIMARY KEY (namespace, query, num_results, gl, hl)
+            )
+        ''')
+        
+        # Used to find least recently used entries for eviction
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_serp_cache_last_accessed ON serp_cache (last_accessed)')
+    
+    def get(self, namespace, query, num_results, gl='us', hl='en'):
+        """Return the cached payload, or None if missing or expired"""
+        if not self.enabled:
+            return None
+        
+        key = self._key(namespace, query, num_results, gl, hl)
+        now = time.time()
+        
+        conn = self._connect()
+        
+        # The read doesn't take the write lock; only the access time update below does
+        row = conn.execute('''
+            SELECT payload, created_at FROM serp_cache
+            WHERE namespace = ? AND query = ? AND num_results = ? AND gl = ? AND hl = ?
+        ''', key).fetchone()
+        
+        payload = None
+        if row and now - row[1] <= self.ttl:
+            payload = json.loads(row[0])
+            conn.execute('''
+                UPDATE serp_cache SET last_accessed = ?
+                WHERE namespace = ? AND query = ? AND num_results = ? AND gl = ? AND hl = ?
+            ''', (now,) + key)
+        elif row:
+            # Expired entry
+            conn.execute('''
+                DELETE FROM serp_cache
+                WHERE namespace = ? AND query = ? AND num_results = ? AND gl = ? AND hl = ?
+            ''', key)
+        
+        with self._stats_lock:
+            if payload is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        
+        return payload
+    
+    def set(self, namespace, query, num_results, payload, gl='us', hl='en'):
+        """Store a payload and evict least recently used entries over the size limit"""
+        if not self.enabled:
+            return
+        
+        key = self._key(namespace, query, num_results, gl, hl)
+        now = time.time()
+        
+        payload = json.dumps(payload)
+        
+        with self._transaction() as cursor:
+            cursor.execute('''
+                INSERT OR REPLACE INTO serp_cache (
+                    namespace, query, num_results, gl, hl, payload, created_at, last_accessed
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', key + (payload, now, now))
+            
+            cursor.execute('SELECT COUNT(*) FROM serp_cache')
+            overflow = cursor.fetchone()[0] - self.max_entries
+            
+            if overflow > 0:
+                cursor.execute('''
+                    DELETE FROM serp_cache WHERE rowid IN (
+                        SELECT rowid FROM serp_cache ORDER BY last_accessed ASC LIMIT ?
+                    )
+                ''', (overflow,))
+                with self._stats_lock:
+                    self.evictions += cursor.rowcount
+    
+    def clear(self):
+        """Remove all cached responses"""
+        self._connect().execute('DELETE FROM serp_cache')
+    
+    def stats(self):
+        """Return hit/miss counters and cache size"""
+        entries = self._connect().execute('SELECT COUNT(*) FROM serp_cache').fetchone()[0]
+        
+        with self._stats_lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'entries': entries,
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups * 100, 1) if lookups else 0
+            }
+    
+    def _key(self, namespace, query, num_results, gl, hl):
+        """Normalize the cache key (queries are case and whitespace insensitive)"""
+        normalized_query = ' '.join(query.lower().split())
+        return (namespace, normalized_query, int(num_results), gl, hl)
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_serp_cache():
+    """Return the process-wide SERP cache, creating it on first use"""
+    global _cache
+    
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = SERPCache()
+    
+    return _cache
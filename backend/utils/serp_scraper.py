@@ -1,5 +1,11 @@
 import requests
+from utils.http_client import get_http_client
+from utils.serp_cache import get_serp_cache
+from utils.page_cache import get_page_cache
 from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor, wait
+from urllib.parse import urlparse
+import threading
 import re
 import time
 import os
@@ -20,21 +26,37 @@ class SERPScraper:
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.5',
         }
+        
+        # Shared keep-alive connection pools
+        self.http = get_http_client()
+        
+        # Persistent cache of SERP API responses
+        self.cache = get_serp_cache()
+        
+        # Persistent cache of parsed competitor pages
+        self.page_cache = get_page_cache()
     
-    def search_google(self, query, num_results=10):
+    def search_google(self, query, num_results=10, gl='us', hl='en'):
         """
         Search Google using Serper.dev API and return top results
+        Results are cached per (query, num_results, gl, hl) for SERP_CACHE_TTL seconds
         Returns list of dicts with: url, title, snippet
         """
         if not query or not query.strip():
             print("No query provided, using mock results")
             return self._get_mock_serp_results("generic search")
         
+        # Re-audits of the same keyword skip the paid API call
+        cached = self._get_cached_results(query, num_results, gl, hl)
+        if cached is not None:
+            print(f"✓ Using cached SERP results for: {query}")
+            return cached
+        
         try:
             print(f"Searching Google via Serper API for: {query}")
             
             # Try Serper.dev API first
-            response = requests.post(
+            response = self.http.post(
                 'https://google.serper.dev/search',
                 headers={
                     'X-API-KEY': self.serper_api_key,
@@ -43,8 +65,8 @@ class SERPScraper:
                 json={
                     'q': query,
                     'num': num_results,
-                    'gl': 'us',  # Country: United States
-                    'hl': 'en'   # Language: English
+                    'gl': gl,  # Country (default: United States)
+                    'hl': hl   # Language (default: English)
                 },
                 timeout=15
             )
@@ -64,28 +86,30 @@ class SERPScraper:
                     })
                 
                 print(f"✓ Retrieved {len(results)} real SERP results from Serper API")
+                if results:
+                    self._cache_results(query, num_results, results, gl, hl)
                 return results if results else self._get_mock_serp_results(query)
             
             else:
                 print(f"Serper API error (status {response.status_code}), trying SerpApi...")
-                return self._search_with_serpapi(query, num_results)
+                return self._search_with_serpapi(query, num_results, gl, hl)
         
         except Exception as e:
             print(f"Error with Serper API: {str(e)}, trying SerpApi fallback...")
-            return self._search_with_serpapi(query, num_results)
+            return self._search_with_serpapi(query, num_results, gl, hl)
     
-    def _search_with_serpapi(self, query, num_results=10):
+    def _search_with_serpapi(self, query, num_results=10, gl='us', hl='en'):
         """Fallback to SerpApi if Serper.dev fails"""
         try:
-            response = requests.get(
+            response = self.http.get(
                 'https://serpapi.com/search',
                 params={
                     'q': query,
                     'num': num_results,
                     'api_key': self.serpapi_key,
                     'engine': 'google',
-                    'gl': 'us',
-                    'hl': 'en'
+                    'gl': gl,
+                    'hl': hl
                 },
                 timeout=15
             )
@@ -105,6 +129,8 @@ class SERPScraper:
                     })
                 
                 print(f"✓ Retrieved {len(results)} real SERP results from SerpApi")
+                if results:
+                    self._cache_results(query, num_results, results, gl, hl)
                 return results if results else self._get_mock_serp_results(query)
             else:
                 print(f"SerpApi also failed (status {response.status_code}), using mock data")
@@ -113,76 +139,214 @@ class SERPScraper:
         except Exception as e:
             print(f"SerpApi error: {str(e)}, falling back to mock data")
             return self._get_mock_serp_results(query)
+    
+    def _get_cached_results(self, query, num_results, gl, hl):
+        """Cached SERP results, or None if missing or the cache can't be read (a cache error never fails the search)"""
+        try:
+            return self.cache.get('organic', query, num_results, gl, hl)
+        except Exception as e:
+            print(f"Error reading SERP cache: {str(e)}")
+            return None
+    
+    def _cache_results(self, query, num_results, results, gl, hl):
+        """Cache SERP results; a failed write is only logged, so the paid results are still returned"""
+        try:
+            self.cache.set('organic', query, num_results, results, gl, hl)
+        except Exception as e:
+            print(f"Error writing SERP cache: {str(e)}")
 
     def extract_page_content(self, url):
         """
         Extract content from a URL for analysis
         Returns dict with: text, word_count, headers, has_images, has_videos
         """
-        # If it's a mock URL, return mock content
-        if "example" in url and "article" in url:
-            return self._get_mock_page_content(url)
-
         try:
-            response = requests.get(url, headers=self.headers, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
+            return self._fetch_page(url)
+        
+        except Exception as e:
+            print(f"Error extracting content from {url}: {str(e)}")
+            return self._empty_page_content()
+    
+    def extract_pages(self, urls, max_concurrency=8, deadline=15.0, per_host_limit=2):
+        """
+        Extract content from several URLs in parallel
+        
+        Args:
+            urls: URLs to fetch
+            max_concurrency: Maximum number of pages fetched at once
+            deadline: Overall time budget in seconds for the whole sweep
+            per_host_limit: Maximum concurrent requests to the same host
             
-            # Remove unwanted elements
-            for tag in soup(['script', 'style', 'nav', 'footer', 'header', 'aside']):
-                tag.decompose()
+        Returns:
+            dict keyed by URL (in input order) with: status ('ok', 'failed' or 'timeout'),
+            content (page dict, empty for failures and timeouts), error, elapsed
+        """
+        urls = list(dict.fromkeys(urls))
+        if not urls:
+            return {}
+        
+        started = time.monotonic()
+        host_limits = {}
+        host_lock = threading.Lock()
+        elapsed = {}
+        
+        def fetch(url):
+            # Limit concurrent requests per host so one slow domain cannot take every slot
+            host = urlparse(url).netloc
+            with host_lock:
+                semaphore = host_limits.setdefault(host, threading.Semaphore(per_host_limit))
             
-            # Extract main content
-            main_content = soup.find('main') or soup.find('article') or soup.find('body')
+            with semaphore:
+                remaining = deadline - (time.monotonic() - started)
+                if remaining <= 0:
+                    raise TimeoutError('Deadline reached before fetch started')
+                try:
+                    return self._fetch_page(url, timeout=min(10, remaining))
+                finally:
+                    elapsed[url] = round(time.monotonic() - started, 3)
+        
+        executor = ThreadPoolExecutor(max_workers=min(max_concurrency, len(urls)), thread_name_prefix='page-fetch')
+        futures = {url: executor.submit(fetch, url) for url in urls}
+        wait(list(futures.values()), timeout=deadline)
+        
+        # Do not wait for stragglers; their sockets time out on their own
+        executor.shutdown(wait=False, cancel_futures=True)
+        
+        pages = {}
+        for url, future in futures.items():
+            page = {
+                'status': 'ok',
+                'content': self._empty_page_content(),
+                'error': None,
+                'elapsed': elapsed.get(url)
+            }
             
-            if main_content:
-                text = main_content.get_text(separator=' ', strip=True)
-                text = re.sub(r'\s+', ' ', text)
+            if not future.done() or future.cancelled():
+                page['status'] = 'timeout'
+                page['error'] = f'Not finished within {deadline}s deadline'
+            elif isinstance(future.exception(), (TimeoutError, requests.exceptions.Timeout)):
+                page['status'] = 'timeout'
+                page['error'] = str(future.exception())
+            elif future.exception() is not None:
+                page['status'] = 'failed'
+                page['error'] = str(future.exception())
             else:
-                text = ''
-            
-            # Count words
-            word_count = len(text.split())
-            
-            # Extract headers
-            headers = []
-            for tag in ['h1', 'h2', 'h3']:
-                headers.extend([h.get_text(strip=True) for h in soup.find_all(tag)])
-            
-            # Check for multimedia
-            has_images = len(soup.find_all('img')) > 0
-            has_videos = len(soup.find_all(['video', 'iframe'])) > 0
-            
-            # Check for lists
-            has_lists = len(soup.find_all(['ul', 'ol'])) > 0
-            
-            # Check for tables/comparisons
-            has_tables = len(soup.find_all('table')) > 0
+                page['content'] = future.result()
             
-            return {
-                'text': text,
-                'word_count': word_count,
-                'headers': headers,
-                'num_headers': len(headers),
-                'has_images': has_images,
-                'has_videos': has_videos,
-                'has_lists': has_lists,
-                'has_tables': has_tables
-            }
+            pages[url] = page
         
-        except Exception as e:
-            print(f"Error extracting content from {url}: {str(e)}")
-            return {
-                'text': '',
-                'word_count': 0,
-                'headers': [],
-                'num_headers': 0,
-                'has_images': False,
-                'has_videos': False,
-                'has_lists': False,
-                'has_tables': False
-            }
+        ok_count = sum(1 for page in pages.values() if page['status'] == 'ok')
+        print(f"✓ Fetched {ok_count}/{len(urls)} competitor pages in {time.monotonic() - started:.1f}s")
+        return pages
+    
+    def _fetch_page(self, url, timeout=10):
+        """
+        Fetch and parse a single page (raises on network or HTTP errors)
+        Parsed pages are cached; once stale they are revalidated with
+        If-None-Match / If-Modified-Since and reused on 304 Not Modified,
+        or when revalidation fails (network error or any other status than 200)
+        """
+        # If it's a mock URL, return mock content
+        if "example" in url and "article" in url:
+            return self._get_mock_page_content(url)
+        
+        cached = self.page_cache.lookup(url)
+        if cached and cached['fresh']:
+            return cached['content']
+        
+        request_headers = dict(self.headers)
+        if cached:
+            if cached['etag']:
+                request_headers['If-None-Match'] = cached['etag']
+            if cached['last_modified']:
+                request_headers['If-Modified-Since'] = cached['last_modified']
+        
+        try:
+            response = self.http.get(url, headers=request_headers, timeout=timeout)
+        except requests.exceptions.RequestException:
+            if not cached:
+                raise
+            self.page_cache.mark_stale_served(url)
+            return cached['content']
+        
+        if cached and response.status_code == 304:
+            self.page_cache.mark_revalidated(url)
+            return cached['content']
+        
+        # A stale copy beats failing the page
+        if cached and response.status_code != 200:
+            self.page_cache.mark_stale_served(url)
+            return cached['content']
+        
+        response.raise_for_status()
+        
+        content = self._parse_page(response.content)
+        self.page_cache.store(
+            url,
+            content,
+            etag=response.headers.get('ETag'),
+            last_modified=response.headers.get('Last-Modified')
+        )
+        return content
+    
+    def _parse_page(self, html):
+        """Parse page HTML into the content dict used by the analyzers"""
+        soup = BeautifulSoup(html, 'html.parser')
+        
+        # Remove unwanted elements
+        for tag in soup(['script', 'style', 'nav', 'footer', 'header', 'aside']):
+            tag.decompose()
+        
+        # Extract main content
+        main_content = soup.find('main') or soup.find('article') or soup.find('body')
+        
+        if main_content:
+            text = main_content.get_text(separator=' ', strip=True)
+            text = re.sub(r'\s+', ' ', text)
+        else:
+            text = ''
+        
+        # Count words
+        word_count = len(text.split())
+        
+        # Extract headers
+        headers = []
+        for tag in ['h1', 'h2', 'h3']:
+            headers.extend([h.get_text(strip=True) for h in soup.find_all(tag)])
+        
+        # Check for multimedia
+        has_images = len(soup.find_all('img')) > 0
+        has_videos = len(soup.find_all(['video', 'iframe'])) > 0
+        
+        # Check for lists
+        has_lists = len(soup.find_all(['ul', 'ol'])) > 0
+        
+        # Check for tables/comparisons
+        has_tables = len(soup.find_all('table')) > 0
+        
+        return {
+            'text': text,
+            'word_count': word_count,
+            'headers': headers,
+            'num_headers': len(headers),
+            'has_images': has_images,
+            'has_videos': has_videos,
+            'has_lists': has_lists,
+            'has_tables': has_tables
+        }
+    
+    def _empty_page_content(self):
+        """Page content returned when a page could not be fetched"""
+        return {
+            'text': '',
+            'word_count': 0,
+            'headers': [],
+            'num_headers': 0,
+            'has_images': False,
+            'has_videos': False,
+            'has_lists': False,
+            'has_tables': False
+        }
     
     def _get_mock_serp_results(self, query):
         """Return realistic mock SERP results"""
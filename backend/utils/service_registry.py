@@ -0,0 +1,57 @@
+from analyzers.seo_analyzer import SEOAnalyzer
+from analyzers.serp_analyzer import SERPAnalyzer
+from analyzers.aeo_analyzer import AEOAnalyzer
+from analyzers.humanization_analyzer import HumanizationAnalyzer
+from analyzers.differentiation_analyzer import DifferentiationAnalyzer
+from analyzers.keyword_researcher import KeywordResearcher
+from analyzers.content_comparator import ContentComparator
+from analyzers.sentiment_analyzer import SentimentAnalyzer
+from analyzers.entity_analyzer import EntityAnalyzer
+from analyzers.freshness_analyzer import FreshnessAnalyzer
+from analyzers.plagiarism_checker import PlagiarismChecker
+from analyzers.schema_generator import SchemaGenerator
+from utils.text_extractor import TextExtractor
+from utils.pdf_generator import PDFReportGenerator
+from utils.serp_scraper import SERPScraper
+from utils.history_tracker import HistoryTracker
+from utils.ai_improver import AIContentImprover
+from utils.share_link_manager import ShareLinkManager
+
+class ServiceRegistry:
+    """
+    Analyzer and service instances created once at startup and shared by all requests.
+    Everything registered here keeps no per-request state, so it is safe to call
+    from concurrent request and worker threads.
+    """
+    
+    def __init__(self):
+        # One SERP client shared by every SERP-backed analyzer
+        self.scraper = SERPScraper()
+        
+        # Content analyzers
+        self.seo = SEOAnalyzer()
+        self.serp = SERPAnalyzer(self.scraper)
+        self.aeo = AEOAnalyzer()
+        self.humanization = HumanizationAnalyzer()
+        self.differentiation = DifferentiationAnalyzer(self.scraper)
+        self.sentiment = SentimentAnalyzer()
+        self.entities = EntityAnalyzer()
+        self.freshness = FreshnessAnalyzer()
+        self.plagiarism = PlagiarismChecker()
+        self.schema = SchemaGenerator()
+        
+        # Research and comparison tools
+        self.keyword_researcher = KeywordResearcher()
+        self.content_comparator = ContentComparator()
+        
+        # Services
+        self.text_extractor = TextExtractor()
+        self.pdf_generator = PDFReportGenerator()
+        self.history = HistoryTracker()
+        self.share_links = ShareLinkManager()
+        self.ai_improver = AIContentImprover()
+    
+    def close_connections(self):
+        """Close the calling thread's SQLite connections (reopened on next use)"""
+        for store in (self.history, self.share_links, self.scraper.cache, self.scraper.page_cache):
+            store.close()
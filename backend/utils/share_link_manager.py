@@ -1,87 +1,337 @@
 import secrets
+import hashlib
 import json
+import time
 from datetime import datetime, timedelta
 import os
+import atexit
+import threading
+from collections import Counter
+from utils.sqlite_store import SQLiteStore
 
-class ShareLinkManager:
-    def __init__(self):
-        self.shares_file = 'data/shared_reports.json'
-        os.makedirs('data', exist_ok=True)
-        if not os.path.exists(self.shares_file):
-            with open(self.shares_file, 'w') as f:
-                json.dump({}, f)
+class ShareLinkManager(SQLiteStore):
+    """
+    Public share links for reports, stored in SQLite keyed by token.
+    Each distinct report is stored once in share_payloads, keyed by the
+    SHA-256 of its canonical JSON; links reference it by hash and the
+    payload is deleted when the last link to it is removed.
+    Viewing a report only reads: views are counted in memory, and once
+    start() has run a background thread adds them to view_count in batches,
+    every flush_interval seconds, once flush_threshold views are pending, and
+    at exit. The same thread removes expired reports every cleanup_interval seconds.
+    Without the thread (start() not called, or flush_interval 0) the view that
+    reaches flush_threshold writes the batch, and runs a due cleanup, itself.
+    """
+    
+    def __init__(self, db_path='data/shares.db', legacy_file='data/shared_reports.json', flush_interval=None,
+                 flush_threshold=None, cleanup_interval=None):
+        """
+        Args:
+            db_path: SQLite database file
+            legacy_file: JSON file shares were kept in before, imported once
+            flush_interval: Seconds between view count flushes (0 disables the background thread;
+                views are then written by flush_views() and shutdown())
+            flush_threshold: Pending views that trigger an early flush
+            cleanup_interval: Seconds between expired report cleanups
+        """
+        super().__init__(db_path)
+        
+        # Shares were kept in one JSON file before; it is imported once, then renamed
+        self.legacy_file = legacy_file
+        self.flush_interval = flush_interval if flush_interval is not None else int(
+            os.getenv('SHARE_VIEW_FLUSH_INTERVAL', 10)
+        )
+        self.flush_threshold = flush_threshold if flush_threshold is not None else int(
+            os.getenv('SHARE_VIEW_FLUSH_THRESHOLD', 1000)
+        )
+        self.cleanup_interval = cleanup_interval if cleanup_interval is not None else int(
+            os.getenv('SHARE_CLEANUP_INTERVAL', 3600)
+        )
+        
+        self._init_database()
+        
+        # Views not yet written to view_count
+        self._views = Counter()
+        self._pending_views = 0
+        self._views_lock = threading.Lock()
+        self._flush_requested = threading.Event()
+        self._stop = threading.Event()
+        self._flusher = None
+        self._next_cleanup = time.time()
+    
+    def start(self):
+        """Flush views and clean up expired reports in a background thread, and flush pending views at exit"""
+        if self.flush_interval <= 0 or self._flusher is not None:
+            return
+        
+        self._flusher = threading.Thread(target=self._run_flusher, name='share-view-flusher', daemon=True)
+        self._flusher.start()
+        atexit.register(self.shutdown)
+    
+    def _init_database(self):
+        """Create tables if they don't exist, apply pending migrations and import the legacy JSON file"""
+        with self._transaction() as cursor:
+            self._create_schema(cursor)
+            imported = self._import_legacy_shares(cursor)
+        
+        # Only renamed once the import has committed
+        if imported is not None:
+            os.replace(self.legacy_file, self.legacy_file + '.migrated')
+            print(f"✓ Imported {imported} shared reports from {self.legacy_file}")
+    
+    def _create_schema(self, cursor):
+        """Create missing tables and apply pending migrations, inside the caller's transaction"""
+        self._create_tables(cursor)
+        self._migrate(cursor)
+    
+    def _create_tables(self, cursor):
+        """Create missing tables"""
+        # One row per distinct report, shared by every link to it
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS share_payloads (
+                hash TEXT PRIMARY KEY,
+                results TEXT NOT NULL,
+                ref_count INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS shared_reports (
+                token TEXT PRIMARY KEY,
+                payload_hash TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                view_count INTEGER DEFAULT 0,
+                FOREIGN KEY (payload_hash) REFERENCES share_payloads(hash)
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_shares_expires_at ON shared_reports(expires_at)')
+    
+    def _migrate(self, cursor):
+        """Apply the migrations an existing database hasn't seen yet (tracked in PRAGMA user_version)"""
+        cursor.execute('PRAGMA user_version')
+        version = cursor.fetchone()[0]
+        
+        migrations = [
+            self._deduplicate_payloads
+        ]
+        for target_version, migration in enumerate(migrations, start=1):
+            if version < target_version:
+                migration(cursor)
+        
+        if version < len(migrations):
+            cursor.execute(f'PRAGMA user_version = {len(migrations)}')
+    
+    def _deduplicate_payloads(self, cursor):
+        """Migration 1: move each link's inline results into share_payloads"""
+        cursor.execute('PRAGMA table_info(shared_reports)')
+        if 'results' not in {row[1] for row in cursor.fetchall()}:
+            return
+        
+        cursor.execute('DROP INDEX IF EXISTS idx_shares_expires_at')
+        cursor.execute('ALTER TABLE shared_reports RENAME TO shared_reports_v1')
+        self._create_tables(cursor)
+        
+        rows = cursor.execute('''
+            SELECT token, results, created_at, expires_at, view_count FROM shared_reports_v1
+        ''').fetchall()
+        for token, results, created_at, expires_at, view_count in rows:
+            self._add_share(cursor, token, json.loads(results), created_at, expires_at, view_count)
+        
+        # Pages freed by the inline copies are reused by new links
+        cursor.execute('DROP TABLE shared_reports_v1')
+    
+    def _add_share(self, cursor, token, analysis_results, created_at, expires_at, view_count=0):
+        """Insert a link and take a reference on its payload; returns False if the token already exists"""
+        payload = json.dumps(analysis_results, sort_keys=True, separators=(',', ':'))
+        payload_hash = hashlib.sha256(payload.encode('utf-8')).hexdigest()
+        
+        cursor.execute('''
+            INSERT OR IGNORE INTO shared_reports (token, payload_hash, created_at, expires_at, view_count)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (token, payload_hash, created_at, expires_at, view_count))
+        if cursor.rowcount == 0:
+            return False
+        
+        # A payload seen before only gets its count bumped; its JSON isn't written again
+        cursor.execute('''
+            INSERT INTO share_payloads (hash, results, ref_count) VALUES (?, ?, 1)
+            ON CONFLICT(hash) DO UPDATE SET ref_count = ref_count + 1
+        ''', (payload_hash, payload))
+        return True
+    
+    def _release_payloads(self, cursor, references):
+        """Drop references (payload hash -> count) and delete payloads no link uses anymore"""
+        cursor.executemany(
+            'UPDATE share_payloads SET ref_count = ref_count - ? WHERE hash = ?',
+            [(count, payload_hash) for payload_hash, count in references.items()]
+        )
+        cursor.executemany(
+            'DELETE FROM share_payloads WHERE hash = ? AND ref_count <= 0',
+            [(payload_hash,) for payload_hash in references]
+        )
+    
+    def _import_legacy_shares(self, cursor):
+        """
+        Copy unexpired shares from the legacy JSON file
+        Returns how many, or None if there is no file or it can't be read
+        (it is then kept, not renamed, and the import is tried again on the next start)
+        """
+        if not self.legacy_file or not os.path.exists(self.legacy_file):
+            return None
+        
+        try:
+            with open(self.legacy_file, 'r') as f:
+                shares = json.load(f)
+        except Exception as e:
+            print(f"Error reading {self.legacy_file}, shared reports not imported: {str(e)}")
+            return None
+        
+        now = time.time()
+        imported = 0
+        for token, share in shares.items():
+            try:
+                expires_at = datetime.fromisoformat(share['expires_at']).timestamp()
+                created_at = datetime.fromisoformat(share['created_at']).timestamp()
+            except (KeyError, TypeError, ValueError):
+                continue
+            
+            if expires_at > now and self._add_share(
+                cursor, token, share.get('results'), created_at, expires_at, share.get('view_count', 0)
+            ):
+                imported += 1
+        
+        return imported
     
     def create_share_link(self, analysis_results, expiry_days=30):
         token = secrets.token_urlsafe(32)
-        expiry_date = (datetime.now() + timedelta(days=expiry_days)).isoformat()
-        
-        shares = self._load_shares()
-        shares[token] = {
-            'results': analysis_results,
-            'created_at': datetime.now().isoformat(),
-            'expires_at': expiry_date,
-            'view_count': 0
-        }
-        self._save_shares(shares)
+        now = datetime.now()
+        expiry_date = now + timedelta(days=expiry_days)
+        
+        with self._transaction() as cursor:
+            self._add_share(cursor, token, analysis_results, now.timestamp(), expiry_date.timestamp())
         
         return {
             'token': token,
             'url': f'/share/{token}',
-            'expires_at': expiry_date
+            'expires_at': expiry_date.isoformat()
         }
     
     def get_shared_report(self, token):
-        shares = self._load_shares()
+        # Expired reports are left for the cleanup pass, so a view never writes
+        row = self._connect().execute('''
+            SELECT p.results FROM shared_reports s
+            JOIN share_payloads p ON p.hash = s.payload_hash
+            WHERE s.token = ? AND s.expires_at >= ?
+        ''', (token, time.time())).fetchone()
         
-        if token not in shares:
+        if row is None:
             return None
         
-        share_data = shares[token]
+        with self._views_lock:
+            self._views[token] += 1
+            self._pending_views += 1
+            pending = self._pending_views
         
-        # Check expiry
-        expires_at = datetime.fromisoformat(share_data['expires_at'])
-        if datetime.now() > expires_at:
-            del shares[token]
-            self._save_shares(shares)
-            return None
-        
-        # Increment view count
-        share_data['view_count'] += 1
-        shares[token] = share_data
-        self._save_shares(shares)
+        if pending >= self.flush_threshold:
+            if self._flusher is not None:
+                self._flush_requested.set()
+            else:
+                # Nothing flushes in the background, so the pending views are written here
+                try:
+                    self._write_pending()
+                except Exception as e:
+                    print(f"Error in share view flush: {str(e)}")
         
-        return share_data['results']
+        return json.loads(row[0])
     
     def delete_share_link(self, token):
-        shares = self._load_shares()
-        if token in shares:
-            del shares[token]
-            self._save_shares(shares)
+        with self._transaction() as cursor:
+            cursor.execute('SELECT payload_hash FROM shared_reports WHERE token = ?', (token,))
+            row = cursor.fetchone()
+            if row is None:
+                return False
+            
+            cursor.execute('DELETE FROM shared_reports WHERE token = ?', (token,))
+            self._release_payloads(cursor, {row[0]: 1})
             return True
-        return False
     
     def cleanup_expired(self):
-        shares = self._load_shares()
-        now = datetime.now()
+        now = time.time()
         
-        expired_tokens = [
-            token for token, data in shares.items()
-            if datetime.fromisoformat(data['expires_at']) < now
-        ]
+        with self._transaction() as cursor:
+            cursor.execute('''
+                SELECT payload_hash, COUNT(*) FROM shared_reports
+                WHERE expires_at < ?
+                GROUP BY payload_hash
+            ''', (now,))
+            references = dict(cursor.fetchall())
+            
+            cursor.execute('DELETE FROM shared_reports WHERE expires_at < ?', (now,))
+            self._release_payloads(cursor, references)
+            return sum(references.values())
+    
+    def flush_views(self):
+        """Add the pending view counts to view_count in one transaction; returns the number of views written"""
+        with self._views_lock:
+            views, self._views = self._views, Counter()
+            self._pending_views = 0
+        
+        if not views:
+            return 0
         
-        for token in expired_tokens:
-            del shares[token]
+        try:
+            with self._transaction() as cursor:
+                cursor.executemany(
+                    'UPDATE shared_reports SET view_count = view_count + ? WHERE token = ?',
+                    [(count, token) for token, count in views.items()]
+                )
+        except Exception:
+            # Keep the counts for the next flush
+            with self._views_lock:
+                self._views.update(views)
+                self._pending_views += sum(views.values())
+            raise
         
-        self._save_shares(shares)
-        return len(expired_tokens)
+        return sum(views.values())
     
-    def _load_shares(self):
+    def shutdown(self):
+        """Stop the background thread and write the pending view counts"""
+        self._stop.set()
+        self._flush_requested.set()
+        atexit.unregister(self.shutdown)
+        
+        if self._flusher is not None:
+            self._flusher.join()
+        
         try:
-            with open(self.shares_file, 'r') as f:
-                return json.load(f)
-        except:
-            return {}
-    
-    def _save_shares(self, shares):
-        with open(self.shares_file, 'w') as f:
-            json.dump(shares, f, indent=2)
+            self.flush_views()
+        except Exception as e:
+            print(f"Error flushing share views: {str(e)}")
+    
+    def reset(self):
+        """Delete all share links, including views not yet flushed"""
+        with self._views_lock:
+            self._views.clear()
+            self._pending_views = 0
+        
+        super().reset()
+    
+    def _write_pending(self):
+        """Flush views, and remove expired reports if cleanup_interval has passed"""
+        self.flush_views()
+        
+        if time.time() >= self._next_cleanup:
+            self.cleanup_expired()
+            self._next_cleanup = time.time() + self.cleanup_interval
+    
+    def _run_flusher(self):
+        """Background loop: flush views on the interval or when requested, clean up expired reports"""
+        while not self._stop.is_set():
+            try:
+                self._write_pending()
+            except Exception as e:
+                print(f"Error in share view flush: {str(e)}")
+            
+            self._flush_requested.wait(self.flush_interval)
+            self._flush_requested.clear()
@@ -0,0 +1,108 @@
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+class SQLiteStore:
+    """
+    Base for SQLite-backed stores.
+    Each thread reuses one connection in WAL mode, so readers run against a
+    snapshot while a writer commits, and neither waits on the other.
+    Subclasses create their schema in _create_schema().
+    
+    Connections live as long as their thread, so long-lived worker threads
+    keep theirs open. Servers that run each request on a new thread (the
+    Werkzeug development server) must call close() when the request ends,
+    or every request leaves an open connection behind; app.py does this on
+    app context teardown.
+    """
+    
+    def __init__(self, db_path, cache_size_kb=16384, mmap_size=256 * 1024 * 1024, busy_timeout_ms=30000):
+        """
+        Args:
+            db_path: SQLite database file
+            cache_size_kb: Page cache size per connection
+            mmap_size: Bytes of the database file read through memory mapping
+            busy_timeout_ms: How long a writer waits for the write lock
+        """
+        self.db_path = db_path
+        self.cache_size_kb = cache_size_kb
+        self.mmap_size = mmap_size
+        self.busy_timeout_ms = busy_timeout_ms
+        
+        # One connection per thread
+        self._local = threading.local()
+        
+        # Create data directory if it doesn't exist
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+    
+    def _init_database(self):
+        """Create tables if they don't exist and apply pending migrations"""
+        with self._transaction() as cursor:
+            self._create_schema(cursor)
+    
+    def _create_schema(self, cursor):
+        """Create missing tables and apply pending migrations, inside the caller's transaction"""
+        raise NotImplementedError
+    
+    def _connect(self):
+        """Return this thread's connection, opening and tuning it on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            return conn
+        
+        # Autocommit mode: statements that must apply together go through _transaction()
+        conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout_ms / 1000, isolation_level=None)
+        
+        # Applies to new files, and to existing ones at their next VACUUM, so free pages can be
+        # returned in small steps (incremental_vacuum) instead of by rewriting the whole file
+        conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+        
+        # WAL lets readers and the writer run concurrently; NORMAL sync is still crash-safe under WAL
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(f'PRAGMA cache_size=-{int(self.cache_size_kb)}')
+        conn.execute(f'PRAGMA mmap_size={int(self.mmap_size)}')
+        conn.execute(f'PRAGMA busy_timeout={int(self.busy_timeout_ms)}')
+        
+        self._local.conn = conn
+        return conn
+    
+    @contextmanager
+    def _transaction(self):
+        """Yield a cursor inside a write transaction, taking the write lock up front"""
+        cursor = self._connect().cursor()
+        cursor.execute('BEGIN IMMEDIATE')
+        
+        try:
+            yield cursor
+            cursor.execute('COMMIT')
+        except BaseException:
+            cursor.execute('ROLLBACK')
+            raise
+    
+    def close(self):
+        """Close the calling thread's connection"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+    
+    def reset(self):
+        """
+        Drop every table and recreate the schema empty, in one transaction
+        The file stays in place, so connections other threads hold (and their
+        writes, which wait for the lock) stay valid
+        """
+        with self._transaction() as cursor:
+            # Virtual tables first: dropping one drops its shadow tables too
+            cursor.execute('''
+                SELECT name FROM sqlite_master
+                WHERE type = 'table' AND name NOT LIKE 'sqlite_%'
+                ORDER BY sql LIKE 'CREATE VIRTUAL TABLE%' DESC
+            ''')
+            for (name,) in cursor.fetchall():
+                cursor.execute(f'DROP TABLE IF EXISTS "{name}"')
+            
+            cursor.execute('PRAGMA user_version = 0')
+            self._create_schema(cursor)
@@ -1,4 +1,4 @@
-import requests
+from utils.http_client import get_http_client
 from bs4 import BeautifulSoup
 import re
 from urllib.parse import urlparse
@@ -10,6 +10,7 @@ class TextExtractor:
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
+        self.http = get_http_client()
     
     def extract(self, input_data):
         """
@@ -32,7 +33,7 @@ class TextExtractor:
     def _extract_from_url(self, url):
         """Extract content from URL"""
         try:
-            response = requests.get(url, headers=self.headers, timeout=10)
+            response = self.http.get(url, headers=self.headers, timeout=10)
             response.raise_for_status()
             
             soup = BeautifulSoup(response.content, 'html.parser')
@@ -66,7 +67,7 @@ class TextExtractor:
         
         except Exception as e:
             print(f"Error extracting from URL: {str(e)}")
-            raise Exception(f"Failed to extract content from URL: {str(e)}")
+            raise Exception(f"Failed to extract content from URL: {str(e)}") from e
     
     def _extract_from_text(self, text):
         """Process raw text input"""
@@ -1,4 +1,4 @@
-import React, { useState } from 'react';
+import React, { useState, useEffect } from 'react';
 import axios from 'axios';
 import { API_URL } from '../config/api';
 
@@ -23,35 +23,48 @@ function BatchAnalyzer() {
         urls: urlList
       });
 
+      // The server analyzes the batch in the background; we only poll its status
       setBatchId(response.data.batch_id);
-      startBatchAnalysis(response.data.batch_id, urlList);
+      setAnalyzing(true);
     } catch (err) {
       console.error('Error creating batch:', err);
       alert('Failed to create batch');
     }
   };
 
-  const startBatchAnalysis = async (bId, urlList) => {
-    setAnalyzing(true);
+  useEffect(() => {
+    if (!batchId || !analyzing) return;
 
-    for (const url of urlList) {
+    let cancelled = false;
+    let timer = null;
+
+    const pollStatus = async () => {
       try {
-        await axios.post(`${API_URL}/api/batch/analyze`, {
-          batch_id: bId,
-          url: url.trim(),
-          target_keyword: ''
-        });
+        const statusRes = await axios.get(`${API_URL}/api/batch/status/${batchId}`);
+        if (cancelled) return;
+
+        setBatchStatus(statusRes.data);
+
+        if (statusRes.data.status === 'completed') {
+          setAnalyzing(false);
+          return;
+        }
       } catch (err) {
-        console.error(`Error analyzing ${url}:`, err);
+        console.error('Error fetching batch status:', err);
       }
 
-      // Fetch updated status
-      const statusRes = await axios.get(`${API_URL}/api/batch/status/${bId}`);
-      setBatchStatus(statusRes.data);
-    }
+      if (!cancelled) {
+        timer = setTimeout(pollStatus, 2000);
+      }
+    };
 
-    setAnalyzing(false);
-  };
+    pollStatus();
+
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [batchId, analyzing]);
 
   const exportResults = () => {
     if (!batchStatus) return;
@@ -177,6 +190,7 @@ function BatchAnalyzer() {
                 onClick={() => {
                   setBatchId(null);
                   setBatchStatus(null);
+                  setAnalyzing(false);
                   setUrls('');
                 }}
                 className="w-full px-6 py-3 bg-slate-600 text-white rounded-lg font-medium hover:bg-slate-700 transition-all"
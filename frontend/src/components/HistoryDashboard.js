@@ -13,8 +13,10 @@ function HistoryDashboard() {
     setLoading(true);
     try {
       const [historyRes, progressRes, statsRes] = await Promise.all([
-        axios.get(`${API_URL}/api/history`, { params: { limit: 10 } }),
-        axios.get(`${API_URL}/api/history/progress`, { params: { days: 30 } }),
+        axios.get(`${API_URL}/api/history`, {
+          params: { limit: 10, fields: 'id,target_keyword,url,word_count,overall_score,created_at' }
+        }),
+        axios.get(`${API_URL}/api/history/progress`, { params: { days: 30, bucket: 'day' } }),
         axios.get(`${API_URL}/api/history/statistics`)
       ]);
 